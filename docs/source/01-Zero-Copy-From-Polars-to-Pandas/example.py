@@ -32,15 +32,31 @@ Line #    Mem usage    Increment  Occurrences   Line Contents
 53    110.0 MiB     70.1 MiB           1       df = create_df()
 54    214.2 MiB    104.3 MiB           1       pdf = df.to_pandas(use_pyarrow_extension_array=True) <--- 104.3 MiB
 
+# ------------------------------------------------------------------------------
+# main4()
+# ------------------------------------------------------------------------------
+Line #    Mem usage    Increment  Occurrences   Line Contents
+=============================================================
+76                                         def main4():
+77    262.1 MiB    -38.2 MiB           1       df = create_df()
+78    302.2 MiB     40.1 MiB           1       res = to_pandas(df) <--- 40.1 MiB
+79    302.2 MiB      0.0 MiB           1       print(res.copied_bytes)
+
+{'id': 0, 'text': 40000008}
+
 **结论**
 
-用 ``df.to_pandas(use_pyarrow_extension_array=True)`` 是最省内存的.
+用 ``df.to_pandas(use_pyarrow_extension_array=True)`` 是最省内存的. 但是它生成的 ``string_view``
+等类型 awswrangler 不认识, ``learn_awswrangler.api.to_pandas`` 只拷贝这些列 (这里是 ``text``),
+其他列和 Polars 共享内存, 并且 ``copied_bytes`` 会告诉你每一列拷贝了多少字节.
 """
 
 import os
 import polars as pl
 from memory_profiler import profile
 
+from learn_awswrangler.api import to_pandas
+
 
 def create_df():
     n_record = 1_000_000
@@ -70,8 +86,16 @@ def main3():
     pdf = df.to_pandas(use_pyarrow_extension_array=True)
 
 
+@profile
+def main4():
+    df = create_df()
+    res = to_pandas(df)
+    print(res.copied_bytes)
+
+
 if __name__ == "__main__":
     """ """
     main1()
     main2()
     main3()
+    main4()
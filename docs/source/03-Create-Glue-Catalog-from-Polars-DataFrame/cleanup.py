@@ -8,6 +8,7 @@ from s3pathlib import S3Path, context
 from boto_session_manager import BotoSesManager
 from aws_console_url.api import AWSConsole
 from aws_glue_catalog.api import Database, Table
+from learn_awswrangler.api import new_s3_client, delete_prefix
 
 aws_profile = "bmt_app_dev_us_east_1"
 db_name = "create_glue_catalog_test_database"
@@ -24,6 +25,7 @@ url = acu.glue.get_table(table_or_arn=tb_name, database=db_name)
 print(f"glue_table: {url}")
 url = acu.glue.get_database(database_or_arn=db_name)
 print(f"glue_database: {url}")
+s3_client = new_s3_client(bsm.boto_ses, max_workers=16)
 
 
 def delete_table():
@@ -39,6 +41,11 @@ def delete_database():
 
 
 if __name__ == "__main__":
-    s3dir_root.delete()
+    delete_prefix(
+        s3dir_root.uri,
+        s3_client,
+        max_workers=16,
+        progress=lambda p: print(f"deleted {p.n_deleted}/{p.n_listed} objects"),
+    )
     delete_table()
     delete_database()
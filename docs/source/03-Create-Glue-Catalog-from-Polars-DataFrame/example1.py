@@ -7,20 +7,27 @@
 我们看看在这种情况下应该怎么处理.
 """
 
-import io
 import polars as pl
 import pandas as pd
 import awswrangler as wr
 from s3pathlib import S3Path, context
 from boto_session_manager import BotoSesManager
 from aws_console_url.api import AWSConsole
-from aws_glue_catalog.api import Database, Table
 from simpletype.api import (
     Integer,
     String,
     List,
     Struct,
-    polars_type_to_simple_type,
+)
+from learn_awswrangler.api import (
+    new_s3_client,
+    delete_prefix,
+    write_partitioned_parquet,
+    write_partitioned_ndjson,
+    register_partitions,
+    get_partitions_values,
+    polars_schema_to_glue,
+    GlueCatalogCache,
 )
 
 aws_profile = "bmt_app_dev_us_east_1"
@@ -38,6 +45,8 @@ url = acu.glue.get_table(table_or_arn=tb_name, database=db_name)
 print(f"glue_table: {url}")
 s3dir_table_parquet = (s3dir_root / "parquet").to_dir()
 s3dir_table_ndjson = (s3dir_root / "ndjson").to_dir()
+s3_client = new_s3_client(bsm.boto_ses, max_workers=8)
+catalog_cache = GlueCatalogCache(bsm.glue_client, ttl=300)
 
 df = pl.DataFrame(
     [
@@ -120,48 +129,51 @@ partition_schema = {
     "year": String().to_glue(),
 }
 
-auto_glue_schema = {
-    k: polars_type_to_simple_type(v).to_glue() for k, v in df.schema.items()
-}
-del auto_glue_schema["year"]
+auto_glue_schema, _ = polars_schema_to_glue(df.schema, partition_cols=["year"])
 
 
 def write_to_parquet():
-    s3dir_table_parquet.delete()
-    for (year,), sub_df in df.group_by(["year"], maintain_order=True):
-        s3path = s3dir_table_parquet.joinpath(f"year={year}/data.parquet")
-        buffer = io.BytesIO()
-        sub_df.write_parquet(buffer, compression="snappy")
-        s3path.write_bytes(buffer.getvalue())
+    delete_prefix(s3dir_table_parquet.uri, s3_client)
+    return write_partitioned_parquet(
+        df=df,
+        s3dir=s3dir_table_parquet.uri,
+        partition_cols=["year"],
+        s3_client=s3_client,
+        compression="snappy",
+    )
 
 
 def write_to_json():
-    s3dir_table_ndjson.delete()
-    for (year,), sub_df in df.group_by(["year"], maintain_order=True):
-        s3path = s3dir_table_ndjson.joinpath(f"year={year}/data.json")
-        buffer = io.BytesIO()
-        sub_df.write_ndjson(buffer)
-        s3path.write_bytes(buffer.getvalue())
+    delete_prefix(s3dir_table_ndjson.uri, s3_client)
+    return write_partitioned_ndjson(
+        df=df,
+        s3dir=s3dir_table_ndjson.uri,
+        partition_cols=["year"],
+        s3_client=s3_client,
+    )
 
 
 def create_database():
-    db = Database.get(glue_client=bsm.glue_client, name=db_name)
-    if db is None:
-        db = bsm.glue_client.create_database(DatabaseInput={"Name": db_name})
+    if not catalog_cache.database_exists(db_name):
+        bsm.glue_client.create_database(DatabaseInput={"Name": db_name})
+        catalog_cache.invalidate(db_name)
 
 
 def delete_table():
-    tb = Table.get(glue_client=bsm.glue_client, database=db_name, name=tb_name)
-    if tb is not None:
+    if catalog_cache.table_exists(db_name, tb_name):
         bsm.glue_client.delete_table(DatabaseName=db_name, Name=tb_name)
+        catalog_cache.invalidate(db_name, tb_name)
 
 
-def add_partition():
-    wr.athena.repair_table(
-        table=tb_name,
+def add_partition(results):
+    register_partitions(
+        glue_client=bsm.glue_client,
         database=db_name,
-        boto3_session=bsm.boto_ses,
+        table=tb_name,
+        partitions_values=get_partitions_values(results),
     )
+    # the table was just created, drop the cached "doesn't exist"
+    catalog_cache.invalidate(db_name, tb_name)
 
 
 def example_01():
@@ -171,7 +183,7 @@ def example_01():
     包裹 struct 的字段名也是 snakecase.
     可见 Glue Catalog 能够自动处理这种情况, 只不过为了保持一致性, 所以结果返回的是 snakecase.
     """
-    write_to_parquet()
+    results = write_to_parquet()
     delete_table()
 
     wr.catalog.create_parquet_table(
@@ -183,14 +195,14 @@ def example_01():
         boto3_session=bsm.boto_ses,
     )
 
-    add_partition()
+    add_partition(results)
 
 
 def example_02():
     """
     再来试试 ndjson 格式, 也是完全没有问题的.
     """
-    write_to_json()
+    results = write_to_json()
     delete_table()
 
     wr.catalog.create_json_table(
@@ -202,7 +214,7 @@ def example_02():
         boto3_session=bsm.boto_ses,
     )
 
-    add_partition()
+    add_partition(results)
 
 
 if __name__ == "__main__":
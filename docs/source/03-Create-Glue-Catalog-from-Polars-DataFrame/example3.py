@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+这个例子演示了当原始数据远大于内存时, 如何用 ``pl.LazyFrame`` 以恒定的内存把数据写成
+Hive 分区的 Parquet 并创建 Glue Catalog 表.
+
+- 数据从不会被完整的 collect 到内存中, 每个分区都由 polars 的 streaming engine 直接写入
+  S3 multipart upload.
+- Glue 的 schema 来自 ``LazyFrame.collect_schema()``, 不需要读取任何数据.
+- 用 ``ensure_table`` 代替先删表再建表, schema 没有变化时不会修改表, 只有不兼容的变化才会重建表.
+- 用 ``read_table`` 不经过 Athena 把表读回 Polars, 只会读取过滤后剩下的分区和需要的列.
+"""
+
+import polars as pl
+from s3pathlib import S3Path, context
+from boto_session_manager import BotoSesManager
+from learn_awswrangler.api import (
+    new_s3_client,
+    delete_prefix,
+    get_polars_storage_options,
+    write_partitioned_parquet,
+    ensure_table,
+    read_table,
+)
+
+aws_profile = "bmt_app_dev_us_east_1"
+db_name = "create_glue_catalog_test_database"
+tb_name = "create_glue_catalog_test_table"
+
+bsm = BotoSesManager(profile_name=aws_profile)
+context.attach_boto_session(bsm.boto_ses)
+bucket = f"{bsm.aws_account_alias}-{bsm.aws_region}-data"
+s3dir_root = S3Path(f"s3://{bucket}/projects/learn_awswrangler/")
+s3dir_source = (s3dir_root / "source").to_dir()
+s3dir_table_parquet = (s3dir_root / "parquet").to_dir()
+s3_client = new_s3_client(bsm.boto_ses, max_workers=8)
+storage_options = get_polars_storage_options(bsm.boto_ses)
+
+
+def example_01():
+    lf = pl.scan_ndjson(
+        f"{s3dir_source.uri}*.json",
+        storage_options=storage_options,
+    )
+    delete_prefix(s3dir_table_parquet.uri, s3_client)
+    results = write_partitioned_parquet(
+        df=lf,
+        s3dir=s3dir_table_parquet.uri,
+        partition_cols=["year"],
+        s3_client=s3_client,
+    )
+
+    # no-op if the schema didn't change, the table is only recreated
+    # when the change is incompatible, the partitions are kept
+    res = ensure_table(
+        df=lf,
+        database=db_name,
+        table=tb_name,
+        s3dir=s3dir_table_parquet.uri,
+        boto_ses=bsm.boto_ses,
+        partition_cols=["year"],
+        compression="snappy",
+        results=results,
+    )
+    print(f"{res.action = }")
+
+
+def example_02():
+    # the partitions are pruned on the Glue metadata before S3 is listed
+    lf = read_table(
+        database=db_name,
+        table=tb_name,
+        boto_ses=bsm.boto_ses,
+        filters=[pl.col("year") == "2001"],
+        storage_options=storage_options,
+    )
+    print(lf.head(10).collect())
+
+
+if __name__ == "__main__":
+    """ """
+    # example_01()
+    # example_02()
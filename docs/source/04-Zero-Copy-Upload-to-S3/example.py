@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+这个脚本用于验证把 polars 序列化后的数据上传到 S3 时, 数据会不会被拷贝.
+
+为了只测量客户端的内存, 这里用的是 ``new_null_s3_client()``, 它是一个真正的
+boto3 S3 client, 只是 HTTP 请求不会离开本进程, 数据读完就被丢弃了.
+
+# ------------------------------------------------------------------------------
+# main1()
+# ------------------------------------------------------------------------------
+Line #    Mem usage    Increment  Occurrences   Line Contents
+=============================================================
+36     98.3 MiB     98.3 MiB           1   @profile
+37                                         def main1():
+38    159.3 MiB     61.0 MiB           1       df = create_df()
+39    159.3 MiB      0.0 MiB           1       buffer = io.BytesIO()
+40    237.4 MiB     78.1 MiB           1       df.write_parquet(buffer, compression="uncompressed") <--- 78.1 MiB
+41    237.4 MiB     -0.0 MiB           1       body = buffer.getvalue()
+42    237.4 MiB      0.0 MiB           1       s3_client.put_object(Bucket=bucket, Key=key, Body=body)
+
+# ------------------------------------------------------------------------------
+# main2()
+# ------------------------------------------------------------------------------
+Line #    Mem usage    Increment  Occurrences   Line Contents
+=============================================================
+45     98.2 MiB     98.2 MiB           1   @profile
+46                                         def main2():
+47    159.5 MiB     61.2 MiB           1       df = create_df()
+48    206.5 MiB      7.0 MiB           2       with MultipartUploadWriter(s3_client, bucket, key) as f:
+49    203.4 MiB     39.9 MiB           1           df.write_parquet(f, compression="uncompressed") <--- 39.9 MiB
+
+**结论**
+
+- ``BytesIO`` 的做法需要把整个序列化后的文件都放在内存里. 在 CPython 中 ``getvalue()``
+  在 buffer 没有被其他对象引用时不会真的拷贝, 但如果传给 boto3 的是 ``bytearray``,
+  botocore 会用 ``io.BytesIO(body)`` 把它包起来, 这一步会拷贝一次.
+- ``MultipartUploadWriter`` 只持有一个 part 大小的 buffer (默认 8 MiB), 通过
+  ``BufferReader`` 把这个 buffer 直接交给 botocore 分块读取, 整个过程中数据只被拷贝一次.
+  剩下的内存增量是 polars 自己的 row group buffer. 单元测试
+  ``tests/test_s3_multipart.py::test_part_buffer_is_not_copied`` 用 ``tracemalloc``
+  验证了这一点.
+"""
+
+import io
+import os
+import polars as pl
+from memory_profiler import profile
+
+from learn_awswrangler.api import MultipartUploadWriter
+from learn_awswrangler.tests.null_s3 import new_null_s3_client
+
+s3_client = new_null_s3_client()
+bucket = "my-bucket"
+key = "data.parquet"
+
+
+def create_df():
+    n_record = 1_000_000
+    df = pl.DataFrame(
+        {
+            "id": range(1, 1 + n_record),
+            "text": [os.urandom(16).hex() for _ in range(n_record)],
+        }
+    )
+    return df
+
+
+@profile
+def main1():
+    df = create_df()
+    buffer = io.BytesIO()
+    df.write_parquet(buffer, compression="uncompressed")
+    body = buffer.getvalue()
+    s3_client.put_object(Bucket=bucket, Key=key, Body=body)
+
+
+@profile
+def main2():
+    df = create_df()
+    with MultipartUploadWriter(s3_client, bucket, key) as f:
+        df.write_parquet(f, compression="uncompressed")
+
+
+if __name__ == "__main__":
+    """ """
+    main1()
+    main2()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+这个脚本对比了 ``df.group_by(...)`` 循环和 ``iter_partitions()`` 在不同分区数量下
+把 DataFrame 拆分成 Hive 分区 (包括计算 ``k=v/`` 路径) 的速度.
+
+数据是 1,000,000 行, 分区键是 ``year/month/day/hour`` x ``tenant``.
+
+Result::
+
+         10 partitions, group_by_loop: 0.147 sec, 10 groups
+         10 partitions, vectorized   : 0.154 sec, 10 groups
+       1000 partitions, group_by_loop: 0.257 sec, 1000 groups
+       1000 partitions, vectorized   : 0.159 sec, 1000 groups
+     100000 partitions, group_by_loop: 2.934 sec, 99996 groups
+     100000 partitions, vectorized   : 0.791 sec, 99996 groups
+
+**结论**
+
+分区少的时候两者差不多, 分区越多 ``iter_partitions()`` 的优势越明显. ``group_by`` 循环
+需要为每个分区在 Python 里创建一个新的 DataFrame, 而 ``iter_partitions()`` 只做一次聚合
+和一次 gather, 然后每个分区只是一个共享内存的 ``df.slice()``.
+"""
+
+import time
+import random
+
+import polars as pl
+
+from learn_awswrangler.api import iter_partitions, to_hive_path
+
+n_record = 1_000_000
+partition_cols = ["year", "month", "day", "hour", "tenant"]
+
+
+def create_df(n_partition: int) -> pl.DataFrame:
+    partition_id = [random.randrange(n_partition) for _ in range(n_record)]
+    df = pl.DataFrame(
+        {
+            "id": range(n_record),
+            "value": [random.random() for _ in range(n_record)],
+            "partition_id": partition_id,
+        }
+    )
+    n_tenant = 10
+    hour_id = pl.col("partition_id") // n_tenant
+    return df.with_columns(
+        year=(2000 + hour_id // (366 * 24)).cast(pl.String),
+        month=((hour_id // (31 * 24)) % 12 + 1).cast(pl.String).str.zfill(2),
+        day=((hour_id // 24) % 31 + 1).cast(pl.String).str.zfill(2),
+        hour=(hour_id % 24).cast(pl.String).str.zfill(2),
+        tenant=(pl.col("partition_id") % n_tenant).cast(pl.String),
+    ).drop("partition_id")
+
+
+def group_by_loop(df: pl.DataFrame) -> int:
+    n = 0
+    for values, sub_df in df.group_by(partition_cols, maintain_order=True):
+        _ = to_hive_path(partition_cols, values)
+        n += 1
+    return n
+
+
+def vectorized(df: pl.DataFrame) -> int:
+    n = 0
+    for values, hive_path, sub_df in iter_partitions(df, partition_cols):
+        n += 1
+    return n
+
+
+def main():
+    # warm up, so the first measurement doesn't pay for lazy imports
+    for func in [group_by_loop, vectorized]:
+        func(create_df(10).head(100))
+    for n_partition in [10, 1_000, 100_000]:
+        df = create_df(n_partition)
+        for func in [group_by_loop, vectorized]:
+            start = time.perf_counter()
+            n = func(df)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{n_partition:>7} partitions, {func.__name__:<13}: "
+                f"{elapsed:.3f} sec, {n} groups"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+这个脚本用 ``tune_parquet()`` 在一个典型的事件表上对比不同的 Parquet 压缩算法, 压缩级别
+和 row group 大小, 并分别按写入速度, 扫描成本和存储空间给出推荐.
+
+Result (100,000 行的样本, 压缩前约 4.5 MB)::
+
+    objective = write_throughput, best = ParquetSetting(compression='uncompressed', compression_level=None, row_group_size=None)
+    objective = scan_cost, best = ParquetSetting(compression='zstd', compression_level=3, row_group_size=None)
+    objective = storage, best = ParquetSetting(compression='zstd', compression_level=1, row_group_size=None)
+
+    compression  compression_level  row_group_size  encode_time  decode_time  n_bytes  ratio
+    zstd         1                  null            0.034085     0.010118     1520533  3.01
+    zstd         9                  null            0.149757     0.011955     1572082  2.91
+    zstd         3                  null            0.048146     0.009994     1588411  2.88
+    gzip         6                  null            0.167987     0.021439     1662859  2.75
+    zstd         3                  10000           0.058704     0.014661     1786675  2.56
+    snappy       null               null            0.026836     0.007948     2813577  1.63
+    lz4          null               null            0.024389     0.006949     2875919  1.59
+    uncompressed null               null            0.012428     0.002688     3882260  1.18
+
+**结论**
+
+默认的 ``snappy`` 在这份数据上比 ``zstd`` 大了将近一倍, 而 ``zstd`` level 1 的写入速度
+只慢了 25% 左右. 更高的 zstd level 不一定更小, 写入却慢了好几倍. row group 越小, 压缩和
+字典编码的效果越差. 每份数据的结论都不一样, 所以在真实数据上跑一遍 ``tune_parquet()``,
+或者直接用 ``write_partitioned_parquet(auto_tune=...)``.
+"""
+
+import random
+
+import polars as pl
+
+from learn_awswrangler.tuning import ObjectiveEnum, tune_parquet
+
+n_record = 1_000_000
+
+
+def create_df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "event_id": range(n_record),
+            "user_id": [random.randrange(10_000) for _ in range(n_record)],
+            "event_type": [
+                random.choice(["click", "view", "purchase", "signup"])
+                for _ in range(n_record)
+            ],
+            "amount": [round(random.random() * 100, 2) for _ in range(n_record)],
+            "payload": [f"{random.getrandbits(64):016x}" for _ in range(n_record)],
+        }
+    )
+
+
+def main():
+    df = create_df()
+    with pl.Config(tbl_rows=20, tbl_cols=10, tbl_width_chars=120):
+        for objective in [
+            ObjectiveEnum.write_throughput,
+            ObjectiveEnum.scan_cost,
+            ObjectiveEnum.storage,
+        ]:
+            result = tune_parquet(
+                df,
+                objective=objective,
+                row_group_sizes=[None, 10_000],
+            )
+            print(f"objective = {objective}, best = {result.best}")
+            if objective == ObjectiveEnum.storage:
+                print(result.to_df())
+
+
+if __name__ == "__main__":
+    main()
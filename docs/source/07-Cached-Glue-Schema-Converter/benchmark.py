@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+这个脚本对比了逐列调用 ``simpletype.polars_type_to_simple_type(...).to_glue()`` 和带缓存的
+``polars_schema_to_glue()`` 把一个很宽的, 有大量重复嵌套 struct 的 Polars schema 转换成
+Glue 类型的速度. 模拟的是每次运行要为几百张表生成 schema 的场景.
+
+结果 (2000 列 x 100 张表)::
+
+    simpletype_inline: 6.606 sec for 100 tables x 2000 columns
+    cached           : 0.872 sec for 100 tables x 2000 columns
+
+结论: 重复的嵌套类型在缓存中只会被转换一次, 同一个 struct 在不同的列, 不同的表中出现时直接命中
+缓存, 速度提升约 7 倍. 注意 simpletype 会把 struct 中的 Int32 转换成 bigint, 而
+``polars_type_to_glue`` 和 awswrangler 一样转换成 int.
+"""
+
+import time
+
+import polars as pl
+from simpletype.api import polars_type_to_simple_type
+
+from learn_awswrangler.glue_schema import polars_type_to_glue, polars_schema_to_glue
+
+n_column = 2_000
+n_table = 100
+
+address = pl.Struct(
+    {
+        "street": pl.String(),
+        "city": pl.String(),
+        "zip": pl.Int32(),
+        "geo": pl.Struct({"lat": pl.Float64(), "lng": pl.Float64()}),
+    }
+)
+person = pl.Struct(
+    {
+        "name": pl.String(),
+        "age": pl.Int32(),
+        "home": address,
+        "work": address,
+        "tags": pl.List(pl.String()),
+    }
+)
+dtypes = [
+    pl.Int64(),
+    pl.String(),
+    pl.Float64(),
+    address,
+    person,
+    pl.List(person),
+    pl.Struct({"owner": person, "history": pl.List(address)}),
+]
+schema = pl.Schema(
+    {f"col_{i}": dtypes[i % len(dtypes)] for i in range(n_column)}
+    | {"year": pl.String()}
+)
+
+
+def simpletype_inline():
+    columns_types = {
+        k: polars_type_to_simple_type(v).to_glue() for k, v in schema.items()
+    }
+    del columns_types["year"]
+    return columns_types
+
+
+def cached():
+    columns_types, _ = polars_schema_to_glue(schema, partition_cols=["year"])
+    return columns_types
+
+
+def main():
+    # simpletype maps Int32 to bigint, polars_type_to_glue maps it to int
+    assert list(simpletype_inline()) == list(cached())
+    for func in [simpletype_inline, cached]:
+        polars_type_to_glue.cache_clear()
+        start = time.perf_counter()
+        for _ in range(n_table):
+            func()
+        elapsed = time.perf_counter() - start
+        print(
+            f"{func.__name__:<17}: {elapsed:.3f} sec for {n_table} tables "
+            f"x {n_column} columns"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+这个脚本对比了用 ``list_objects_v2`` 逐页列出所有 object 再解析路径, 和
+``discover_partitions()`` 按层级用 ``Delimiter="/"`` 并行列出文件夹, 两种方式发现一个有
+10 万个 key 的 Hive 分区数据集的所有分区的速度.
+
+为了不依赖真实的 S3, 这里用了一个内存中的 S3 client 替身, 它支持 ``list_objects_v2`` 的
+``Prefix``, ``Delimiter`` 和每页 1000 个 key 的分页, 并且每个请求会 sleep 一段时间模拟
+S3 的网络延迟.
+
+结果 (365 天 x 24 小时 x 12 个文件 = 105120 个 key, 每个请求 20 ms)::
+
+    flat listing : 2.540 sec, 106 requests, 8760 partitions
+    discovery    : 0.318 sec, 366 requests, 8760 partitions
+
+结论: 逐页列出所有 object 的请求必须一个接一个地发送, 耗时和 object 的数量成正比. 按层级
+列出文件夹虽然请求数更多, 但同一层的请求是并行的, 耗时只和目录的深度以及每层文件夹的数量有关,
+和每个分区中有多少文件无关. 分区中的文件越多, 差距越大.
+"""
+
+import time
+import bisect
+import datetime
+
+from learn_awswrangler.discovery import discover_partitions
+
+latency = 0.02
+n_day = 365
+n_hour = 24
+n_file = 12
+
+
+class FakeS3Client:
+    """
+    A stand-in of the boto3 S3 client, with only a ``list_objects_v2``
+    paginator over sorted keys in memory.
+    """
+
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+        self.n_requests = 0
+
+    def list_objects_v2(self, Bucket, Prefix="", Delimiter=None, StartAfter=""):
+        time.sleep(latency)
+        self.n_requests += 1
+        i = bisect.bisect_right(self.keys, max(Prefix, StartAfter))
+        if Prefix and StartAfter < Prefix:
+            i = bisect.bisect_left(self.keys, Prefix)
+        contents, common_prefixes = list(), list()
+        last = None
+        while i < len(self.keys) and len(contents) + len(common_prefixes) < 1000:
+            key = self.keys[i]
+            if not key.startswith(Prefix):
+                break
+            last = key
+            rest = key[len(Prefix) :]
+            if Delimiter and Delimiter in rest:
+                common_prefix = Prefix + rest.split(Delimiter, 1)[0] + Delimiter
+                common_prefixes.append({"Prefix": common_prefix})
+                # skip the whole sub folder
+                i = bisect.bisect_left(self.keys, common_prefix + "\uffff")
+                last = common_prefix + "\uffff"
+            else:
+                contents.append({"Key": key})
+                i += 1
+        res = {"Contents": contents, "CommonPrefixes": common_prefixes}
+        if i < len(self.keys) and self.keys[i].startswith(Prefix):
+            res["NextStartAfter"] = last
+        return res
+
+    def get_paginator(self, name):
+        client = self
+
+        class Paginator:
+            def paginate(self, **kwargs):
+                start_after = ""
+                while True:
+                    res = client.list_objects_v2(StartAfter=start_after, **kwargs)
+                    yield res
+                    if "NextStartAfter" not in res:
+                        return
+                    start_after = res["NextStartAfter"]
+
+        return Paginator()
+
+
+def flat_listing(s3_client, bucket, prefix):
+    partitions = dict()
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            folder = obj["Key"].rsplit("/", 1)[0] + "/"
+            partitions[f"s3://{bucket}/{folder}"] = [
+                part.split("=", 1)[1] for part in folder[len(prefix) : -1].split("/")
+            ]
+    return dict(sorted(partitions.items()))
+
+
+start = datetime.date(2000, 1, 1)
+keys = [
+    f"table/date={start + datetime.timedelta(days=day)}/hour={hour:02d}/part-{i:05d}.parquet"
+    for day in range(n_day)
+    for hour in range(n_hour)
+    for i in range(n_file)
+]
+print(f"{len(keys)} keys")
+
+s3_client = FakeS3Client(keys)
+st = time.time()
+expected = flat_listing(s3_client, "bucket", "table/")
+elapse = time.time() - st
+print(
+    f"flat listing : {elapse:.3f} sec, {s3_client.n_requests} requests, "
+    f"{len(expected)} partitions"
+)
+
+s3_client = FakeS3Client(keys)
+st = time.time()
+partitions = discover_partitions(
+    "s3://bucket/table/",
+    s3_client,
+    partition_cols=["date", "hour"],
+    max_workers=32,
+)
+elapse = time.time() - st
+print(
+    f"discovery    : {elapse:.3f} sec, {s3_client.n_requests} requests, "
+    f"{len(partitions)} partitions"
+)
+assert partitions == expected
@@ -1,2 +1,64 @@
 # -*- coding: utf-8 -*-
 
+from .s3_multipart import BufferReader
+from .s3_multipart import MultipartUploadWriter
+from .partition import to_hive_path
+from .partition import iter_partitions
+from .writer import WrittenFile
+from .writer import PartitionWriteResult
+from .writer import ExecutorEnum
+from .writer import new_s3_client
+from .writer import split_rows
+from .writer import write_partitioned_parquet
+from .writer import write_partitioned_ndjson
+from .s3_utils import get_polars_storage_options
+from .compaction import CompactionResult
+from .compaction import compact_partitions
+from .compaction import recover_compactions
+from .glue_schema import get_schema
+from .glue_schema import polars_schema_to_glue
+from .glue_schema import polars_type_to_glue
+from .glue_schema import glue_type_to_polars
+from .glue_schema import extract_athena_types
+from .pandas_bridge import ToPandasResult
+from .pandas_bridge import to_pandas
+from .pandas_bridge import iter_pandas_chunks
+from .pandas_bridge import estimate_row_bytes
+from .pandas_bridge import write_chunked
+from .dataset import ModeEnum
+from .dataset import to_parquet_dataset
+from .compression import CompressionEnum
+from .catalog import create_json_table
+from .catalog import create_parquet_table
+from .catalog import swap_table_location
+from .catalog import RegisterPartitionsResult
+from .catalog import get_partitions_values
+from .catalog import register_partitions
+from .catalog import FileFormatEnum
+from .catalog import EnsureActionEnum
+from .catalog import SchemaDiff
+from .catalog import EnsureTableResult
+from .catalog import diff_table
+from .catalog import ensure_table
+from .projection import infer_partition_projection
+from .projection import merge_partition_projection
+from .projection import to_table_parameters
+from .tuning import ObjectiveEnum
+from .tuning import ParquetSetting
+from .tuning import TuningResult
+from .tuning import tune_parquet
+from .manifest import Manifest
+from .s3_delete import DeleteProgress
+from .s3_delete import DeleteResult
+from .s3_delete import delete_prefix
+from .versioned import VersionedWriteResult
+from .versioned import list_versions
+from .versioned import write_versioned_parquet
+from .catalog_cache import GlueCatalogCache
+from .parquet_schema import ParquetDatasetSchema
+from .parquet_schema import read_footer_schema
+from .parquet_schema import infer_parquet_schema
+from .discovery import list_sub_folders
+from .discovery import discover_partitions
+from .reader import prune_partitions
+from .reader import read_table
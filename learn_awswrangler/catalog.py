@@ -0,0 +1,801 @@
+# -*- coding: utf-8 -*-
+
+"""
+Create AWS Glue Catalog tables for the datasets written by
+:mod:`learn_awswrangler.writer`.
+"""
+
+import typing as T
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+import awswrangler as wr
+
+from .partition import get_hive_values
+from .compression import get_extension
+from .glue_schema import get_schema, polars_schema_to_glue
+from .projection import (
+    infer_partition_projection,
+    merge_partition_projection,
+    to_table_parameters,
+)
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    import boto3
+    from mypy_boto3_glue import GlueClient
+    from .writer import PartitionWriteResult
+
+JSON_SERDE = "org.openx.data.jsonserde.JsonSerDe"
+
+#: the keys of ``get_table()["Table"]`` that are accepted by ``TableInput``
+TABLE_INPUT_KEYS = [
+    "Name",
+    "Description",
+    "Owner",
+    "LastAccessTime",
+    "LastAnalyzedTime",
+    "Retention",
+    "StorageDescriptor",
+    "PartitionKeys",
+    "ViewOriginalText",
+    "ViewExpandedText",
+    "TableType",
+    "Parameters",
+    "TargetTable",
+]
+
+
+def _get_projection_settings(
+    boto_ses: "boto3.session.Session",
+    database: str,
+    table: str,
+    s3dir: str,
+    schema: T.Mapping[str, pl.DataType],
+    partition_cols: T.Optional[T.Sequence[str]],
+    results: T.Optional[T.List["PartitionWriteResult"]],
+    mode: str,
+    projection: bool,
+    date_range_to_now: bool,
+) -> T.Optional[T.Dict[str, T.Any]]:
+    if not projection:
+        return None
+    if not (partition_cols and results):
+        raise ValueError("projection requires partition_cols and results")
+    settings = infer_partition_projection(
+        results=results,
+        partition_cols=partition_cols,
+        schema=schema,
+        s3dir=s3dir,
+        date_range_to_now=date_range_to_now,
+    )
+    if mode == "append":
+        table_input = get_table_input(boto_ses.client("glue"), database, table)
+        if table_input is not None:
+            settings = merge_partition_projection(
+                table_input.get("Parameters", {}), settings
+            )
+    return settings
+
+
+def create_json_table(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    database: str,
+    table: str,
+    s3dir: str,
+    boto_ses: "boto3.session.Session",
+    partition_cols: T.Optional[T.Sequence[str]] = None,
+    compression: T.Optional[str] = None,
+    results: T.Optional[T.List["PartitionWriteResult"]] = None,
+    mode: str = "overwrite",
+    projection: bool = False,
+    date_range_to_now: bool = False,
+) -> T.Tuple[T.Dict[str, str], T.Dict[str, str]]:
+    """
+    Create the Glue table of a dataset written by
+    :func:`~learn_awswrangler.writer.write_partitioned_ndjson`.
+
+    The table uses the OpenX JSON SerDe, and the ``compressionType`` /
+    ``Compressed`` properties match ``compression``. Athena decompresses
+    each file by its extension (``.gz``, ``.zst``), so keep the default
+    file name of the writer.
+
+    :param df: the written DataFrame or LazyFrame, only the schema is used.
+    :param s3dir: S3 URI of the table root folder.
+    :param partition_cols: the partition columns used by the writer.
+    :param compression: the ``compression`` used by the writer.
+    :param results: the return value of the writer, if given, its
+        partitions are registered by :func:`register_partitions`, with the
+        storage properties of the table.
+    :param mode: ``"overwrite"`` or ``"append"``.
+    :param projection: if True, configure Athena partition projection
+        inferred from ``results`` by
+        :func:`~learn_awswrangler.projection.infer_partition_projection`
+        instead of registering partitions. With ``mode="append"`` the
+        projection of the existing table is widened, not replaced.
+    :param date_range_to_now: project ``Date`` partitions up to ``NOW``.
+
+    :return: ``(columns_types, partitions_types)``
+    """
+    get_extension(compression)  # validate
+    schema = get_schema(df)
+    columns_types, partitions_types = polars_schema_to_glue(
+        schema,
+        partition_cols=partition_cols,
+    )
+    projection_settings = _get_projection_settings(
+        boto_ses=boto_ses,
+        database=database,
+        table=table,
+        s3dir=s3dir,
+        schema=schema,
+        partition_cols=partition_cols,
+        results=results,
+        mode=mode,
+        projection=projection,
+        date_range_to_now=date_range_to_now,
+    )
+    wr.catalog.create_json_table(
+        database=database,
+        table=table,
+        path=s3dir,
+        columns_types=columns_types,
+        partitions_types=partitions_types,
+        compression=compression,
+        serde_library=JSON_SERDE,
+        mode=mode,
+        athena_partition_projection_settings=projection_settings,
+        boto3_session=boto_ses,
+    )
+    if results and projection_settings is None:
+        register_partitions(
+            glue_client=boto_ses.client("glue"),
+            database=database,
+            table=table,
+            partitions_values=get_partitions_values(results),
+        )
+    return columns_types, partitions_types
+
+
+def create_parquet_table(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    database: str,
+    table: str,
+    s3dir: str,
+    boto_ses: "boto3.session.Session",
+    partition_cols: T.Optional[T.Sequence[str]] = None,
+    compression: T.Optional[str] = None,
+    results: T.Optional[T.List["PartitionWriteResult"]] = None,
+    mode: str = "overwrite",
+    projection: bool = False,
+    date_range_to_now: bool = False,
+) -> T.Tuple[T.Dict[str, str], T.Dict[str, str]]:
+    """
+    The Parquet version of :func:`create_json_table`, for a dataset written
+    by :func:`~learn_awswrangler.writer.write_partitioned_parquet`.
+    """
+    schema = get_schema(df)
+    columns_types, partitions_types = polars_schema_to_glue(
+        schema,
+        partition_cols=partition_cols,
+    )
+    projection_settings = _get_projection_settings(
+        boto_ses=boto_ses,
+        database=database,
+        table=table,
+        s3dir=s3dir,
+        schema=schema,
+        partition_cols=partition_cols,
+        results=results,
+        mode=mode,
+        projection=projection,
+        date_range_to_now=date_range_to_now,
+    )
+    wr.catalog.create_parquet_table(
+        database=database,
+        table=table,
+        path=s3dir,
+        columns_types=columns_types,
+        partitions_types=partitions_types,
+        compression=compression,
+        mode=mode,
+        athena_partition_projection_settings=projection_settings,
+        boto3_session=boto_ses,
+    )
+    if results and projection_settings is None:
+        register_partitions(
+            glue_client=boto_ses.client("glue"),
+            database=database,
+            table=table,
+            partitions_values=get_partitions_values(results),
+        )
+    return columns_types, partitions_types
+
+
+def get_partitions_values(
+    results: T.List["PartitionWriteResult"],
+) -> T.Dict[str, T.List[str]]:
+    """
+    Convert the return value of the partitioned writers to the
+    ``partitions_values`` argument of ``wr.catalog.add_xxx_partitions``,
+    partition location -> partition values as strings, the way they are in
+    the partition folders.
+    """
+    return {
+        result.location: get_hive_values(result.location, len(result.values))
+        for result in results
+    }
+
+
+def get_table_input(
+    glue_client: "GlueClient",
+    database: str,
+    table: str,
+) -> T.Optional[T.Dict[str, T.Any]]:
+    """
+    Get the ``TableInput`` of an existing table, ready to be modified and
+    passed to ``update_table``, None if the table doesn't exist.
+    """
+    try:
+        res = glue_client.get_table(DatabaseName=database, Name=table)
+    except glue_client.exceptions.EntityNotFoundException:
+        return None
+    return {
+        key: value for key, value in res["Table"].items() if key in TABLE_INPUT_KEYS
+    }
+
+
+def _iter_chunks(items: T.List[T.Any], size: int) -> T.Iterable[T.List[T.Any]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _check_batch_errors(res: T.Dict[str, T.Any], action: str):
+    errors = res.get("Errors", [])
+    if errors:
+        raise RuntimeError(f"failed to {action} {len(errors)} partitions: {errors}")
+
+
+@dataclasses.dataclass
+class RegisterPartitionsResult:
+    """
+    :param n_created: number of partitions created.
+    :param n_updated: number of partitions that already existed and were
+        updated.
+    """
+
+    n_created: int = 0
+    n_updated: int = 0
+
+
+def register_partitions(
+    glue_client: "GlueClient",
+    database: str,
+    table: str,
+    partitions_values: T.Dict[str, T.List[str]],
+    storage_descriptor: T.Optional[T.Dict[str, T.Any]] = None,
+    max_workers: int = 8,
+) -> RegisterPartitionsResult:
+    """
+    Register partitions in the Glue catalog, creating them or updating the
+    existing ones, without ``MSCK REPAIR TABLE``.
+
+    The writer already knows which partitions it wrote, so there is no need
+    to let Athena list the whole table prefix. Partitions are sent with
+    ``batch_create_partition`` in chunks of 100, the API limit, ``max_workers``
+    chunks at a time. The partitions rejected with ``AlreadyExistsException``
+    are then sent with ``batch_update_partition``, in chunks of 100 as well.
+
+    Example::
+
+        >>> results = write_partitioned_parquet(df, ...)
+        >>> register_partitions(
+        ...     bsm.glue_client,
+        ...     database,
+        ...     table,
+        ...     get_partitions_values(results),
+        ... )
+
+    :param partitions_values: partition location -> partition values, see
+        :func:`get_partitions_values`.
+    :param storage_descriptor: the template of the partition storage
+        descriptor, default is the one of the table. The ``Location`` is
+        replaced by the partition location.
+    :param max_workers: number of concurrent requests.
+    """
+    if storage_descriptor is None:
+        table_input = get_table_input(glue_client, database, table)
+        if table_input is None:
+            raise ValueError(f"table {database}.{table} doesn't exist")
+        storage_descriptor = table_input["StorageDescriptor"]
+    partition_inputs = {
+        tuple(values): {
+            "Values": list(values),
+            "StorageDescriptor": dict(storage_descriptor, Location=location),
+        }
+        for location, values in partitions_values.items()
+    }
+
+    def create(chunk: T.List[T.Dict[str, T.Any]]) -> T.List[T.Dict[str, T.Any]]:
+        res = glue_client.batch_create_partition(
+            DatabaseName=database,
+            TableName=table,
+            PartitionInputList=chunk,
+        )
+        return res.get("Errors", [])
+
+    def update(chunk: T.List[T.Dict[str, T.Any]]) -> T.List[T.Dict[str, T.Any]]:
+        res = glue_client.batch_update_partition(
+            DatabaseName=database,
+            TableName=table,
+            Entries=[
+                {
+                    "PartitionValueList": partition_input["Values"],
+                    "PartitionInput": partition_input,
+                }
+                for partition_input in chunk
+            ],
+        )
+        return res.get("Errors", [])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        errors = [
+            error
+            for chunk_errors in executor.map(
+                create, _iter_chunks(list(partition_inputs.values()), 100)
+            )
+            for error in chunk_errors
+        ]
+        to_update = list()
+        for error in errors:
+            code = error.get("ErrorDetail", {}).get("ErrorCode")
+            if code != "AlreadyExistsException":
+                raise RuntimeError(f"failed to create partition: {error}")
+            to_update.append(partition_inputs[tuple(error["PartitionValues"])])
+        errors = [
+            error
+            for chunk_errors in executor.map(update, _iter_chunks(to_update, 100))
+            for error in chunk_errors
+        ]
+        if errors:
+            raise RuntimeError(f"failed to update partitions: {errors}")
+
+    return RegisterPartitionsResult(
+        n_created=len(partition_inputs) - len(to_update),
+        n_updated=len(to_update),
+    )
+
+
+def swap_table_location(
+    glue_client: "GlueClient",
+    database: str,
+    table: str,
+    location: str,
+    columns_types: T.Optional[T.Dict[str, str]] = None,
+    partitions_values: T.Optional[T.Dict[str, T.List[str]]] = None,
+    projection_settings: T.Optional[T.Dict[str, T.Any]] = None,
+):
+    """
+    Point an existing table to a new copy of its data at ``location``.
+
+    The table ``Location`` is changed by a single ``update_table`` call, so
+    for unpartitioned and projection tables readers switch from the old
+    copy to the new one at once. The partitions and schema of the table are
+    kept, ``columns_types`` replaces the data columns if given.
+
+    For a partition projection table, ``projection_settings`` (see
+    :func:`~learn_awswrangler.projection.infer_partition_projection`) are
+    the projection of the new copy: its ranges, values and
+    ``storage.location.template`` replace the old ones in the same
+    ``update_table`` call. Without it, only the ``storage.location.template``
+    is moved to ``location``.
+
+    Partitions registered in the catalog have their own ``Location``, for
+    those tables ``partitions_values`` (location -> values, see
+    :func:`get_partitions_values`) is the full partition list of the new
+    copy. The swap is not atomic, it runs in this order:
+
+    1. the partitions are created or updated to the new location by
+       :func:`register_partitions`, each one flips on its own. Until the
+       last one is done, a query can read some partitions from the old copy
+       and some from the new one.
+    2. the table is updated. Between 1. and 2. the table ``Location`` and
+       schema are still the old ones, while its partitions are the new
+       ones, which only matters to crawlers and to partitions added in
+       that window.
+    3. the partitions that are not in the new copy are deleted, until then
+       queries still see them, from the old copy.
+
+    Every partition always points to a complete copy, as long as the old
+    copy is not deleted before the swap returns.
+    """
+    table_input = get_table_input(glue_client, database, table)
+    if table_input is None:
+        raise ValueError(f"table {database}.{table} doesn't exist")
+    sd = table_input["StorageDescriptor"]
+    old_location = sd["Location"]
+    sd["Location"] = location
+    if columns_types is not None:
+        sd["Columns"] = [
+            {"Name": name, "Type": type_} for name, type_ in columns_types.items()
+        ]
+    parameters = table_input.setdefault("Parameters", {})
+    if projection_settings is not None:
+        for key in list(parameters):
+            if key.startswith("projection."):
+                del parameters[key]
+        parameters.update(to_table_parameters(projection_settings))
+    else:
+        template = parameters.get("storage.location.template")
+        if template is not None and template.startswith(old_location):
+            parameters["storage.location.template"] = (
+                location + template[len(old_location) :]
+            )
+
+    if partitions_values is not None:
+        paginator = glue_client.get_paginator("get_partitions")
+        existing = {
+            tuple(partition["Values"])
+            for page in paginator.paginate(DatabaseName=database, TableName=table)
+            for partition in page["Partitions"]
+        }
+        new_values = {tuple(values) for values in partitions_values.values()}
+        to_delete = [
+            {"Values": list(values)} for values in existing if values not in new_values
+        ]
+        register_partitions(
+            glue_client=glue_client,
+            database=database,
+            table=table,
+            partitions_values=partitions_values,
+            storage_descriptor=sd,
+        )
+
+    glue_client.update_table(
+        DatabaseName=database,
+        TableInput=table_input,
+        SkipArchive=True,
+    )
+
+    if partitions_values is not None:
+        for chunk in _iter_chunks(to_delete, 25):
+            res = glue_client.batch_delete_partition(
+                DatabaseName=database,
+                TableName=table,
+                PartitionsToDelete=chunk,
+            )
+            _check_batch_errors(res, "delete")
+
+
+class FileFormatEnum:
+    """
+    The file formats of :func:`ensure_table`, the ``classification`` table
+    parameter set by awswrangler.
+    """
+
+    parquet = "parquet"
+    json = "json"
+
+
+class EnsureActionEnum:
+    """
+    What :func:`ensure_table` did to the table.
+    """
+
+    created = "created"
+    unchanged = "unchanged"
+    updated = "updated"
+    recreated = "recreated"
+
+
+#: type changes Athena reads without rewriting the data
+_WIDENINGS = {
+    ("tinyint", "smallint"),
+    ("tinyint", "int"),
+    ("tinyint", "bigint"),
+    ("smallint", "int"),
+    ("smallint", "bigint"),
+    ("int", "bigint"),
+    ("float", "double"),
+}
+
+
+@dataclasses.dataclass
+class SchemaDiff:
+    """
+    The difference between the existing Glue table and the desired one.
+
+    :param added: new data columns, name -> type.
+    :param removed: data columns that are gone, name -> old type.
+    :param changed: data columns whose type changed, name -> (old, new).
+    :param partition_keys_changed: the partition keys or their types changed.
+    :param format_changed: the file format changed.
+    :param properties_changed: the location or compression changed.
+    """
+
+    added: T.Dict[str, str] = dataclasses.field(default_factory=dict)
+    removed: T.Dict[str, str] = dataclasses.field(default_factory=dict)
+    changed: T.Dict[str, T.Tuple[str, str]] = dataclasses.field(default_factory=dict)
+    partition_keys_changed: bool = False
+    format_changed: bool = False
+    properties_changed: bool = False
+
+    @property
+    def is_equal(self) -> bool:
+        return not (
+            self.added
+            or self.removed
+            or self.changed
+            or self.partition_keys_changed
+            or self.format_changed
+            or self.properties_changed
+        )
+
+    @property
+    def is_compatible(self) -> bool:
+        """
+        True if ``update_table`` is enough: only new columns (appended at
+        the end), widened types, or a new location / compression.
+        """
+        return not (
+            self.removed
+            or self.partition_keys_changed
+            or self.format_changed
+            or any(change not in _WIDENINGS for change in self.changed.values())
+        )
+
+
+def diff_table(
+    table_input: T.Dict[str, T.Any],
+    columns_types: T.Dict[str, str],
+    partitions_types: T.Dict[str, str],
+    file_format: str,
+    s3dir: str,
+    compression: T.Optional[str] = None,
+) -> SchemaDiff:
+    """
+    Compare the ``TableInput`` of an existing table with the desired
+    columns, partitions, format and properties.
+    """
+    sd = table_input.get("StorageDescriptor", {})
+    parameters = table_input.get("Parameters", {})
+    old_columns = {col["Name"]: col["Type"] for col in sd.get("Columns", [])}
+    old_partitions = [
+        (col["Name"], col["Type"]) for col in table_input.get("PartitionKeys", [])
+    ]
+    diff = SchemaDiff()
+    for name, type_ in columns_types.items():
+        if name not in old_columns:
+            diff.added[name] = type_
+        elif old_columns[name] != type_:
+            diff.changed[name] = (old_columns[name], type_)
+    for name, type_ in old_columns.items():
+        if name not in columns_types:
+            diff.removed[name] = type_
+    diff.partition_keys_changed = old_partitions != list(partitions_types.items())
+    diff.format_changed = parameters.get("classification") != file_format
+    diff.properties_changed = sd.get("Location") != s3dir or parameters.get(
+        "compressionType", "none"
+    ) != (compression or "none")
+    return diff
+
+
+@dataclasses.dataclass
+class EnsureTableResult:
+    """
+    :param action: see :class:`EnsureActionEnum`.
+    :param diff: the difference found, None if the table was created.
+    :param n_partitions_kept: partitions re-registered after a recreation.
+    """
+
+    action: str
+    diff: T.Optional[SchemaDiff] = None
+    n_partitions_kept: int = 0
+
+
+def _get_partitions(
+    glue_client: "GlueClient",
+    database: str,
+    table: str,
+) -> T.List[T.Dict[str, T.Any]]:
+    paginator = glue_client.get_paginator("get_partitions")
+    return [
+        partition
+        for page in paginator.paginate(DatabaseName=database, TableName=table)
+        for partition in page["Partitions"]
+    ]
+
+
+def _restore_partitions(
+    glue_client: "GlueClient",
+    database: str,
+    table: str,
+    partitions: T.List[T.Dict[str, T.Any]],
+    max_workers: int = 8,
+):
+    """
+    Create partitions again from their ``get_partitions()`` dicts, each with
+    its own storage descriptor, not the one of the table.
+    """
+    partition_inputs = [
+        {
+            key: partition[key]
+            for key in ["Values", "StorageDescriptor", "Parameters"]
+            if key in partition
+        }
+        for partition in partitions
+    ]
+
+    def create(chunk: T.List[T.Dict[str, T.Any]]):
+        res = glue_client.batch_create_partition(
+            DatabaseName=database,
+            TableName=table,
+            PartitionInputList=chunk,
+        )
+        _check_batch_errors(res, "create")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(create, _iter_chunks(partition_inputs, 100)))
+
+
+def ensure_table(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    database: str,
+    table: str,
+    s3dir: str,
+    boto_ses: "boto3.session.Session",
+    partition_cols: T.Optional[T.Sequence[str]] = None,
+    file_format: str = FileFormatEnum.parquet,
+    compression: T.Optional[str] = None,
+    results: T.Optional[T.List["PartitionWriteResult"]] = None,
+    **kwargs,
+) -> EnsureTableResult:
+    """
+    Make the Glue table match the schema of ``df`` with as few changes as
+    possible, instead of ``delete_table()`` + ``create_xxx_table()`` on
+    every run, which costs several API calls and leaves readers without a
+    table in between.
+
+    The desired schema is computed by
+    :func:`~learn_awswrangler.glue_schema.polars_schema_to_glue` and
+    compared with the existing table by :func:`diff_table`:
+
+    - no table: created by :func:`create_parquet_table` /
+      :func:`create_json_table`.
+    - equal: nothing is changed.
+    - compatible (see :attr:`SchemaDiff.is_compatible`): one
+      ``update_table`` call, the partitions are not touched. The table
+      parameters, e.g. partition projection, are kept.
+    - incompatible: the table is recreated. If the partition keys didn't
+      change, the existing partitions are registered again with their own
+      storage descriptor, because their files still have the old format
+      and column types, only a partition key change drops them.
+
+    The partitions of ``results`` are registered in every case, unless the
+    table uses partition projection. Then the projection is widened to
+    them instead, by
+    :func:`~learn_awswrangler.projection.merge_partition_projection`, in
+    the same ``update_table`` call as the schema change. A table whose
+    schema is equal is ``updated`` only if the projection changed.
+
+    :param file_format: see :class:`FileFormatEnum`.
+    :param compression: the ``compression`` used by the writer.
+    :param results: the return value of the writer.
+    :param kwargs: the other arguments of the create function, e.g.
+        ``projection=True``, only used when the table is (re)created, except
+        ``date_range_to_now`` which also applies to a widened projection.
+    """
+    if file_format == FileFormatEnum.parquet:
+        create_table = create_parquet_table
+    elif file_format == FileFormatEnum.json:
+        create_table = create_json_table
+    else:
+        raise ValueError(f"invalid file_format {file_format!r}")
+    glue_client = boto_ses.client("glue")
+
+    def create() -> None:
+        create_table(
+            df=df,
+            database=database,
+            table=table,
+            s3dir=s3dir,
+            boto_ses=boto_ses,
+            partition_cols=partition_cols,
+            compression=compression,
+            results=results,
+            mode="overwrite",
+            **kwargs,
+        )
+
+    table_input = get_table_input(glue_client, database, table)
+    if table_input is None:
+        create()
+        return EnsureTableResult(action=EnsureActionEnum.created)
+
+    columns_types, partitions_types = polars_schema_to_glue(
+        get_schema(df),
+        partition_cols=partition_cols,
+    )
+    diff = diff_table(
+        table_input=table_input,
+        columns_types=columns_types,
+        partitions_types=partitions_types,
+        file_format=file_format,
+        s3dir=s3dir,
+        compression=compression,
+    )
+
+    if not diff.is_compatible:
+        old_partitions = list()
+        if not diff.partition_keys_changed:
+            old_partitions = _get_partitions(glue_client, database, table)
+        glue_client.delete_table(DatabaseName=database, Name=table)
+        create()
+        n_kept = 0
+        if old_partitions:
+            new_values = {
+                tuple(values)
+                for values in get_partitions_values(results or []).values()
+            }
+            kept = [
+                partition
+                for partition in old_partitions
+                if tuple(partition["Values"]) not in new_values
+            ]
+            if kept:
+                _restore_partitions(glue_client, database, table, kept)
+            n_kept = len(kept)
+        return EnsureTableResult(
+            action=EnsureActionEnum.recreated,
+            diff=diff,
+            n_partitions_kept=n_kept,
+        )
+
+    parameters = table_input.setdefault("Parameters", {})
+    is_projection = parameters.get("projection.enabled") == "true"
+    projection_parameters = dict()
+    if results and partition_cols and is_projection:
+        settings = merge_partition_projection(
+            parameters,
+            infer_partition_projection(
+                results=results,
+                partition_cols=partition_cols,
+                schema=get_schema(df),
+                s3dir=s3dir,
+                date_range_to_now=kwargs.get("date_range_to_now", False),
+            ),
+        )
+        projection_parameters = {
+            key: value
+            for key, value in to_table_parameters(settings).items()
+            if parameters.get(key) != value
+        }
+
+    action = EnsureActionEnum.unchanged
+    if not diff.is_equal or projection_parameters:
+        sd = table_input["StorageDescriptor"]
+        if not diff.is_equal:
+            old_types = {col["Name"]: col["Type"] for col in sd.get("Columns", [])}
+            # existing columns keep their position, new ones are appended
+            sd["Columns"] = [
+                {"Name": name, "Type": columns_types[name]} for name in old_types
+            ] + [{"Name": name, "Type": type_} for name, type_ in diff.added.items()]
+            sd["Location"] = s3dir
+            sd["Compressed"] = compression is not None
+            parameters["compressionType"] = compression or "none"
+        parameters.update(projection_parameters)
+        glue_client.update_table(
+            DatabaseName=database,
+            TableInput=table_input,
+            SkipArchive=True,
+        )
+        action = EnsureActionEnum.updated
+
+    if results and partition_cols and not is_projection:
+        register_partitions(
+            glue_client=glue_client,
+            database=database,
+            table=table,
+            partitions_values=get_partitions_values(results),
+        )
+    return EnsureTableResult(action=action, diff=diff)
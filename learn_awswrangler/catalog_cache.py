@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cache the Glue Catalog metadata, so existence checks and schema lookups
+don't call ``GetDatabase`` / ``GetTable`` every time.
+"""
+
+import typing as T
+import os
+import copy
+import json
+import time
+import shutil
+import datetime
+import threading
+import dataclasses
+from collections import OrderedDict
+from urllib.parse import quote
+
+from .catalog import TABLE_INPUT_KEYS
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_glue import GlueClient
+
+#: a Glue table or database, or None if it doesn't exist
+Metadata = T.Optional[T.Dict[str, T.Any]]
+
+
+def _encode(obj: T.Any) -> T.Any:
+    if isinstance(obj, datetime.datetime):
+        return {"__datetime__": obj.isoformat()}
+    raise TypeError(f"{type(obj)} is not JSON serializable")
+
+
+def _decode(obj: T.Dict[str, T.Any]) -> T.Any:
+    if "__datetime__" in obj:
+        return datetime.datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def get_version(metadata: Metadata) -> T.Optional[str]:
+    """
+    The version of a Glue table or database, from ``VersionId`` and
+    ``UpdateTime`` (``CreateTime`` if it was never updated). Two metadata
+    with the same version have the same content.
+    """
+    if metadata is None:
+        return None
+    update_time = metadata.get("UpdateTime") or metadata.get("CreateTime")
+    if isinstance(update_time, datetime.datetime):
+        update_time = update_time.isoformat()
+    return f"{metadata.get('VersionId')}@{update_time}"
+
+
+@dataclasses.dataclass
+class CacheEntry:
+    """
+    :param value: the ``get_table()["Table"]`` / ``get_database()["Database"]``
+        dict, None if it doesn't exist.
+    :param version: see :func:`get_version`.
+    :param fetched_at: when the value was fetched or last revalidated.
+    :param columns_types: the memoized
+        :meth:`GlueCatalogCache.get_columns_types` of this version.
+    """
+
+    value: Metadata
+    version: T.Optional[str]
+    fetched_at: float
+    columns_types: T.Optional[T.Tuple[T.Dict[str, str], T.Dict[str, str]]] = None
+
+
+class GlueCatalogCache:
+    """
+    A cache of Glue databases and tables: an in-process LRU of ``maxsize``
+    entries, optionally backed by JSON files in ``cache_dir`` so it is
+    shared with other processes and survives restarts.
+
+    - An entry younger than ``ttl`` seconds is served without any API call,
+      including "doesn't exist".
+    - An older entry is revalidated with one ``GetTable`` /
+      ``GetDatabase`` call. If the ``VersionId`` / ``UpdateTime`` didn't
+      change, the derived data of the entry, e.g. the parsed
+      :meth:`get_columns_types`, is kept.
+    - :meth:`refresh_database` revalidates all tables of a database with one
+      ``GetTables`` call per 100 tables, instead of one call per table.
+    - Call :meth:`invalidate` after you create, update or delete a table
+      yourself, the cache doesn't see those writes.
+
+    Example::
+
+        >>> cache = GlueCatalogCache(bsm.glue_client, ttl=300)
+        >>> if not cache.table_exists("db", "events"):
+        ...     create_parquet_table(...)
+        ...     cache.invalidate("db", "events")
+
+    :param glue_client: boto3 Glue client.
+    :param ttl: seconds an entry is trusted without revalidation.
+    :param maxsize: the number of entries kept in memory.
+    :param cache_dir: folder of the on-disk store, None for memory only.
+    """
+
+    def __init__(
+        self,
+        glue_client: "GlueClient",
+        ttl: float = 300,
+        maxsize: int = 1024,
+        cache_dir: T.Optional[str] = None,
+    ):
+        self.glue_client = glue_client
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._entries: "OrderedDict[T.Tuple[str, ...], CacheEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.n_hits = 0
+        self.n_calls = 0
+
+    # --- storage ---
+    def _get_path(self, key: T.Tuple[str, ...]) -> str:
+        # ${cache_dir}/database/${database}.json
+        # ${cache_dir}/table/${database}/${table}.json
+        *folders, name = [quote(part, safe="") for part in key]
+        return os.path.join(self.cache_dir, *folders, f"{name}.json")
+
+    def _load(self, key: T.Tuple[str, ...]) -> T.Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._get_path(key), "r") as f:
+                data = json.load(f, object_hook=_decode)
+        except (FileNotFoundError, ValueError):
+            return None
+        entry = CacheEntry(
+            value=data["value"],
+            version=data["version"],
+            fetched_at=data["fetched_at"],
+        )
+        self._put(key, entry, persist=False)
+        return entry
+
+    def _put(self, key: T.Tuple[str, ...], entry: CacheEntry, persist: bool = True):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        if persist and self.cache_dir is not None:
+            path = self._get_path(key)
+            data = {
+                "value": entry.value,
+                "version": entry.version,
+                "fetched_at": entry.fetched_at,
+            }
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, default=_encode)
+            os.replace(tmp_path, path)
+
+    def _delete(self, key: T.Tuple[str, ...]):
+        self._entries.pop(key, None)
+        if self.cache_dir is not None:
+            try:
+                os.remove(self._get_path(key))
+            except FileNotFoundError:
+                pass
+
+    def _get(
+        self,
+        key: T.Tuple[str, ...],
+        fetch: T.Callable[[], Metadata],
+    ) -> CacheEntry:
+        with self._lock:
+            entry = self._load(key)
+            now = time.time()
+            if entry is not None and now - entry.fetched_at < self.ttl:
+                self.n_hits += 1
+                return entry
+        # call Glue outside the lock, other keys are still served
+        value = fetch()
+        version = get_version(value)
+        with self._lock:
+            self.n_calls += 1
+            if entry is not None and entry.version == version:
+                entry.fetched_at = now
+            else:
+                entry = CacheEntry(value=value, version=version, fetched_at=now)
+            self._put(key, entry)
+        return entry
+
+    def _fetch_database(self, database: str) -> Metadata:
+        try:
+            return self.glue_client.get_database(Name=database)["Database"]
+        except self.glue_client.exceptions.EntityNotFoundException:
+            return None
+
+    def _fetch_table(self, database: str, table: str) -> Metadata:
+        try:
+            return self.glue_client.get_table(DatabaseName=database, Name=table)[
+                "Table"
+            ]
+        except self.glue_client.exceptions.EntityNotFoundException:
+            return None
+
+    # --- public API ---
+    def get_database(self, database: str) -> Metadata:
+        """
+        The ``get_database()["Database"]`` dict, None if it doesn't exist.
+        The dict is a copy, changing it doesn't change the cache.
+        """
+        key = ("database", database)
+        value = self._get(key, lambda: self._fetch_database(database)).value
+        return copy.deepcopy(value)
+
+    def get_table(self, database: str, table: str) -> Metadata:
+        """
+        The ``get_table()["Table"]`` dict, None if it doesn't exist.
+        The dict is a copy, changing it doesn't change the cache.
+        """
+        key = ("table", database, table)
+        value = self._get(key, lambda: self._fetch_table(database, table)).value
+        return copy.deepcopy(value)
+
+    def database_exists(self, database: str) -> bool:
+        return self.get_database(database) is not None
+
+    def table_exists(self, database: str, table: str) -> bool:
+        return self.get_table(database, table) is not None
+
+    def get_table_input(self, database: str, table: str) -> Metadata:
+        """
+        The cached version of :func:`~learn_awswrangler.catalog.get_table_input`,
+        a copy that is safe to modify and pass to ``update_table``.
+        """
+        value = self.get_table(database, table)
+        if value is None:
+            return None
+        return {key: value for key, value in value.items() if key in TABLE_INPUT_KEYS}
+
+    def get_columns_types(
+        self,
+        database: str,
+        table: str,
+    ) -> T.Optional[T.Tuple[T.Dict[str, str], T.Dict[str, str]]]:
+        """
+        The ``(columns_types, partitions_types)`` of a table, parsed once
+        per table version. None if the table doesn't exist. The dicts are
+        copies, changing them doesn't change the cache.
+        """
+        key = ("table", database, table)
+        entry = self._get(key, lambda: self._fetch_table(database, table))
+        if entry.value is None:
+            return None
+        if entry.columns_types is None:
+            columns = entry.value.get("StorageDescriptor", {}).get("Columns", [])
+            entry.columns_types = (
+                {col["Name"]: col["Type"] for col in columns},
+                {
+                    col["Name"]: col["Type"]
+                    for col in entry.value.get("PartitionKeys", [])
+                },
+            )
+        columns_types, partitions_types = entry.columns_types
+        return dict(columns_types), dict(partitions_types)
+
+    def refresh_database(self, database: str) -> int:
+        """
+        Revalidate every cached table of ``database`` and cache the others,
+        with paginated ``GetTables`` calls. Cached tables that no longer
+        exist are cached as missing.
+
+        :return: the number of tables in the database.
+        """
+        now = time.time()
+        tables = dict()
+        paginator = self.glue_client.get_paginator("get_tables")
+        for page in paginator.paginate(DatabaseName=database):
+            self.n_calls += 1
+            for value in page["TableList"]:
+                tables[value["Name"]] = value
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == "table" and key[1] == database and key[2] not in tables:
+                    self._put(key, CacheEntry(value=None, version=None, fetched_at=now))
+            for table, value in tables.items():
+                key = ("table", database, table)
+                entry = self._load(key)
+                version = get_version(value)
+                if entry is not None and entry.version == version:
+                    entry.fetched_at = now
+                else:
+                    entry = CacheEntry(value=value, version=version, fetched_at=now)
+                self._put(key, entry)
+        return len(tables)
+
+    def invalidate(self, database: str, table: T.Optional[str] = None):
+        """
+        Drop a table from the cache, or a database and all its cached
+        tables if ``table`` is None. Call it after writing to the catalog.
+        """
+        with self._lock:
+            if table is not None:
+                self._delete(("table", database, table))
+                return
+            self._delete(("database", database))
+            for key in list(self._entries):
+                if key[0] == "table" and key[1] == database:
+                    self._delete(key)
+            if self.cache_dir is not None:
+                shutil.rmtree(
+                    os.path.join(self.cache_dir, "table", quote(database, safe="")),
+                    ignore_errors=True,
+                )
+
+    def clear(self):
+        """
+        Drop everything, including the on-disk store.
+        """
+        with self._lock:
+            self._entries.clear()
+            if self.cache_dir is not None:
+                for folder in ["database", "table"]:
+                    shutil.rmtree(
+                        os.path.join(self.cache_dir, folder), ignore_errors=True
+                    )
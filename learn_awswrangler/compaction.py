@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compact the small Parquet files of a Hive partitioned dataset into right
+sized files.
+"""
+
+import typing as T
+import json
+import uuid
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+
+from .s3_utils import (
+    DEFAULT_MAX_WORKERS,
+    split_s3_uri,
+    to_s3_dir_uri,
+    iter_objects,
+    delete_keys,
+)
+from .s3_multipart import DEFAULT_PART_SIZE, MB, MultipartUploadWriter
+from .catalog import _get_partitions
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3 import S3Client
+    from mypy_boto3_glue import GlueClient
+
+DEFAULT_TARGET_FILE_BYTES = 128 * MB
+
+#: the hidden folder under the table root that holds the journals and the
+#: snapshots of the partitions being compacted
+COMPACTION_FOLDER = "_compaction"
+
+JOURNAL_NAME = "_journal.json"
+
+
+@dataclasses.dataclass
+class CompactionResult:
+    """
+    Before / after summary of one partition.
+
+    :param location: the S3 URI of the partition directory, ends with ``/``.
+    :param compacted: False if the partition was skipped.
+    """
+
+    location: str
+    compacted: bool
+    n_files_before: int
+    n_bytes_before: int
+    n_files_after: int
+    n_bytes_after: int
+
+
+def _plan_groups(
+    objects: T.List[T.Dict[str, T.Any]],
+    target_file_bytes: int,
+) -> T.List[T.List[T.Dict[str, T.Any]]]:
+    """
+    Pack files into groups of at most ``target_file_bytes`` in total, in
+    listing order. A group always has at least one file.
+    """
+    groups = list()
+    group = list()
+    group_size = 0
+    for obj in objects:
+        if group and group_size + obj["Size"] > target_file_bytes:
+            groups.append(group)
+            group = list()
+            group_size = 0
+        group.append(obj)
+        group_size += obj["Size"]
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _is_hidden(relative_key: str) -> bool:
+    return any(part.startswith(("_", ".")) for part in relative_key.split("/"))
+
+
+@dataclasses.dataclass
+class _Catalog:
+    glue_client: "GlueClient"
+    database: str
+    table: str
+    #: partition location -> ``get_partitions()`` dict
+    partitions: T.Dict[str, T.Dict[str, T.Any]]
+
+
+def _set_partition_location(
+    catalog: _Catalog,
+    partition: T.Dict[str, T.Any],
+    location: str,
+):
+    """
+    Point a Glue partition to ``location`` with one ``update_partition``
+    call, Athena switches from one location to the other atomically.
+    """
+    partition_input = {
+        key: partition[key]
+        for key in ["Values", "StorageDescriptor", "Parameters"]
+        if key in partition
+    }
+    partition_input["StorageDescriptor"] = dict(
+        partition["StorageDescriptor"], Location=location
+    )
+    catalog.glue_client.update_partition(
+        DatabaseName=catalog.database,
+        TableName=catalog.table,
+        PartitionValueList=partition["Values"],
+        PartitionInput=partition_input,
+    )
+
+
+def _load_catalog(
+    glue_client: T.Optional["GlueClient"],
+    database: T.Optional[str],
+    table: T.Optional[str],
+) -> T.Optional[_Catalog]:
+    if glue_client is None:
+        return None
+    if database is None or table is None:
+        raise ValueError("database and table are required with glue_client")
+    partitions = {
+        to_s3_dir_uri(partition["StorageDescriptor"]["Location"]): partition
+        for partition in _get_partitions(glue_client, database, table)
+    }
+    return _Catalog(glue_client, database, table, partitions)
+
+
+def _delete_staging(
+    s3_client: "S3Client",
+    bucket: str,
+    staging_folder: str,
+):
+    # the journal goes last, it is what the next run reconciles
+    journal_key = f"{staging_folder}{JOURNAL_NAME}"
+    keys = [
+        obj["Key"]
+        for obj in iter_objects(s3_client, bucket, staging_folder)
+        if obj["Key"] != journal_key
+    ]
+    delete_keys(s3_client, bucket, keys)
+    delete_keys(s3_client, bucket, [journal_key])
+
+
+def _reconcile(
+    s3_client: "S3Client",
+    bucket: str,
+    journal: T.Dict[str, T.Any],
+    catalog: T.Optional[_Catalog],
+):
+    """
+    Finish or roll back an interrupted compaction: if every output was
+    uploaded the remaining inputs are deleted, otherwise the outputs are.
+    Then the Glue partition is pointed back to the partition folder and the
+    snapshot is deleted.
+    """
+    folder = journal["folder"]
+    existing = {obj["Key"] for obj in iter_objects(s3_client, bucket, folder)}
+    if all(key in existing for key in journal["outputs"]):
+        to_delete = [key for key in journal["inputs"] if key in existing]
+    else:
+        to_delete = [key for key in journal["outputs"] if key in existing]
+    delete_keys(s3_client, bucket, to_delete)
+    location = f"s3://{bucket}/{folder}"
+    if catalog is not None:
+        # the partition may still point to the snapshot
+        for uri in [location, f"s3://{bucket}/{journal['staging_folder']}"]:
+            if uri in catalog.partitions:
+                _set_partition_location(catalog, catalog.partitions[uri], location)
+    _delete_staging(s3_client, bucket, journal["staging_folder"])
+
+
+def recover_compactions(
+    s3dir: str,
+    s3_client: "S3Client",
+    glue_client: T.Optional["GlueClient"] = None,
+    database: T.Optional[str] = None,
+    table: T.Optional[str] = None,
+) -> int:
+    """
+    Reconcile the compactions of ``s3dir`` that were interrupted, e.g. by a
+    crash, from the journals they left. :func:`compact_partitions` calls it
+    before it starts, so a dataset is never left with both the small files
+    and their compacted copy.
+
+    :return: the number of partitions reconciled.
+    """
+    s3dir = to_s3_dir_uri(s3dir)
+    bucket, prefix = split_s3_uri(s3dir)
+    catalog = _load_catalog(glue_client, database, table)
+    journal_keys = [
+        obj["Key"]
+        for obj in iter_objects(s3_client, bucket, f"{prefix}{COMPACTION_FOLDER}/")
+        if obj["Key"].endswith(f"/{JOURNAL_NAME}")
+    ]
+    for key in journal_keys:
+        body = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+        _reconcile(s3_client, bucket, json.loads(body), catalog)
+    return len(journal_keys)
+
+
+def compact_partitions(
+    s3dir: str,
+    s3_client: "S3Client",
+    storage_options: T.Optional[T.Dict[str, str]] = None,
+    target_file_bytes: int = DEFAULT_TARGET_FILE_BYTES,
+    small_file_bytes: T.Optional[int] = None,
+    min_small_files: int = 2,
+    compression: str = "snappy",
+    row_group_size: T.Optional[int] = None,
+    part_size: int = DEFAULT_PART_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    glue_client: T.Optional["GlueClient"] = None,
+    database: T.Optional[str] = None,
+    table: T.Optional[str] = None,
+) -> T.List[CompactionResult]:
+    """
+    Merge the small Parquet files in every partition folder under ``s3dir``
+    into files of about ``target_file_bytes``.
+
+    For each partition with at least ``min_small_files`` files smaller than
+    ``small_file_bytes``, the small files are packed into groups, each group
+    is streamed through ``pl.scan_parquet(...).sink_parquet(...)`` into a
+    multipart upload, so neither the inputs nor the output are materialized.
+    Once all outputs of a partition are complete, the input files are
+    deleted with ``delete_objects``. Files that are already big enough and
+    partitions with too few small files are left untouched.
+
+    S3 can't replace several objects atomically, so the swap goes through
+    the Glue partition, which Athena reads atomically:
+
+    1. A journal with the input and output keys is written to
+       ``${s3dir}_compaction/${run_id}/${partition}/_journal.json``.
+    2. The files of the partition are copied (server side) next to it, and
+       the Glue partition is pointed to this snapshot.
+    3. The outputs are uploaded to the partition folder and the inputs are
+       deleted.
+    4. The Glue partition is pointed back to the partition folder, then the
+       snapshot and the journal are deleted.
+
+    Catalog readers see either the old files or the new ones, never both.
+    If the run is interrupted, the next run (or :func:`recover_compactions`)
+    finishes or rolls back the partition from its journal. Without
+    ``glue_client``, or for partitions that are not registered (partition
+    projection), there is no snapshot: the journal still guarantees that
+    no duplicate survives a crash, but a reader listing the partition
+    folder during step 3 sees both the inputs and the outputs.
+
+    Don't run two compactions of the same table at the same time.
+
+    :param s3dir: S3 URI of the table root folder.
+    :param s3_client: boto3 S3 client.
+    :param storage_options: Polars ``storage_options`` to read S3, see
+        :func:`~learn_awswrangler.s3_utils.get_polars_storage_options`.
+        If None, Polars picks up the credentials from the environment.
+    :param target_file_bytes: the desired size of each output file.
+    :param small_file_bytes: files smaller than this are compacted, default
+        is half of ``target_file_bytes``.
+    :param min_small_files: skip the partition if it has fewer small files.
+    :param compression: Parquet compression codec of the output files.
+    :param row_group_size: rows per Parquet row group of the output files.
+    :param part_size: multipart upload part size in bytes.
+    :param max_workers: number of partitions compacted concurrently.
+    :param glue_client: boto3 Glue client, with ``database`` and ``table``
+        the Glue table of the dataset, to swap the partitions atomically.
+
+    :return: one :class:`CompactionResult` per partition, sorted by location.
+    """
+    if small_file_bytes is None:
+        small_file_bytes = target_file_bytes // 2
+    s3dir = to_s3_dir_uri(s3dir)
+    bucket, prefix = split_s3_uri(s3dir)
+    recover_compactions(s3dir, s3_client, glue_client, database, table)
+    catalog = _load_catalog(glue_client, database, table)
+    run_id = uuid.uuid4().hex[:8]
+
+    partitions: T.Dict[str, T.List[T.Dict[str, T.Any]]] = dict()
+    for obj in iter_objects(s3_client, bucket, prefix):
+        key = obj["Key"]
+        if not key.endswith(".parquet") or _is_hidden(key[len(prefix) :]):
+            continue
+        folder = key.rsplit("/", 1)[0] + "/"
+        partitions.setdefault(folder, list()).append(obj)
+
+    def compact_one(folder: str) -> CompactionResult:
+        objects = partitions[folder]
+        location = f"s3://{bucket}/{folder}"
+        result = CompactionResult(
+            location=location,
+            compacted=False,
+            n_files_before=len(objects),
+            n_bytes_before=sum(obj["Size"] for obj in objects),
+            n_files_after=len(objects),
+            n_bytes_after=sum(obj["Size"] for obj in objects),
+        )
+        small_objects = [obj for obj in objects if obj["Size"] < small_file_bytes]
+        if len(small_objects) < min_small_files:
+            return result
+
+        groups = _plan_groups(small_objects, target_file_bytes)
+        output_keys = [
+            f"{folder}part-{run_id}-{ith:05d}.parquet" for ith in range(len(groups))
+        ]
+        staging_folder = f"{prefix}{COMPACTION_FOLDER}/{run_id}/{folder[len(prefix) :]}"
+        journal = {
+            "folder": folder,
+            "staging_folder": staging_folder,
+            "inputs": [obj["Key"] for obj in small_objects],
+            "outputs": output_keys,
+        }
+        s3_client.put_object(
+            Bucket=bucket,
+            Key=f"{staging_folder}{JOURNAL_NAME}",
+            Body=json.dumps(journal).encode("utf-8"),
+        )
+        partition = None
+        if catalog is not None:
+            partition = catalog.partitions.get(location)
+        if partition is not None:
+            for obj in objects:
+                s3_client.copy(
+                    {"Bucket": bucket, "Key": obj["Key"]},
+                    bucket,
+                    staging_folder + obj["Key"][len(folder) :],
+                )
+            _set_partition_location(
+                catalog, partition, f"s3://{bucket}/{staging_folder}"
+            )
+
+        new_sizes = list()
+        for group, output_key in zip(groups, output_keys):
+            lf = pl.scan_parquet(
+                [f"s3://{bucket}/{obj['Key']}" for obj in group],
+                storage_options=storage_options,
+            )
+            with MultipartUploadWriter(
+                s3_client=s3_client,
+                bucket=bucket,
+                key=output_key,
+                part_size=part_size,
+            ) as f:
+                lf.sink_parquet(
+                    f,
+                    compression=compression,
+                    row_group_size=row_group_size,
+                )
+            new_sizes.append(f.size)
+
+        delete_keys(s3_client, bucket, journal["inputs"])
+        if partition is not None:
+            _set_partition_location(catalog, partition, location)
+        _delete_staging(s3_client, bucket, staging_folder)
+
+        result.compacted = True
+        result.n_files_after = len(objects) - len(small_objects) + len(new_sizes)
+        result.n_bytes_after = (
+            result.n_bytes_before
+            - sum(obj["Size"] for obj in small_objects)
+            + sum(new_sizes)
+        )
+        return result
+
+    folders = sorted(partitions)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(compact_one, folders))
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+Streaming compression for text formats like NDJSON.
+"""
+
+import typing as T
+import gzip
+import contextlib
+
+
+class CompressionEnum:
+    """
+    Supported compression codecs for text formats.
+
+    Athena detects the codec of text files from the file extension, see
+    :data:`EXTENSIONS`.
+    """
+
+    gzip = "gzip"
+    zstd = "zstd"
+
+
+EXTENSIONS = {
+    CompressionEnum.gzip: ".gz",
+    CompressionEnum.zstd: ".zst",
+}
+
+
+def get_extension(compression: T.Optional[str]) -> str:
+    """
+    Get the file extension of a compression codec, ``""`` if None.
+    """
+    if compression is None:
+        return ""
+    try:
+        return EXTENSIONS[compression]
+    except KeyError:
+        raise ValueError(
+            f"invalid compression {compression!r}, "
+            f"valid values are {list(EXTENSIONS)}"
+        )
+
+
+@contextlib.contextmanager
+def open_compressor(
+    f: T.BinaryIO,
+    compression: T.Optional[str],
+    level: T.Optional[int] = None,
+) -> T.Iterator[T.BinaryIO]:
+    """
+    Wrap a writable binary file, everything written to the returned file is
+    compressed chunk by chunk into ``f``. ``f`` is not closed on exit.
+
+    ``zstd`` requires the `zstandard <https://pypi.org/project/zstandard/>`_
+    package.
+
+    :param f: the output file.
+    :param compression: None, ``"gzip"`` or ``"zstd"``.
+    :param level: compression level, default is 6 for gzip and 3 for zstd.
+    """
+    get_extension(compression)
+    if compression is None:
+        yield f
+    elif compression == CompressionEnum.gzip:
+        with gzip.GzipFile(
+            fileobj=f,
+            mode="wb",
+            compresslevel=6 if level is None else level,
+            mtime=0,
+        ) as f_gzip:
+            yield f_gzip
+    else:  # zstd
+        try:
+            import zstandard
+        except ImportError as e:  # pragma: no cover
+            raise ImportError(
+                "zstd compression requires the zstandard package, "
+                "run 'pip install zstandard'"
+            ) from e
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        with compressor.stream_writer(f, closefd=False) as f_zstd:
+            yield f_zstd
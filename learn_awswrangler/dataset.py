@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+
+"""
+Write a Polars DataFrame to an S3 Parquet dataset and its Glue table in one
+call, the pandas free equivalent of ``wr.s3.to_parquet(dataset=True)``.
+"""
+
+import typing as T
+import uuid
+import functools
+
+import polars as pl
+import pyarrow.parquet as pq
+
+from .s3_utils import DEFAULT_MAX_WORKERS, to_s3_dir_uri
+from .s3_multipart import DEFAULT_PART_SIZE
+from .partition import hive_path_expr
+from .writer import (
+    DEFAULT_LAZY_BATCH_ROWS,
+    PartitionWriteResult,
+    ExecutorEnum,
+    iter_lazy_batches,
+    write_partitions,
+)
+from .catalog import create_parquet_table, get_partitions_values
+from .s3_delete import delete_prefix
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    import boto3
+    from mypy_boto3_s3 import S3Client
+
+
+class ModeEnum:
+    """
+    The write modes of :func:`to_parquet_dataset`, same as awswrangler.
+    """
+
+    append = "append"
+    overwrite = "overwrite"
+    overwrite_partitions = "overwrite_partitions"
+
+
+#: the ``pyarrow.parquet.ParquetWriter`` arguments awswrangler uses
+WRANGLER_WRITER_KWARGS = {
+    "coerce_timestamps": "ms",
+    "flavor": "spark",
+    "version": "1.0",
+    "use_dictionary": True,
+    "write_statistics": True,
+}
+
+
+def _write_arrow_batches(
+    frames: T.Iterable[pl.DataFrame],
+    schema: pl.Schema,
+    f: T.BinaryIO,
+    compression: T.Optional[str],
+    row_group_size: T.Optional[int],
+    writer_kwargs: T.Dict[str, T.Any],
+):
+    """
+    Write the Arrow record batches behind ``frames`` with the pyarrow
+    Parquet writer, ``df.to_arrow()`` shares the Polars memory for most
+    types.
+    """
+    with pq.ParquetWriter(
+        f,
+        schema=pl.DataFrame(schema=schema).to_arrow().schema,
+        compression="NONE" if compression is None else compression,
+        **writer_kwargs,
+    ) as writer:
+        for frame in frames:
+            table = frame.to_arrow()
+            for batch in table.to_batches(max_chunksize=row_group_size):
+                writer.write_batch(batch, row_group_size=row_group_size)
+
+
+def _write_arrow_parquet(
+    df: pl.DataFrame,
+    f: T.BinaryIO,
+    compression: T.Optional[str],
+    row_group_size: T.Optional[int],
+    writer_kwargs: T.Dict[str, T.Any],
+):
+    _write_arrow_batches([df], df.schema, f, compression, row_group_size, writer_kwargs)
+
+
+def _sink_arrow_parquet(
+    lf: pl.LazyFrame,
+    f: T.BinaryIO,
+    compression: T.Optional[str],
+    row_group_size: T.Optional[int],
+    writer_kwargs: T.Dict[str, T.Any],
+):
+    """
+    Collect ``lf`` by the streaming engine, ``row_group_size`` rows at a
+    time, into the same writer as :func:`_write_arrow_parquet`.
+    """
+    _write_arrow_batches(
+        iter_lazy_batches(lf, row_group_size or DEFAULT_LAZY_BATCH_ROWS),
+        lf.collect_schema(),
+        f,
+        compression,
+        row_group_size,
+        writer_kwargs,
+    )
+
+
+def _list_partition_dirs(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    s3dir: str,
+    partition_cols: T.Sequence[str],
+) -> T.List[str]:
+    hive_paths = (
+        df.lazy()
+        .select(hive_path_expr(partition_cols).alias("hive_path"))
+        .unique()
+        .collect()["hive_path"]
+    )
+    return [f"{s3dir}{hive_path}" for hive_path in sorted(hive_paths)]
+
+
+def to_parquet_dataset(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    s3dir: str,
+    database: str,
+    table: str,
+    s3_client: "S3Client",
+    boto_ses: "boto3.session.Session",
+    partition_cols: T.Optional[T.Sequence[str]] = None,
+    mode: str = ModeEnum.append,
+    compression: T.Optional[str] = "snappy",
+    row_group_size: T.Optional[int] = None,
+    pyarrow_additional_kwargs: T.Optional[T.Dict[str, T.Any]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    executor: str = ExecutorEnum.thread,
+) -> T.Dict[str, T.Any]:
+    """
+    Write a DataFrame to ``s3dir`` as a Hive partitioned Parquet dataset
+    and create / update the Glue table, like
+    ``wr.s3.to_parquet(df.to_pandas(), path=s3dir, dataset=True, ...)``
+    without the pandas copy and dtype mapping.
+
+    Every file is written from the Arrow record batches of ``df.to_arrow()``
+    by ``pyarrow.parquet.ParquetWriter`` with the arguments awswrangler
+    uses (:data:`WRANGLER_WRITER_KWARGS`), and streamed to S3 by the
+    partitioned writer, see
+    :func:`~learn_awswrangler.writer.write_partitioned_parquet`. A LazyFrame
+    is collected by the Polars streaming engine ``row_group_size`` rows at
+    a time (default
+    :data:`~learn_awswrangler.writer.DEFAULT_LAZY_BATCH_ROWS`) into the same
+    writer, so both give the same Parquet schema and metadata. The files
+    are named ``${uuid}.${compression}.parquet`` like awswrangler, one file
+    per partition, so appends never overwrite each other.
+
+    The Glue table is created by
+    :func:`~learn_awswrangler.catalog.create_parquet_table`, it has the same
+    storage descriptor and table parameters as the one awswrangler creates,
+    and the new partitions are registered.
+
+    :param s3dir: S3 URI of the table root folder.
+    :param mode: see :class:`ModeEnum`. ``overwrite`` deletes everything
+        under ``s3dir`` first and recreates the table,
+        ``overwrite_partitions`` only deletes the partitions in ``df``.
+    :param compression: Parquet compression codec, None for no compression.
+    :param row_group_size: rows per record batch and row group.
+    :param pyarrow_additional_kwargs: overrides
+        :data:`WRANGLER_WRITER_KWARGS`, same as the argument of awswrangler.
+
+    :return: ``{"paths": [...], "partitions_values": {...}}``, the same as
+        awswrangler.
+    """
+    if mode not in (
+        ModeEnum.append,
+        ModeEnum.overwrite,
+        ModeEnum.overwrite_partitions,
+    ):
+        raise ValueError(f"invalid mode {mode!r}")
+    s3dir = to_s3_dir_uri(s3dir)
+    partition_cols = list() if partition_cols is None else list(partition_cols)
+    writer_kwargs = {**WRANGLER_WRITER_KWARGS, **(pyarrow_additional_kwargs or {})}
+
+    if mode == ModeEnum.overwrite:
+        delete_prefix(s3dir, s3_client, max_workers=max_workers)
+    elif mode == ModeEnum.overwrite_partitions and partition_cols:
+        for partition_dir in _list_partition_dirs(df, s3dir, partition_cols):
+            delete_prefix(partition_dir, s3_client, max_workers=max_workers)
+
+    ext = ".parquet" if compression is None else f".{compression}.parquet"
+    filename = f"{uuid.uuid4().hex}{ext}"
+    writer_options = dict(
+        compression=compression,
+        row_group_size=row_group_size,
+        writer_kwargs=writer_kwargs,
+    )
+    results: T.List[PartitionWriteResult] = write_partitions(
+        df=df,
+        s3dir=s3dir,
+        partition_cols=partition_cols,
+        s3_client=s3_client,
+        serialize=functools.partial(_write_arrow_parquet, **writer_options),
+        sink=functools.partial(_sink_arrow_parquet, **writer_options),
+        filename=filename,
+        drop_partition_cols=True,
+        part_size=DEFAULT_PART_SIZE,
+        max_workers=max_workers,
+        executor=executor,
+    )
+
+    create_parquet_table(
+        df=df,
+        database=database,
+        table=table,
+        s3dir=s3dir,
+        boto_ses=boto_ses,
+        partition_cols=partition_cols,
+        compression=compression,
+        results=results if partition_cols else None,
+        mode=ModeEnum.overwrite if mode == ModeEnum.overwrite else ModeEnum.append,
+    )
+    return {
+        "paths": [file.uri for result in results for file in result.files],
+        "partitions_values": get_partitions_values(results) if partition_cols else {},
+    }
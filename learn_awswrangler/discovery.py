@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+Discover the Hive partitions under an S3 prefix by listing the folder tree
+level by level, instead of listing every object.
+"""
+
+import typing as T
+from concurrent.futures import ThreadPoolExecutor
+
+from .s3_utils import DEFAULT_MAX_WORKERS, split_s3_uri, to_s3_dir_uri
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3 import S3Client
+
+
+def list_sub_folders(
+    s3_client: "S3Client",
+    bucket: str,
+    prefix: str,
+) -> T.List[str]:
+    """
+    List the ``CommonPrefixes`` of ``prefix`` with ``Delimiter="/"``, the
+    direct sub folders, as keys ending with ``/``.
+    """
+    paginator = s3_client.get_paginator("list_objects_v2")
+    folders = list()
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+        for common_prefix in page.get("CommonPrefixes", []):
+            folders.append(common_prefix["Prefix"])
+    return folders
+
+
+def discover_partitions(
+    s3dir: str,
+    s3_client: "S3Client",
+    partition_cols: T.Optional[T.Sequence[str]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> T.Dict[str, T.List[str]]:
+    """
+    Find the Hive partitions (``k=v/.../``) under ``s3dir``.
+
+    A flat ``list_objects_v2`` returns 1000 keys per request, one page
+    after the other, so it takes ``n_objects / 1000`` round trips in a row
+    and gets slower with every file. Here each level of the folder tree is
+    listed with ``Delimiter="/"``, which only returns the sub folders, and
+    all folders of a level are listed at the same time by ``max_workers``
+    threads. The number of round trips in a row is the depth of the tree,
+    plus the number of folders of a level divided by ``max_workers``,
+    whatever the number of files. See
+    ``docs/source/08-Parallel-Partition-Discovery`` for a benchmark.
+
+    :param s3dir: S3 URI of the table root folder.
+    :param s3_client: boto3 S3 client, shared by all workers. Create it with
+        :func:`~learn_awswrangler.writer.new_s3_client` so its connection
+        pool fits ``max_workers``.
+    :param partition_cols: the expected partition columns, in path order.
+        If given, the tree is walked exactly that deep, the folders that
+        don't match are ignored and the partition folders themselves are
+        not listed. If None, the walk goes down as long as there are
+        ``k=v`` folders.
+    :param max_workers: number of concurrent list requests.
+
+    :return: partition location -> partition values, sorted by location,
+        the ``partitions_values`` argument of
+        :func:`~learn_awswrangler.catalog.register_partitions`.
+    """
+    s3dir = to_s3_dir_uri(s3dir)
+    bucket, prefix = split_s3_uri(s3dir)
+    partition_cols = None if partition_cols is None else list(partition_cols)
+
+    def list_level(folder: str) -> T.List[str]:
+        return list_sub_folders(s3_client, bucket, folder)
+
+    # (key of the folder, partition values so far)
+    frontier: T.List[T.Tuple[str, T.List[str]]] = [(prefix, [])]
+    partitions: T.Dict[str, T.List[str]] = dict()
+    depth = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while frontier:
+            if partition_cols is not None and depth == len(partition_cols):
+                for folder, values in frontier:
+                    partitions[f"s3://{bucket}/{folder}"] = values
+                break
+            next_frontier = list()
+            for (folder, values), sub_folders in zip(
+                frontier, executor.map(list_level, [folder for folder, _ in frontier])
+            ):
+                children = list()
+                for sub_folder in sub_folders:
+                    name = sub_folder[len(folder) : -1]
+                    if "=" not in name:
+                        continue
+                    key, value = name.split("=", 1)
+                    if partition_cols is not None and key != partition_cols[depth]:
+                        continue
+                    children.append((sub_folder, values + [value]))
+                if children:
+                    next_frontier.extend(children)
+                elif partition_cols is None and depth > 0:
+                    # no k=v sub folder, this is a partition
+                    partitions[f"s3://{bucket}/{folder}"] = values
+            frontier = next_frontier
+            depth += 1
+    return dict(sorted(partitions.items()))
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+"""
+Convert Polars schema to AWS Glue Catalog column types.
+"""
+
+import typing as T
+import functools
+
+import polars as pl
+
+
+def get_schema(df: T.Union[pl.DataFrame, pl.LazyFrame]) -> pl.Schema:
+    """
+    Get the schema of a DataFrame or LazyFrame.
+
+    For a LazyFrame, the schema is resolved by ``collect_schema()`` from the
+    query plan (and the file headers / footers of the scan), no data is read.
+    """
+    if isinstance(df, pl.LazyFrame):
+        return df.collect_schema()
+    return df.schema
+
+
+_SIMPLE_GLUE_TYPES: T.Dict[T.Type[pl.DataType], str] = {
+    pl.Int8: "tinyint",
+    pl.Int16: "smallint",
+    pl.Int32: "int",
+    pl.Int64: "bigint",
+    # widened like ``wr.catalog.extract_athena_types``, Athena is signed
+    pl.UInt8: "smallint",
+    pl.UInt16: "int",
+    pl.UInt32: "bigint",
+    pl.UInt64: "bigint",
+    pl.Float32: "float",
+    pl.Float64: "double",
+    pl.String: "string",
+    pl.Categorical: "string",
+    pl.Enum: "string",
+    pl.Null: "string",
+    pl.Binary: "binary",
+    pl.Boolean: "boolean",
+    pl.Date: "date",
+    pl.Datetime: "timestamp",
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def polars_type_to_glue(dtype: pl.DataType) -> str:
+    """
+    Convert a Polars data type to a Glue / Athena type string, e.g.
+    ``pl.List(pl.Int64)`` -> ``array<bigint>``.
+
+    The result is memoized by dtype, Polars data types are hashable and
+    compare by value. Nested types are converted through the same cache, so
+    a struct that appears in hundreds of columns, or inside other structs
+    and lists, is converted once.
+
+    :raises TypeError: if the type has no Glue equivalent, e.g. ``Time``.
+    """
+    if isinstance(dtype, type):
+        dtype = dtype()
+    simple = _SIMPLE_GLUE_TYPES.get(type(dtype))
+    if simple is not None:
+        return simple
+    if isinstance(dtype, pl.Decimal):
+        precision = 38 if dtype.precision is None else dtype.precision
+        return f"decimal({precision},{dtype.scale})"
+    if isinstance(dtype, (pl.List, pl.Array)):
+        return f"array<{polars_type_to_glue(dtype.inner)}>"
+    if isinstance(dtype, pl.Struct):
+        fields = ",".join(
+            f"{field.name}:{polars_type_to_glue(field.dtype)}" for field in dtype.fields
+        )
+        return f"struct<{fields}>"
+    raise TypeError(f"Polars type {dtype} has no Glue equivalent")
+
+
+_GLUE_SIMPLE_TYPES: T.Dict[str, pl.DataType] = {
+    "tinyint": pl.Int8(),
+    "smallint": pl.Int16(),
+    "int": pl.Int32(),
+    "integer": pl.Int32(),
+    "bigint": pl.Int64(),
+    "float": pl.Float32(),
+    "double": pl.Float64(),
+    "string": pl.String(),
+    "binary": pl.Binary(),
+    "boolean": pl.Boolean(),
+    "date": pl.Date(),
+    "timestamp": pl.Datetime("us"),
+}
+
+
+def _split_top_level(s: str) -> T.List[str]:
+    """
+    Split on the commas that are not inside ``<>`` or ``()``.
+    """
+    parts = list()
+    depth = 0
+    start = 0
+    for i, char in enumerate(s):
+        if char in "<(":
+            depth += 1
+        elif char in ">)":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(s[start:i])
+            start = i + 1
+    parts.append(s[start:])
+    return [part.strip() for part in parts]
+
+
+@functools.lru_cache(maxsize=4096)
+def glue_type_to_polars(glue_type: str) -> pl.DataType:
+    """
+    Convert a Glue / Athena type string to a Polars data type, the inverse
+    of :func:`polars_type_to_glue`, e.g. ``array<bigint>`` ->
+    ``pl.List(pl.Int64)``. ``map<k,v>`` becomes a list of ``key`` /
+    ``value`` structs, the way Polars reads Parquet maps.
+
+    :raises TypeError: if the type is unknown.
+    """
+    type_ = glue_type.strip()
+    lower = type_.lower()
+    simple = _GLUE_SIMPLE_TYPES.get(lower)
+    if simple is not None:
+        return simple
+    if lower.startswith(("varchar", "char")):
+        return pl.String()
+    if lower.startswith("decimal"):
+        if "(" not in lower:
+            return pl.Decimal(38, 0)
+        precision, scale = _split_top_level(lower[lower.index("(") + 1 : -1])
+        return pl.Decimal(int(precision), int(scale))
+    if lower.startswith("array<") and lower.endswith(">"):
+        return pl.List(glue_type_to_polars(type_[6:-1]))
+    if lower.startswith("map<") and lower.endswith(">"):
+        key, value = _split_top_level(type_[4:-1])
+        return pl.List(
+            pl.Struct(
+                {
+                    "key": glue_type_to_polars(key),
+                    "value": glue_type_to_polars(value),
+                }
+            )
+        )
+    if lower.startswith("struct<") and lower.endswith(">"):
+        fields = dict()
+        for field in _split_top_level(type_[7:-1]):
+            name, field_type = field.split(":", 1)
+            fields[name.strip()] = glue_type_to_polars(field_type)
+        return pl.Struct(fields)
+    raise TypeError(f"Glue type {glue_type!r} has no Polars equivalent")
+
+
+def polars_schema_to_glue(
+    schema: T.Mapping[str, pl.DataType],
+    partition_cols: T.Optional[T.Sequence[str]] = None,
+) -> T.Tuple[T.Dict[str, str], T.Dict[str, str]]:
+    """
+    Convert a Polars schema to the ``columns_types`` and ``partitions_types``
+    arguments of ``wr.catalog.create_parquet_table`` /
+    ``wr.catalog.create_json_table``.
+
+    Example::
+
+        >>> lf = pl.scan_ndjson("s3://bucket/raw/*.json")
+        >>> columns_types, partitions_types = polars_schema_to_glue(
+        ...     get_schema(lf), partition_cols=["year"]
+        ... )
+
+    Every dtype is converted by :func:`polars_type_to_glue`, so wide
+    schemas with repeated (nested) types only pay for each distinct type
+    once, see ``docs/source/07-Cached-Glue-Schema-Converter``.
+
+    :param schema: the Polars schema, e.g. ``df.schema``.
+    :param partition_cols: the partition columns, they are moved from the
+        columns to the partitions, in this order.
+
+    :return: ``(columns_types, partitions_types)``
+    """
+    partition_cols = list() if partition_cols is None else list(partition_cols)
+    partition_set = set(partition_cols)
+    missing = partition_set.difference(schema)
+    if missing:
+        raise ValueError(f"partition columns {sorted(missing)} are not in schema")
+    columns_types = dict()
+    partitions_types = dict()
+    for name, dtype in schema.items():
+        if name in partition_set:
+            partitions_types[name] = polars_type_to_glue(dtype)
+        else:
+            columns_types[name] = polars_type_to_glue(dtype)
+    # in the order of partition_cols, which is the Hive path order
+    partitions_types = {name: partitions_types[name] for name in partition_cols}
+    return columns_types, partitions_types
+
+
+_FILE_FORMATS = ("parquet", "json", "csv")
+
+
+def extract_athena_types(
+    df: T.Union[pl.DataFrame, pl.LazyFrame, T.Mapping[str, pl.DataType]],
+    partition_cols: T.Optional[T.Sequence[str]] = None,
+    file_format: str = "parquet",
+    dtype: T.Optional[T.Dict[str, str]] = None,
+) -> T.Tuple[T.Dict[str, str], T.Dict[str, str]]:
+    """
+    The Polars equivalent of ``wr.catalog.extract_athena_types``, it only
+    looks at the schema, so there is no ``df.to_pandas()`` copy, and
+    nullable integers stay integers instead of becoming ``double``.
+
+    Example::
+
+        >>> columns_types, partitions_types = extract_athena_types(
+        ...     df, partition_cols=["year"], file_format="parquet"
+        ... )
+        >>> wr.catalog.create_parquet_table(
+        ...     ...,
+        ...     columns_types=columns_types,
+        ...     partitions_types=partitions_types,
+        ... )
+
+    :param df: a DataFrame, LazyFrame (resolved by :func:`get_schema`) or
+        schema.
+    :param partition_cols: the partition columns.
+    :param file_format: ``parquet``, ``json`` or ``csv``. Polars has no
+        index, so unlike awswrangler it doesn't move columns around, but
+        ``csv`` can't store nested types and raises on them.
+    :param dtype: column name -> Glue type, overrides the inferred types,
+        same as the ``dtype`` argument of awswrangler.
+
+    :return: ``(columns_types, partitions_types)``
+    """
+    if file_format not in _FILE_FORMATS:
+        raise ValueError(f"file_format must be one of {_FILE_FORMATS}")
+    if isinstance(df, (pl.DataFrame, pl.LazyFrame)):
+        schema = get_schema(df)
+    else:
+        schema = df
+    columns_types, partitions_types = polars_schema_to_glue(
+        schema,
+        partition_cols=partition_cols,
+    )
+    if file_format == "csv":
+        nested = [name for name, dtype_ in schema.items() if dtype_.is_nested()]
+        if nested:
+            raise TypeError(f"csv can't store the nested columns {nested}")
+    if dtype:
+        for name, glue_type in dtype.items():
+            if name in columns_types:
+                columns_types[name] = glue_type
+            elif name in partitions_types:
+                partitions_types[name] = glue_type
+    return columns_types, partitions_types
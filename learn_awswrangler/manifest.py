@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""
+Partition fingerprints and the manifest object used by the incremental mode
+of the partitioned writers.
+"""
+
+import typing as T
+import json
+import hashlib
+import dataclasses
+
+import polars as pl
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3 import S3Client
+
+#: the manifest object name under the table prefix. Athena and Hive skip
+#: files starting with ``_``, so it never shows up as data.
+MANIFEST_NAME = "_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def fingerprint(df: pl.DataFrame, salt: str = "") -> str:
+    """
+    Content hash of a DataFrame: a SHA-256 over the schema, ``salt`` and the
+    vectorized ``df.hash_rows()`` of every row, in order.
+
+    ``hash_rows`` is only stable within one Polars version, see
+    :class:`Manifest`.
+
+    :param salt: mixed into the hash, e.g. the write options, so a change
+        of compression also changes the fingerprint.
+    """
+    h = hashlib.sha256()
+    h.update(salt.encode("utf-8"))
+    h.update(repr(list(df.schema.items())).encode("utf-8"))
+    h.update(df.height.to_bytes(8, "little"))
+    if df.width:
+        row_hashes = df.hash_rows(seed=0, seed_1=1, seed_2=2, seed_3=3)
+        h.update(row_hashes.to_numpy().tobytes())
+    return h.hexdigest()
+
+
+@dataclasses.dataclass
+class Manifest:
+    """
+    What the last incremental write put under a table prefix.
+
+    :param polars_version: the Polars version that computed the
+        fingerprints. When a manifest written by another Polars version is
+        read, its fingerprints are dropped, so every partition is
+        considered changed once.
+    :param partitions: hive path (``k=v/.../``) -> ``{"fingerprint": ...,
+        "files": [{"uri": ..., "n_rows": ..., "n_bytes": ..., "n_parts": ...}]}``
+    """
+
+    polars_version: str = pl.__version__
+    partitions: T.Dict[str, T.Dict[str, T.Any]] = dataclasses.field(
+        default_factory=dict
+    )
+
+    def get_fingerprint(self, hive_path: str) -> T.Optional[str]:
+        return self.partitions.get(hive_path, {}).get("fingerprint")
+
+    def get_files(self, hive_path: str) -> T.List[T.Dict[str, T.Any]]:
+        return self.partitions.get(hive_path, {}).get("files", [])
+
+    @classmethod
+    def read(cls, s3_client: "S3Client", bucket: str, key: str) -> "Manifest":
+        """
+        Read the manifest, an empty one if it doesn't exist.
+        """
+        try:
+            res = s3_client.get_object(Bucket=bucket, Key=key)
+        except s3_client.exceptions.NoSuchKey:
+            return cls()
+        data = json.loads(res["Body"].read())
+        if data.get("version") != MANIFEST_VERSION:
+            return cls()
+        partitions = data["partitions"]
+        if data["polars_version"] != pl.__version__:
+            for entry in partitions.values():
+                entry["fingerprint"] = None
+        return cls(partitions=partitions)
+
+    def write(self, s3_client: "S3Client", bucket: str, key: str):
+        data = {
+            "version": MANIFEST_VERSION,
+            "polars_version": self.polars_version,
+            "partitions": self.partitions,
+        }
+        s3_client.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=json.dumps(data, sort_keys=True).encode("utf-8"),
+            ContentType="application/json",
+        )
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+"""
+Convert Polars DataFrame to the pandas DataFrame that awswrangler accepts,
+with as little data copy as possible.
+"""
+
+import typing as T
+import dataclasses
+
+import polars as pl
+import pyarrow as pa
+import pandas as pd
+import numpy as np
+
+from .writer import DEFAULT_LAZY_BATCH_ROWS, split_rows, iter_lazy_batches
+
+
+def _iter_buffers(obj: T.Any) -> T.Iterable[T.Tuple[int, int]]:
+    """
+    Yield the ``(address, size)`` of the memory behind a pyarrow array,
+    a pandas array or a numpy array.
+    """
+    if isinstance(obj, pa.ChunkedArray):
+        for chunk in obj.chunks:
+            yield from _iter_buffers(chunk)
+    elif isinstance(obj, pa.Array):
+        # includes the buffers of the children of nested arrays
+        for buf in obj.buffers():
+            if buf is not None:
+                yield buf.address, buf.size
+    elif isinstance(obj, np.ndarray):
+        yield obj.__array_interface__["data"][0], obj.nbytes
+    elif isinstance(obj, pd.arrays.ArrowExtensionArray):
+        yield from _iter_buffers(obj._pa_array)
+    elif isinstance(obj, pd.core.arrays.masked.BaseMaskedArray):
+        yield from _iter_buffers(obj._data)
+        yield from _iter_buffers(obj._mask)
+    else:  # numpy backed pandas array, e.g. object, datetime64
+        yield from _iter_buffers(np.asarray(obj))
+
+
+def count_copied_bytes(source: pl.Series, target: pd.Series) -> int:
+    """
+    Count the bytes of ``target`` that are not shared with the memory of
+    the Polars ``source``. Python objects referenced by ``object`` columns
+    are not counted, only the pointer array.
+    """
+    shared = list(_iter_buffers(source.to_arrow(compat_level=pl.CompatLevel.newest())))
+    n_bytes = 0
+    for address, size in _iter_buffers(target.array):
+        if not any(
+            start <= address and address + size <= start + length
+            for start, length in shared
+        ):
+            n_bytes += size
+    return n_bytes
+
+
+def _accepted_arrow_type(type_: pa.DataType) -> pa.DataType:
+    """
+    The closest Arrow type that awswrangler can map to Glue, e.g.
+    ``fixed_size_list`` -> ``large_list``, ``large_binary`` -> ``binary``.
+    """
+    if pa.types.is_large_binary(type_):
+        return pa.binary()
+    if pa.types.is_fixed_size_list(type_) or pa.types.is_large_list(type_):
+        return pa.large_list(_accepted_arrow_type(type_.value_type))
+    if pa.types.is_struct(type_):
+        return pa.struct(
+            [field.with_type(_accepted_arrow_type(field.type)) for field in type_]
+        )
+    return type_
+
+
+def _to_arrow_column(s: pl.Series) -> pd.Series:
+    # the default compat level turns string / binary views into
+    # large_string / large_binary, awswrangler doesn't know the view types
+    arr = s.to_arrow()
+    type_ = _accepted_arrow_type(arr.type)
+    if type_ != arr.type:
+        arr = arr.cast(type_)
+    return pd.Series(pd.arrays.ArrowExtensionArray(arr), name=s.name, copy=False)
+
+
+def _to_masked_column(s: pl.Series) -> pd.Series:
+    if s.dtype.is_integer() or s.dtype.is_float() or s.dtype == pl.Boolean:
+        if s.dtype.is_integer():
+            array_class = pd.arrays.IntegerArray
+        elif s.dtype.is_float():
+            array_class = pd.arrays.FloatingArray
+        else:
+            array_class = pd.arrays.BooleanArray
+        arr = array_class(
+            s.fill_null(False if s.dtype == pl.Boolean else 0).to_numpy(),
+            s.is_null().to_numpy(),
+        )
+        return pd.Series(arr, name=s.name, copy=False)
+    if s.dtype in (pl.String, pl.Categorical) or isinstance(s.dtype, pl.Enum):
+        arr = s.cast(pl.String).to_arrow()
+        return pd.Series(pd.arrays.ArrowStringArray(arr), name=s.name, copy=False)
+    return s.to_pandas()
+
+
+@dataclasses.dataclass
+class ToPandasResult:
+    """
+    :param df: the pandas DataFrame.
+    :param copied_bytes: column name -> number of bytes that were copied,
+        0 means the column shares the memory of the Polars DataFrame.
+    """
+
+    df: pd.DataFrame
+    copied_bytes: T.Dict[str, int]
+
+    @property
+    def total_copied_bytes(self) -> int:
+        return sum(self.copied_bytes.values())
+
+
+def to_pandas(
+    df: pl.DataFrame,
+    use_arrow_dtypes: bool = True,
+) -> ToPandasResult:
+    """
+    Convert a Polars DataFrame to a pandas DataFrame for the awswrangler
+    APIs (``wr.s3.to_parquet``, ``wr.catalog.extract_athena_types``, ...),
+    copying as little as possible.
+
+    ``df.to_pandas()`` copies everything and turns integer columns with
+    nulls into ``float64``. ``df.to_pandas(use_pyarrow_extension_array=True)``
+    is zero-copy for most types, but some of the Arrow types it produces
+    (``string_view``, ``large_binary``, ``fixed_size_list``) are rejected
+    by awswrangler. This function picks per column:
+
+    - integer and float columns without nulls: numpy arrays, zero-copy.
+    - ``use_arrow_dtypes=True``: everything else is an ``ArrowDtype``
+      column, zero-copy except strings (the Polars string views are
+      rewritten as ``large_string``) and the casts above.
+    - ``use_arrow_dtypes=False``, for code that can't handle ``ArrowDtype``:
+      nullable integers, floats and booleans become the masked ``Int64``
+      / ``Float64`` / ``boolean`` dtypes instead of ``float64`` / ``object``,
+      strings become the ``string`` dtype, the rest is ``Series.to_pandas()``.
+
+    Example::
+
+        >>> res = to_pandas(df)
+        >>> res.copied_bytes
+        {'id': 0, 'name': 8000012}
+        >>> wr.s3.to_parquet(res.df, ...)
+
+    :param df: the Polars DataFrame.
+    :param use_arrow_dtypes: see above.
+    """
+    columns = dict()
+    for s in df.iter_columns():
+        if s.dtype.is_numeric() and not s.dtype.is_decimal() and not s.has_nulls():
+            column = pd.Series(s.to_numpy(), name=s.name, copy=False)
+        elif use_arrow_dtypes:
+            column = _to_arrow_column(s)
+        else:
+            column = _to_masked_column(s)
+        columns[s.name] = column
+    pdf = pd.DataFrame(columns, copy=False)
+    # counted on the final DataFrame, in case pandas copied a column
+    copied_bytes = {
+        s.name: count_copied_bytes(s, pdf[s.name]) for s in df.iter_columns()
+    }
+    return ToPandasResult(df=pdf, copied_bytes=copied_bytes)
+
+
+#: the assumed size of a value of a variable width type, e.g. a string
+VARIABLE_WIDTH_BYTES = 64
+
+_FIXED_WIDTH_BYTES: T.Dict[T.Type[pl.DataType], int] = {
+    pl.Null: 0,
+    pl.Boolean: 1,
+    pl.Int8: 1,
+    pl.UInt8: 1,
+    pl.Int16: 2,
+    pl.UInt16: 2,
+    pl.Int32: 4,
+    pl.UInt32: 4,
+    pl.Float32: 4,
+    pl.Date: 4,
+    pl.Categorical: 4,
+    pl.Enum: 4,
+    pl.Int64: 8,
+    pl.UInt64: 8,
+    pl.Float64: 8,
+    pl.Datetime: 8,
+    pl.Duration: 8,
+    pl.Time: 8,
+    pl.Decimal: 16,
+}
+
+
+def _estimate_value_bytes(dtype: pl.DataType) -> int:
+    if isinstance(dtype, type):
+        dtype = dtype()
+    if isinstance(dtype, pl.Struct):
+        return sum(_estimate_value_bytes(field.dtype) for field in dtype.fields)
+    if isinstance(dtype, pl.Array):
+        return _estimate_value_bytes(dtype.inner) * dtype.size
+    return _FIXED_WIDTH_BYTES.get(type(dtype), VARIABLE_WIDTH_BYTES)
+
+
+def estimate_row_bytes(schema: T.Mapping[str, pl.DataType]) -> int:
+    """
+    Estimate the in-memory size of a row from the schema alone, e.g. for a
+    LazyFrame that is not collected yet. Fixed width types count their
+    size, variable width types (strings, binary, lists) count
+    :data:`VARIABLE_WIDTH_BYTES`.
+    """
+    return max(sum(_estimate_value_bytes(dtype) for dtype in schema.values()), 1)
+
+
+def iter_pandas_chunks(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    chunk_rows: T.Optional[int] = None,
+    chunk_bytes: T.Optional[int] = None,
+    use_arrow_dtypes: bool = True,
+) -> T.Iterable[pd.DataFrame]:
+    """
+    Yield the DataFrame as pandas DataFrames of at most ``chunk_rows`` rows
+    and about ``chunk_bytes`` bytes each, so only one chunk is converted
+    at a time.
+
+    The chunks are ``df.slice()`` views (see
+    :func:`~learn_awswrangler.writer.split_rows`), converted by
+    :func:`to_pandas`, so zero-copy columns stay zero-copy. A LazyFrame is
+    collected in batches of ``chunk_rows`` rows, and of about
+    ``chunk_bytes`` bytes by the row size estimated from its schema by
+    :func:`estimate_row_bytes`, which are split further by ``chunk_bytes``.
+    With strings or lists much longer than :data:`VARIABLE_WIDTH_BYTES`, a
+    batch is bigger than ``chunk_bytes``, pass ``chunk_rows`` as well to
+    bound it.
+
+    Example::
+
+        >>> for pdf in iter_pandas_chunks(df, chunk_bytes=64 * 1024 * 1024):
+        ...     wr.dynamodb.put_df(pdf, table_name="my-table")
+
+    :param chunk_rows: the upper limit of rows per chunk.
+    :param chunk_bytes: the desired in-memory size of each chunk, based on
+        ``df.estimated_size()``.
+    :param use_arrow_dtypes: see :func:`to_pandas`.
+    """
+    if chunk_rows is None and chunk_bytes is None:
+        raise ValueError("one of chunk_rows and chunk_bytes is required")
+    if isinstance(df, pl.LazyFrame):
+        batch_rows = chunk_rows or DEFAULT_LAZY_BATCH_ROWS
+        if chunk_bytes is not None:
+            row_bytes = estimate_row_bytes(df.collect_schema())
+            batch_rows = min(batch_rows, max(chunk_bytes // row_bytes, 1))
+        batches = iter_lazy_batches(df, batch_rows)
+    else:
+        batches = [df]
+    for batch in batches:
+        if batch.height == 0:
+            continue
+        for chunk in split_rows(
+            batch,
+            target_file_bytes=chunk_bytes,
+            max_rows_per_file=chunk_rows,
+        ):
+            yield to_pandas(chunk, use_arrow_dtypes=use_arrow_dtypes).df
+
+
+def write_chunked(
+    wr_func: T.Callable[..., T.Dict[str, T.Any]],
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    path: str,
+    chunk_rows: T.Optional[int] = None,
+    chunk_bytes: T.Optional[int] = None,
+    mode: str = "append",
+    use_arrow_dtypes: bool = True,
+    **kwargs,
+) -> T.Dict[str, T.Any]:
+    """
+    Write a Polars DataFrame with an awswrangler dataset writer
+    (``wr.s3.to_parquet``, ``wr.s3.to_csv``, ``wr.s3.to_json``) one
+    :func:`iter_pandas_chunks` chunk at a time, so the peak memory is one
+    pandas chunk instead of the whole DataFrame.
+
+    The first chunk is written with ``mode``, the following ones with
+    ``mode="append"``, so ``mode="overwrite"`` replaces the dataset once
+    (an empty DataFrame writes nothing) and the Glue table (``database`` /
+    ``table`` arguments) is created by the first chunk and gets the new
+    partitions of the following ones.
+
+    Example::
+
+        >>> write_chunked(
+        ...     wr.s3.to_parquet,
+        ...     df,
+        ...     path="s3://bucket/table/",
+        ...     chunk_bytes=256 * 1024 * 1024,
+        ...     mode="overwrite",
+        ...     partition_cols=["year"],
+        ...     database="db",
+        ...     table="table",
+        ...     boto3_session=boto_ses,
+        ... )
+
+    :param wr_func: the awswrangler writer.
+    :param path: the dataset S3 URI.
+    :param mode: ``append`` or ``overwrite``. ``overwrite_partitions``
+        would let every chunk overwrite the partitions written by the
+        chunks before it, so it is not supported.
+    :param kwargs: the other arguments of ``wr_func``, ``dataset=True`` is
+        implied.
+
+    :return: the awswrangler result of all chunks, ``{"paths": [...],
+        "partitions_values": {...}}``
+    """
+    if mode not in ("append", "overwrite"):
+        raise ValueError(f"mode must be 'append' or 'overwrite', got {mode!r}")
+    if kwargs.pop("dataset", True) is not True:
+        raise ValueError("write_chunked only supports dataset=True")
+    paths = list()
+    partitions_values = dict()
+    for pdf in iter_pandas_chunks(
+        df,
+        chunk_rows=chunk_rows,
+        chunk_bytes=chunk_bytes,
+        use_arrow_dtypes=use_arrow_dtypes,
+    ):
+        res = wr_func(pdf, path=path, dataset=True, mode=mode, **kwargs)
+        mode = "append"
+        paths.extend(res["paths"])
+        partitions_values.update(res["partitions_values"])
+    return {"paths": paths, "partitions_values": partitions_values}
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+"""
+Infer the Glue schema of a Hive partitioned Parquet dataset on S3 from the
+Parquet footers only, no data page is downloaded.
+"""
+
+import typing as T
+import struct
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .s3_utils import DEFAULT_MAX_WORKERS, split_s3_uri, to_s3_dir_uri, iter_objects
+from .partition import HIVE_DEFAULT_PARTITION
+from .glue_schema import polars_type_to_glue
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3 import S3Client
+
+PARQUET_MAGIC = b"PAR1"
+
+#: bytes read from the end of each file by the first ranged GET, enough for
+#: the footer of most files, bigger footers take a second GET
+DEFAULT_TAIL_SIZE = 64 * 1024
+
+
+def read_footer_schema(
+    s3_client: "S3Client",
+    bucket: str,
+    key: str,
+    tail_size: int = DEFAULT_TAIL_SIZE,
+) -> pa.Schema:
+    """
+    Read the schema of one Parquet file with one ranged GET of its last
+    ``tail_size`` bytes, or two if the footer is bigger than that.
+    """
+    # the footer ends with its length (4 bytes) and the magic
+    tail_size = max(tail_size, 8)
+    res = s3_client.get_object(Bucket=bucket, Key=key, Range=f"bytes=-{tail_size}")
+    tail = res["Body"].read()
+    if len(tail) < 8 or tail[-4:] != PARQUET_MAGIC:
+        raise ValueError(f"s3://{bucket}/{key} is not a Parquet file")
+    footer_size = struct.unpack("<I", tail[-8:-4])[0]
+    if footer_size + 8 > len(tail):
+        res = s3_client.get_object(
+            Bucket=bucket,
+            Key=key,
+            Range=f"bytes=-{footer_size + 8}",
+        )
+        tail = res["Body"].read()
+    # pyarrow only needs the footer, the data pages are never read
+    footer = PARQUET_MAGIC + tail[-(footer_size + 8) :]
+    return pq.read_schema(pa.BufferReader(footer))
+
+
+def parse_hive_path(relative_key: str) -> T.List[T.Tuple[str, str]]:
+    """
+    Parse the ``k=v`` folders of a key relative to the dataset root.
+
+    Example::
+
+        >>> parse_hive_path("year=2001/month=01/data.parquet")
+        [('year', '2001'), ('month', '01')]
+    """
+    pairs = list()
+    for part in relative_key.split("/")[:-1]:
+        if "=" in part:
+            name, value = part.split("=", 1)
+            pairs.append((name, value))
+    return pairs
+
+
+def _infer_partition_type(values: T.Iterable[str]) -> str:
+    """
+    ``bigint`` if every value is a plain integer (no leading zero),
+    ``date`` if every value is an ISO date, ``string`` otherwise.
+    """
+    s = pl.Series([v for v in values if v != HIVE_DEFAULT_PARTITION], dtype=pl.String)
+    if s.len() == 0:
+        return "string"
+    integers = s.str.to_integer(strict=False)
+    if integers.null_count() == 0 and (integers.cast(pl.String) == s).all():
+        return "bigint"
+    dates = s.str.to_date("%Y-%m-%d", strict=False)
+    if dates.null_count() == 0:
+        return "date"
+    return "string"
+
+
+@dataclasses.dataclass
+class ParquetDatasetSchema:
+    """
+    :param columns_types: the Glue types of the data columns.
+    :param partitions_types: the Glue types of the partition columns, in
+        path order.
+    :param schema: the unified Polars schema of the data columns.
+    :param partitions_values: partition location -> partition values, the
+        ``partitions_values`` argument of
+        :func:`~learn_awswrangler.catalog.register_partitions`.
+    :param n_files: number of Parquet files.
+    :param n_schemas: number of distinct file schemas that were unified.
+    """
+
+    columns_types: T.Dict[str, str]
+    partitions_types: T.Dict[str, str]
+    schema: pl.Schema
+    partitions_values: T.Dict[str, T.List[str]]
+    n_files: int
+    n_schemas: int
+
+
+def infer_parquet_schema(
+    s3dir: str,
+    s3_client: "S3Client",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    suffix: T.Optional[str] = ".parquet",
+    tail_size: int = DEFAULT_TAIL_SIZE,
+    infer_partition_types: bool = False,
+) -> ParquetDatasetSchema:
+    """
+    Infer the Glue ``columns_types`` and ``partitions_types`` of a Hive
+    partitioned Parquet dataset written by anyone, without reading data.
+
+    1. ``s3dir`` is listed once, files starting with ``_`` or ``.``
+       (``_SUCCESS``, ``_manifest.json``) and empty files are skipped.
+    2. The footer of every file is fetched by :func:`read_footer_schema`,
+       ``max_workers`` ranged GETs at a time, a few KB per file.
+    3. The distinct schemas are unified with type widening (``int`` +
+       ``bigint`` -> ``bigint``, ``bigint`` + ``double`` -> ``double``, struct
+       fields are merged, missing columns are nullable) by
+       ``pl.concat(how="diagonal_relaxed")``.
+    4. Partition columns come from the ``k=v`` folders, they must be the
+       same for every file. A partition column also stored in the files is
+       removed from the data columns.
+
+    Example::
+
+        >>> res = infer_parquet_schema(
+        ...     "s3://bucket/table/",
+        ...     new_s3_client(boto_ses, max_workers=64),
+        ...     max_workers=64,
+        ... )
+        >>> wr.catalog.create_parquet_table(
+        ...     ...,
+        ...     columns_types=res.columns_types,
+        ...     partitions_types=res.partitions_types,
+        ... )
+
+    :param s3dir: S3 URI of the dataset root folder.
+    :param s3_client: boto3 S3 client, shared by all workers.
+    :param max_workers: number of concurrent GETs.
+    :param suffix: only files ending with it are read, None for all files.
+    :param tail_size: see :data:`DEFAULT_TAIL_SIZE`.
+    :param infer_partition_types: if True, partitions are typed ``bigint``
+        or ``date`` when all their values are, otherwise every partition
+        column is ``string``, like the Hive path.
+
+    :raises ValueError: if there are no files, the files don't share the
+        same partition columns, or the schemas can't be unified.
+    """
+    s3dir = to_s3_dir_uri(s3dir)
+    bucket, prefix = split_s3_uri(s3dir)
+    keys = list()
+    for obj in iter_objects(s3_client, bucket, prefix):
+        key = obj["Key"]
+        name = key.rsplit("/", 1)[-1]
+        if name.startswith(("_", ".")) or obj["Size"] == 0:
+            continue
+        if suffix is not None and not name.endswith(suffix):
+            continue
+        keys.append(key)
+    if not keys:
+        raise ValueError(f"no Parquet file found under {s3dir!r}")
+
+    partition_names: T.Optional[T.List[str]] = None
+    partitions_values: T.Dict[str, T.List[str]] = dict()
+    for key in keys:
+        relative_key = key[len(prefix) :]
+        pairs = parse_hive_path(relative_key)
+        names = [name for name, _ in pairs]
+        if partition_names is None:
+            partition_names = names
+        elif names != partition_names:
+            raise ValueError(
+                f"inconsistent partition columns {names} != {partition_names} "
+                f"in {key!r}"
+            )
+        if pairs:
+            location = s3dir + relative_key.rsplit("/", 1)[0] + "/"
+            partitions_values[location] = [value for _, value in pairs]
+
+    def read(key: str) -> pa.Schema:
+        return read_footer_schema(s3_client, bucket, key, tail_size=tail_size)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # files of one writer usually share a few distinct schemas
+        schemas = list(
+            {schema.remove_metadata(): None for schema in executor.map(read, keys)}
+        )
+
+    try:
+        unified = pl.concat(
+            [pl.DataFrame(schema.empty_table()) for schema in schemas],
+            how="diagonal_relaxed",
+        ).schema
+    except (pl.exceptions.SchemaError, pl.exceptions.ComputeError) as e:
+        raise ValueError(f"can't unify the Parquet schemas under {s3dir!r}: {e}")
+
+    columns_types = {
+        name: polars_type_to_glue(dtype)
+        for name, dtype in unified.items()
+        if name not in partition_names
+    }
+    partitions_types = dict()
+    for ith, name in enumerate(partition_names):
+        if infer_partition_types:
+            partitions_types[name] = _infer_partition_type(
+                values[ith] for values in partitions_values.values()
+            )
+        else:
+            partitions_types[name] = "string"
+    return ParquetDatasetSchema(
+        columns_types=columns_types,
+        partitions_types=partitions_types,
+        schema=pl.Schema(
+            {k: v for k, v in unified.items() if k not in partition_names}
+        ),
+        partitions_values=partitions_values,
+        n_files=len(keys),
+        n_schemas=len(schemas),
+    )
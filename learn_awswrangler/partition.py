@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+Split a DataFrame into Hive style partitions (``k1=v1/k2=v2/``).
+"""
+
+import typing as T
+
+import polars as pl
+
+#: The directory name Hive / Athena use for null partition values.
+HIVE_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def to_hive_value(
+    value: T.Any,
+    dtype: T.Optional[pl.DataType] = None,
+) -> str:
+    """
+    Convert a partition value into its Hive path representation, the same
+    string as ``pl.col(...).cast(pl.String)`` in :func:`hive_path_expr`.
+
+    The cast is done by Polars, ``dtype`` is the dtype of the partition
+    column, default is the one Polars infers from ``value``. Pass it when
+    they differ, e.g. a ``Datetime("ns")`` column gives nine fractional
+    digits, an inferred ``datetime`` six. Strings are returned as is.
+    """
+    if value is None:
+        return HIVE_DEFAULT_PARTITION
+    if isinstance(value, str):
+        return value
+    return pl.Series([value], dtype=dtype).cast(pl.String).item()
+
+
+def get_hive_values(location: str, n: int) -> T.List[str]:
+    """
+    The values of the last ``n`` ``k=v`` folders of ``location``, the
+    partition values as they are in the path.
+
+    Example::
+
+        >>> get_hive_values("s3://bucket/table/year=2001/month=01/", 2)
+        ['2001', '01']
+    """
+    if n == 0:
+        return []
+    folders = location.rstrip("/").split("/")[-n:]
+    values = list()
+    for folder in folders:
+        if "=" not in folder:
+            raise ValueError(f"{location!r} is not in {n} Hive folders")
+        values.append(folder.split("=", 1)[1])
+    return values
+
+
+def to_hive_path(
+    partition_cols: T.Sequence[str],
+    values: T.Sequence[T.Any],
+) -> str:
+    """
+    Build the relative Hive partition directory.
+
+    Example::
+
+        >>> to_hive_path(["year", "month"], ["2001", "01"])
+        'year=2001/month=01/'
+    """
+    return "".join(
+        f"{col}={to_hive_value(value)}/" for col, value in zip(partition_cols, values)
+    )
+
+
+def hive_path_expr(partition_cols: T.Sequence[str]) -> pl.Expr:
+    """
+    A Polars expression that computes :func:`to_hive_path` for every row.
+    """
+    exprs = list()
+    for col in partition_cols:
+        exprs.append(pl.lit(f"{col}="))
+        exprs.append(
+            pl.col(col).cast(pl.String).fill_null(pl.lit(HIVE_DEFAULT_PARTITION))
+        )
+        exprs.append(pl.lit("/"))
+    return pl.concat_str(exprs)
+
+
+def iter_partitions(
+    df: pl.DataFrame,
+    partition_cols: T.Sequence[str],
+) -> T.Iterable[T.Tuple[T.Tuple[T.Any, ...], str, pl.DataFrame]]:
+    """
+    Iterate over the partitions of a DataFrame, sorted by partition values,
+    nulls last.
+
+    Unlike ``df.group_by(partition_cols)``, which builds one sub DataFrame per
+    group in a Python loop, this finds the row indices of every partition
+    with a single aggregation, gathers the DataFrame once into partition
+    order and yields ``df.slice()`` views of it, which share its memory. The
+    Hive paths are computed by one vectorized expression. The per partition
+    Python overhead is a tuple and a slice.
+
+    :return: iterator of ``(values, hive_path, sub_df)``. Without
+        partition columns the whole DataFrame is one partition at ``""``.
+    """
+    partition_cols = list(partition_cols)
+    if not partition_cols:
+        yield (), "", df
+        return
+    col_index = "__row_index__"
+    col_len = "__len__"
+    groups = (
+        df.select(partition_cols)
+        .with_row_index(col_index)
+        .group_by(partition_cols)
+        .agg(pl.col(col_index), pl.len().alias(col_len))
+        .sort(partition_cols, nulls_last=True)
+    )
+    # flatten the index lists through Arrow, it is zero copy and avoids the
+    # ``explode()`` behavior change around empty lists across Polars versions
+    indices = pl.from_arrow(groups.get_column(col_index).to_arrow().flatten())
+    df = df[indices]
+    lengths = groups.get_column(col_len)
+    offsets = lengths.cum_sum() - lengths
+    keys = groups.select(partition_cols)
+    hive_paths = keys.select(hive_path_expr(partition_cols)).to_series()
+    for values, hive_path, offset, length in zip(
+        keys.iter_rows(),
+        hive_paths,
+        offsets,
+        lengths,
+    ):
+        yield values, hive_path, df.slice(offset, length)
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+"""
+Infer Athena partition projection settings from the partitions a write
+produced, so that no partition metadata has to be registered or listed.
+"""
+
+import typing as T
+
+import polars as pl
+
+from .partition import get_hive_values
+from .s3_utils import to_s3_dir_uri
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .writer import PartitionWriteResult
+
+
+class ProjectionTypeEnum:
+    """
+    The Athena partition projection types used by
+    :func:`infer_partition_projection`.
+    """
+
+    integer = "integer"
+    date = "date"
+    enum = "enum"
+    injected = "injected"
+
+
+DATE_FORMAT = "yyyy-MM-dd"
+
+#: the widest integer range projected, Athena enumerates every value of the
+#: range for a query that doesn't filter on the column
+MAX_INTEGER_RANGE = 100_000
+
+
+def _integer_column(
+    lower: int,
+    upper: int,
+    digits: T.Optional[int] = None,
+) -> T.Dict[str, str]:
+    """
+    An ``integer`` projection from ``lower`` to ``upper``, or ``injected``
+    if the range is wider than :data:`MAX_INTEGER_RANGE`.
+    """
+    if upper - lower >= MAX_INTEGER_RANGE:
+        return {"type": ProjectionTypeEnum.injected}
+    settings = {
+        "type": ProjectionTypeEnum.integer,
+        "range": f"{lower},{upper}",
+    }
+    if digits is not None and digits > 1:
+        settings["digits"] = str(digits)
+    return settings
+
+
+def _infer_column(
+    dtype: pl.DataType,
+    values: T.List[T.Any],
+    hive_values: T.List[str],
+    date_range_to_now: bool,
+) -> T.Dict[str, str]:
+    """
+    Infer the projection of one partition column from its dtype and the
+    distinct values written, as ``{"type": ..., "range": ..., ...}``.
+    ``hive_values`` are the same values as they are in the folder names.
+    """
+    if None not in values:
+        if dtype.is_integer():
+            return _integer_column(min(values), max(values))
+        if dtype == pl.Date:
+            upper = "NOW" if date_range_to_now else max(values).isoformat()
+            return {
+                "type": ProjectionTypeEnum.date,
+                "range": f"{min(values).isoformat()},{upper}",
+                "format": DATE_FORMAT,
+            }
+        # zero padded numbers stored as strings, e.g. month=01
+        if (
+            dtype == pl.String
+            and all(value.isdigit() and value.isascii() for value in values)
+            and len({len(value) for value in values}) == 1
+        ):
+            return _integer_column(
+                min(map(int, values)),
+                max(map(int, values)),
+                digits=len(values[0]),
+            )
+    hive_values = sorted(set(hive_values))
+    # ``projection.<col>.values`` is comma separated
+    if any("," in value for value in hive_values):
+        return {"type": ProjectionTypeEnum.injected}
+    return {
+        "type": ProjectionTypeEnum.enum,
+        "values": ",".join(hive_values),
+    }
+
+
+def infer_partition_projection(
+    results: T.List["PartitionWriteResult"],
+    partition_cols: T.Sequence[str],
+    schema: T.Mapping[str, pl.DataType],
+    s3dir: str,
+    date_range_to_now: bool = False,
+) -> T.Dict[str, T.Any]:
+    """
+    Infer the ``athena_partition_projection_settings`` argument of
+    ``wr.catalog.create_parquet_table`` / ``create_json_table`` from the
+    partitions written by the partitioned writers.
+
+    - integer columns, and strings of digits of the same length (e.g.
+      ``month=01``, projected with ``digits``), become ``integer`` with the
+      range of the values written.
+    - ``Date`` columns become ``date`` with the range of the values written,
+      up to ``NOW`` if ``date_range_to_now`` is True, so daily appends are
+      visible without touching the table.
+    - everything else, and any column with nulls, becomes ``enum`` of the
+      values written.
+    - integer ranges wider than :data:`MAX_INTEGER_RANGE`, and enums with a
+      value that contains a comma, which can't be listed in
+      ``projection.<col>.values``, become ``injected``: every query must
+      then filter the column by equality.
+
+    ``storage.location.template`` is the Hive layout of the writer under
+    ``s3dir``.
+
+    :param results: the return value of the writer.
+    :param partition_cols: the partition columns used by the writer.
+    :param schema: the schema of the written data, e.g. ``df.schema``.
+    :param s3dir: S3 URI of the table root folder.
+    :param date_range_to_now: see above.
+    """
+    partition_cols = list(partition_cols)
+    s3dir = to_s3_dir_uri(s3dir)
+    settings = {
+        "projection_types": {},
+        "projection_ranges": {},
+        "projection_values": {},
+        "projection_digits": {},
+        "projection_formats": {},
+    }
+    # the enum values must be the folder names the writer created
+    results_hive_values = [
+        get_hive_values(result.location, len(partition_cols)) for result in results
+    ]
+    for ith, col in enumerate(partition_cols):
+        values = list({result.values[ith] for result in results})
+        hive_values = [hive_values[ith] for hive_values in results_hive_values]
+        column = _infer_column(schema[col], values, hive_values, date_range_to_now)
+        settings["projection_types"][col] = column["type"]
+        if "range" in column:
+            settings["projection_ranges"][col] = column["range"]
+        if "values" in column:
+            settings["projection_values"][col] = column["values"]
+        if "digits" in column:
+            settings["projection_digits"][col] = column["digits"]
+        if "format" in column:
+            settings["projection_formats"][col] = column["format"]
+    settings["projection_storage_location_template"] = s3dir + "".join(
+        f"{col}=${{{col}}}/" for col in partition_cols
+    )
+    return settings
+
+
+def merge_partition_projection(
+    parameters: T.Dict[str, str],
+    settings: T.Dict[str, T.Any],
+) -> T.Dict[str, T.Any]:
+    """
+    Widen the projection ``settings`` of a new write by the projection
+    already in the table ``parameters``, so an append never hides the
+    partitions written before: integer and date ranges are merged, enum
+    values are unioned. A column whose projection type changed takes the
+    new settings, an integer range merged wider than
+    :data:`MAX_INTEGER_RANGE` becomes ``injected``.
+    """
+    settings = {
+        key: dict(value) if isinstance(value, dict) else value
+        for key, value in settings.items()
+    }
+    for col, type_ in settings["projection_types"].items():
+        if parameters.get(f"projection.{col}.type") != type_:
+            continue
+        if type_ == ProjectionTypeEnum.enum:
+            old = parameters.get(f"projection.{col}.values", "").split(",")
+            new = settings["projection_values"][col].split(",")
+            settings["projection_values"][col] = ",".join(
+                sorted({value for value in old + new if value})
+            )
+        else:
+            old_range = parameters.get(f"projection.{col}.range")
+            if not old_range:
+                continue
+            old_lower, old_upper = old_range.split(",")
+            new_lower, new_upper = settings["projection_ranges"][col].split(",")
+            if type_ == ProjectionTypeEnum.integer:
+                lower = min(int(old_lower), int(new_lower))
+                upper = max(int(old_upper), int(new_upper))
+                column = _integer_column(lower, upper)
+                if column["type"] != type_:
+                    settings["projection_types"][col] = column["type"]
+                    del settings["projection_ranges"][col]
+                    settings.get("projection_digits", {}).pop(col, None)
+                    continue
+            else:  # date, ISO dates compare as strings
+                lower = min(old_lower, new_lower)
+                if "NOW" in (old_upper, new_upper):
+                    upper = "NOW"
+                else:
+                    upper = max(old_upper, new_upper)
+            settings["projection_ranges"][col] = f"{lower},{upper}"
+    return settings
+
+
+#: ``athena_partition_projection_settings`` key -> table parameter suffix
+_SETTING_PARAMETERS = {
+    "projection_types": "type",
+    "projection_ranges": "range",
+    "projection_values": "values",
+    "projection_digits": "digits",
+    "projection_formats": "format",
+}
+
+
+def to_table_parameters(settings: T.Dict[str, T.Any]) -> T.Dict[str, str]:
+    """
+    Convert the projection ``settings`` of :func:`infer_partition_projection`
+    to the Glue table parameters awswrangler writes for them, e.g.
+    ``projection.year.range``, to update an existing table.
+    """
+    parameters = {"projection.enabled": "true"}
+    for key, suffix in _SETTING_PARAMETERS.items():
+        for col, value in settings.get(key, {}).items():
+            parameters[f"projection.{col}.{suffix}"] = str(value)
+    template = settings.get("projection_storage_location_template")
+    if template is not None:
+        parameters["storage.location.template"] = template
+    return parameters
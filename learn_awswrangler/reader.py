@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+"""
+Read a Glue cataloged Parquet table into a Polars LazyFrame, only the
+partitions, files and columns the query needs.
+"""
+
+import typing as T
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+
+from .s3_utils import DEFAULT_MAX_WORKERS, split_s3_uri, to_s3_dir_uri, iter_objects
+from .partition import HIVE_DEFAULT_PARTITION, to_hive_path
+from .writer import new_s3_client
+from .glue_schema import polars_type_to_glue, glue_type_to_polars
+from .catalog import _get_partitions
+from .discovery import discover_partitions
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    import boto3
+    from mypy_boto3_s3 import S3Client
+
+
+def _to_filter_list(
+    filters: T.Union[pl.Expr, T.Sequence[pl.Expr], None],
+) -> T.List[pl.Expr]:
+    if filters is None:
+        return list()
+    if isinstance(filters, pl.Expr):
+        return [filters]
+    return list(filters)
+
+
+def prune_partitions(
+    partitions_values: T.Dict[str, T.List[str]],
+    partitions_types: T.Dict[str, str],
+    filters: T.Union[pl.Expr, T.Sequence[pl.Expr], None] = None,
+) -> T.Dict[str, T.List[str]]:
+    """
+    Keep the partitions that can match ``filters``.
+
+    The partition values are loaded in a DataFrame, one row per partition,
+    cast to the Glue partition types (``__HIVE_DEFAULT_PARTITION__`` is
+    null), and filtered by every filter that only uses partition columns.
+    The other filters can't exclude a partition and are ignored.
+
+    :param partitions_values: partition location -> partition values.
+    :param partitions_types: the Glue partition keys and types, in order.
+    :param filters: Polars predicates, ANDed.
+
+    :return: the surviving ``partitions_values``.
+    """
+    partition_cols = list(partitions_types)
+    exprs = [
+        expr
+        for expr in _to_filter_list(filters)
+        if set(expr.meta.root_names()).issubset(partition_cols)
+    ]
+    if not exprs or not partitions_values:
+        return dict(partitions_values)
+    locations = list(partitions_values)
+    df = pl.DataFrame(
+        {
+            "location": locations,
+            **{
+                col: [partitions_values[location][ith] for location in locations]
+                for ith, col in enumerate(partition_cols)
+            },
+        },
+        schema={"location": pl.String, **{col: pl.String for col in partition_cols}},
+    ).with_columns(
+        pl.when(pl.col(col) != HIVE_DEFAULT_PARTITION)
+        .then(pl.col(col))
+        .cast(glue_type_to_polars(type_), strict=False)
+        .alias(col)
+        for col, type_ in partitions_types.items()
+    )
+    kept = set(df.filter(*exprs)["location"])
+    return {
+        location: values
+        for location, values in partitions_values.items()
+        if location in kept
+    }
+
+
+def _list_parquet_files(
+    s3_client: "S3Client",
+    s3dir: str,
+) -> T.List[str]:
+    """
+    List the S3 URIs of the data files under ``s3dir``, skipping the
+    ``_SUCCESS`` / ``.crc`` like files and the empty folder markers.
+    """
+    bucket, prefix = split_s3_uri(s3dir)
+    uris = list()
+    for obj in iter_objects(s3_client, bucket, prefix):
+        name = obj["Key"].rsplit("/", 1)[-1]
+        if name.startswith(("_", ".")) or obj["Size"] == 0:
+            continue
+        uris.append(f"s3://{bucket}/{obj['Key']}")
+    return uris
+
+
+#: let files written with narrower types (``int`` in a ``bigint`` column,
+#: ``float`` in a ``double`` column) be read with the catalog schema
+SCAN_CAST_OPTIONS = pl.ScanCastOptions(
+    integer_cast="upcast",
+    float_cast="upcast",
+    datetime_cast="nanosecond-downcast",
+)
+
+
+def _get_scan_schema(
+    first_file: str,
+    columns_types: T.Dict[str, str],
+    storage_options: T.Optional[T.Dict[str, str]],
+) -> T.Dict[str, pl.DataType]:
+    """
+    The Polars schema of the Glue data columns. Glue types don't have the
+    timestamp unit or all the Polars types, so a column whose type in the
+    first file maps to the same Glue type keeps the type of that file.
+    """
+    file_schema = pl.scan_parquet(
+        first_file,
+        storage_options=storage_options,
+    ).collect_schema()
+    schema = dict()
+    for name, type_ in columns_types.items():
+        dtype = file_schema.get(name)
+        try:
+            same = dtype is not None and polars_type_to_glue(dtype) == type_
+        except TypeError:
+            same = False
+        schema[name] = dtype if same else glue_type_to_polars(type_)
+    return schema
+
+
+def read_table(
+    database: str,
+    table: str,
+    boto_ses: "boto3.session.Session",
+    columns: T.Optional[T.Sequence[str]] = None,
+    filters: T.Union[pl.Expr, T.Sequence[pl.Expr], None] = None,
+    storage_options: T.Optional[T.Dict[str, str]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> pl.LazyFrame:
+    """
+    Read a Hive partitioned Parquet table of the Glue Catalog, e.g. the
+    ones created by :func:`~learn_awswrangler.catalog.create_parquet_table`,
+    without Athena.
+
+    1. The partitions come from Glue ``GetPartitions``. If the table uses
+       partition projection there are none registered, they are found by
+       :func:`~learn_awswrangler.discovery.discover_partitions` instead.
+    2. The partitions are pruned by :func:`prune_partitions` before S3 is
+       touched.
+    3. The files of the surviving partitions are listed, ``max_workers``
+       partitions at a time.
+    4. Only those files are scanned by ``pl.scan_parquet``, with the
+       partition columns parsed from the ``k=v`` folders and typed like
+       the Glue partition keys. The data columns are read with the types
+       of the Glue table, files with narrower integer or float types are
+       upcast and the columns missing in a file are null. Polars pushes
+       ``columns`` and ``filters`` into the scan: only the needed columns
+       are downloaded, and row groups whose statistics can't match are
+       skipped.
+
+    Example::
+
+        >>> lf = read_table(
+        ...     "db",
+        ...     "events",
+        ...     boto_ses,
+        ...     columns=["id", "value"],
+        ...     filters=[pl.col("year") == 2001, pl.col("value") > 100],
+        ... )
+        >>> df = lf.collect()
+
+    :param columns: the columns to read, partition columns included, None
+        for all columns.
+    :param filters: Polars predicates, ANDed. Pass a list rather than one
+        ``a & b`` expression, a predicate is only used for pruning if all
+        its columns are partition columns.
+    :param storage_options: Polars ``storage_options`` to read S3, see
+        :func:`~learn_awswrangler.s3_utils.get_polars_storage_options`.
+        If None, Polars picks up the credentials from the environment.
+    :param max_workers: number of concurrent list requests.
+
+    :raises ValueError: if the table is not a Parquet table, or a partition
+        is not in its ``k=v`` folder.
+    """
+    glue_client = boto_ses.client("glue")
+    table_data = glue_client.get_table(DatabaseName=database, Name=table)["Table"]
+    sd = table_data["StorageDescriptor"]
+    if "parquet" not in sd.get("InputFormat", "").lower():
+        raise ValueError(f"{database}.{table} is not a Parquet table")
+    s3dir = to_s3_dir_uri(sd["Location"])
+    partitions_types = {
+        col["Name"]: col["Type"] for col in table_data.get("PartitionKeys", [])
+    }
+    partition_cols = list(partitions_types)
+    filter_list = _to_filter_list(filters)
+    s3_client = new_s3_client(boto_ses, max_workers=max_workers)
+
+    if partition_cols:
+        parameters = table_data.get("Parameters", {})
+        if parameters.get("projection.enabled", "").lower() == "true":
+            partitions_values = discover_partitions(
+                s3dir,
+                s3_client,
+                partition_cols=partition_cols,
+                max_workers=max_workers,
+            )
+        else:
+            partitions_values = dict()
+            for partition in _get_partitions(glue_client, database, table):
+                location = partition["StorageDescriptor"]["Location"]
+                partitions_values[to_s3_dir_uri(location)] = partition["Values"]
+        for location, values in partitions_values.items():
+            # Polars parses the partition values from the path
+            if not location.endswith(to_hive_path(partition_cols, values)):
+                raise ValueError(
+                    f"partition {values} of {database}.{table} is not in a "
+                    f"Hive folder: {location!r}"
+                )
+        partitions_values = prune_partitions(
+            partitions_values, partitions_types, filter_list
+        )
+        locations = sorted(partitions_values)
+    else:
+        locations = [s3dir]
+
+    def list_files(location: str) -> T.List[str]:
+        return _list_parquet_files(s3_client, location)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        files = [uri for uris in executor.map(list_files, locations) for uri in uris]
+
+    hive_schema = {
+        col: glue_type_to_polars(type_) for col, type_ in partitions_types.items()
+    }
+    columns_types = {col["Name"]: col["Type"] for col in sd.get("Columns", [])}
+    if files:
+        lf = pl.scan_parquet(
+            files,
+            schema=_get_scan_schema(files[0], columns_types, storage_options),
+            hive_partitioning=bool(partition_cols),
+            hive_schema=hive_schema or None,
+            missing_columns="insert",
+            extra_columns="ignore",
+            cast_options=SCAN_CAST_OPTIONS,
+            storage_options=storage_options,
+        )
+    else:
+        # nothing to read, an empty frame with the schema of the table
+        lf = pl.LazyFrame(
+            schema={
+                **{
+                    name: glue_type_to_polars(type_)
+                    for name, type_ in columns_types.items()
+                },
+                **hive_schema,
+            }
+        )
+    for expr in filter_list:
+        lf = lf.filter(expr)
+    if columns is not None:
+        lf = lf.select(columns)
+    return lf
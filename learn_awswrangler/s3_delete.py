@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+"""
+Delete everything under an S3 prefix with concurrent ``delete_objects``
+batches.
+"""
+
+import typing as T
+import time
+import random
+import threading
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from botocore.exceptions import ClientError
+
+from .s3_utils import DEFAULT_MAX_WORKERS, split_s3_uri, iter_objects
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3 import S3Client
+
+#: the ``delete_objects`` API limit
+MAX_KEYS_PER_BATCH = 1000
+
+#: error codes worth retrying, the rest (e.g. ``AccessDenied``) are final
+RETRYABLE_ERROR_CODES = {
+    "SlowDown",
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "ServiceUnavailable",
+    "InternalError",
+    "RequestTimeout",
+}
+
+
+@dataclasses.dataclass
+class DeleteProgress:
+    """
+    Running totals passed to the ``progress`` callback of
+    :func:`delete_prefix` after every batch.
+
+    :param n_listed: number of keys listed so far.
+    :param n_deleted: number of keys deleted so far.
+    :param n_batches: number of finished ``delete_objects`` batches.
+    :param n_retries: number of retried requests so far.
+    """
+
+    n_listed: int = 0
+    n_deleted: int = 0
+    n_batches: int = 0
+    n_retries: int = 0
+
+
+@dataclasses.dataclass
+class DeleteResult(DeleteProgress):
+    """
+    The final :class:`DeleteProgress` plus the keys that could not be
+    deleted.
+
+    :param errors: the ``Errors`` entries of ``delete_objects`` that were
+        not retryable or ran out of retries.
+    """
+
+    errors: T.List[T.Dict[str, T.Any]] = dataclasses.field(default_factory=list)
+
+
+def _backoff(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Exponential backoff with full jitter.
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
+
+
+def delete_prefix(
+    s3dir: str,
+    s3_client: "S3Client",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    batch_size: int = MAX_KEYS_PER_BATCH,
+    max_retries: int = 5,
+    base_delay: float = 0.2,
+    max_delay: float = 10.0,
+    progress: T.Optional[T.Callable[[DeleteProgress], T.Any]] = None,
+    raise_on_error: bool = True,
+    allow_bucket_root: bool = False,
+) -> DeleteResult:
+    """
+    Delete every object under ``s3dir``.
+
+    The listing is paged with ``list_objects_v2`` and keys are grouped into
+    ``delete_objects`` batches of up to 1000 keys, which are sent by
+    ``max_workers`` threads while the listing continues. At most
+    ``2 * max_workers`` batches are in flight, so memory stays bounded on
+    prefixes of any size.
+
+    Throttling (``SlowDown``, ``503``, ...) is retried with exponential
+    backoff and jitter, both when the whole request fails and when
+    ``delete_objects`` reports individual keys in ``Errors``, only the
+    failed keys are sent again. Note that botocore retries throttled
+    requests on its own first, ``Config(retries={"mode": "adaptive"})``
+    also makes it slow down the client.
+
+    Example::
+
+        >>> delete_prefix(
+        ...     "s3://bucket/table/",
+        ...     new_s3_client(boto_ses, max_workers=16),
+        ...     max_workers=16,
+        ...     progress=lambda p: print(f"{p.n_deleted}/{p.n_listed}"),
+        ... )
+
+    :param s3dir: S3 URI of the prefix. It is used as is, so
+        ``s3://bucket/table`` also deletes ``s3://bucket/table_backup/``,
+        end it with ``/`` to delete one folder.
+    :param s3_client: boto3 S3 client, shared by all workers.
+    :param max_workers: number of concurrent ``delete_objects`` requests.
+    :param batch_size: number of keys per request, at most 1000.
+    :param max_retries: number of retries of a throttled batch.
+    :param base_delay: the backoff of the first retry, in seconds, doubled
+        on every retry.
+    :param max_delay: the upper limit of the backoff, in seconds.
+    :param progress: called with a :class:`DeleteProgress` after every
+        batch, from the worker threads.
+    :param raise_on_error: raise ``RuntimeError`` at the end if some keys
+        could not be deleted, otherwise return them in
+        :attr:`DeleteResult.errors`.
+    :param allow_bucket_root: ``s3://bucket/`` empties the whole bucket, it
+        raises ``ValueError`` unless this is True.
+    """
+    if not (1 <= batch_size <= MAX_KEYS_PER_BATCH):
+        raise ValueError(f"batch_size must be between 1 and {MAX_KEYS_PER_BATCH}")
+    bucket, prefix = split_s3_uri(s3dir)
+    if not prefix and not allow_bucket_root:
+        raise ValueError(
+            f"{s3dir!r} is the root of the bucket, "
+            f"pass allow_bucket_root=True to delete everything in it"
+        )
+    result = DeleteResult()
+    lock = threading.Lock()
+
+    def delete_batch(keys: T.List[str]):
+        errors = list()
+        attempt = 0
+        while keys:
+            try:
+                res = s3_client.delete_objects(
+                    Bucket=bucket,
+                    Delete={
+                        "Objects": [{"Key": key} for key in keys],
+                        "Quiet": True,
+                    },
+                )
+                failed = res.get("Errors", [])
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code not in RETRYABLE_ERROR_CODES or attempt >= max_retries:
+                    raise
+                failed = [{"Key": key, "Code": code} for key in keys]
+            retry = list()
+            final = list()
+            for err in failed:
+                if err.get("Code") in RETRYABLE_ERROR_CODES:
+                    retry.append(err)
+                else:
+                    final.append(err)
+            if attempt >= max_retries:
+                final.extend(retry)
+                retry = list()
+            errors.extend(final)
+            with lock:
+                result.n_deleted += len(keys) - len(failed)
+            keys = [err["Key"] for err in retry]
+            if keys:
+                time.sleep(_backoff(attempt, base_delay, max_delay))
+                attempt += 1
+                with lock:
+                    result.n_retries += 1
+        with lock:
+            result.n_batches += 1
+            result.errors.extend(errors)
+            snapshot = DeleteProgress(
+                n_listed=result.n_listed,
+                n_deleted=result.n_deleted,
+                n_batches=result.n_batches,
+                n_retries=result.n_retries,
+            )
+        if progress is not None:
+            progress(snapshot)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = set()
+
+        def submit(keys: T.List[str]):
+            nonlocal futures
+            if len(futures) >= 2 * max_workers:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            futures.add(executor.submit(delete_batch, keys))
+
+        keys = list()
+        for obj in iter_objects(s3_client, bucket, prefix):
+            keys.append(obj["Key"])
+            with lock:
+                result.n_listed += 1
+            if len(keys) == batch_size:
+                submit(keys)
+                keys = list()
+        if keys:
+            submit(keys)
+        for future in futures:
+            future.result()
+
+    if raise_on_error and result.errors:
+        raise RuntimeError(
+            f"failed to delete {len(result.errors)} objects under {s3dir!r}, "
+            f"first error: {result.errors[0]}"
+        )
+    return result
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+"""
+Stream bytes to an S3 object through multipart upload, holding at most one
+part in memory at a time.
+"""
+
+import typing as T
+import io
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3 import S3Client
+
+KB = 1024
+MB = 1024 * KB
+
+#: S3 rejects multipart uploads whose non-last parts are smaller than 5 MiB.
+MIN_PART_SIZE = 5 * MB
+DEFAULT_PART_SIZE = 8 * MB
+
+
+class BufferReader(io.RawIOBase):
+    """
+    A seekable, read only binary file over a buffer, the buffer is never
+    copied as a whole.
+
+    botocore wraps ``bytes`` / ``bytearray`` request bodies in ``io.BytesIO``,
+    which copies a ``bytearray``. A file-like body is read chunk by chunk
+    instead, so wrapping the part buffer in this class avoids that copy.
+    """
+
+    def __init__(self, buffer):
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def __len__(self) -> int:
+        return self._view.nbytes
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        start = self._pos
+        end = min(start + len(b), self._view.nbytes)
+        n = end - start
+        b[:n] = self._view[start:end]
+        self._pos = end
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._view.nbytes + offset
+        else:  # pragma: no cover
+            raise ValueError(f"invalid whence {whence!r}")
+        if pos < 0:
+            raise ValueError(f"negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+class MultipartUploadWriter(io.RawIOBase):
+    """
+    A writable file-like object that uploads everything written to it to
+    ``s3://{bucket}/{key}``.
+
+    Bytes are copied into a reusable ``part_size`` buffer, every time it is
+    full it is shipped as one part of a multipart upload. If the total size
+    never reaches one part, the object is written with a single
+    ``put_object`` call instead. So the serializer can write into this
+    object directly and the full file never has to exist in memory.
+
+    Usage::
+
+        with MultipartUploadWriter(s3_client, bucket, key) as f:
+            df.write_parquet(f)
+
+    If an exception is raised inside the ``with`` block, the multipart
+    upload is aborted and no object is created.
+
+    :param s3_client: boto3 S3 client.
+    :param bucket: S3 bucket name.
+    :param key: S3 object key.
+    :param part_size: size in bytes of each uploaded part, at least 5 MiB.
+    :param extra_args: additional keyword arguments for ``put_object`` and
+        ``create_multipart_upload``, for example ``{"ContentType": "..."}``.
+    """
+
+    def __init__(
+        self,
+        s3_client: "S3Client",
+        bucket: str,
+        key: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        extra_args: T.Optional[T.Dict[str, T.Any]] = None,
+    ):
+        super().__init__()
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(
+                f"part_size has to be at least {MIN_PART_SIZE} bytes, "
+                f"got {part_size}"
+            )
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.extra_args = dict() if extra_args is None else extra_args
+
+        self.upload_id: T.Optional[str] = None
+        self.parts: T.List[T.Dict[str, T.Any]] = list()
+        self.size: int = 0
+        self.etag: T.Optional[str] = None
+        # the part buffer is allocated once and reused for every part, it is
+        # handed to botocore through a BufferReader, so the serialized bytes
+        # are copied exactly once, into this buffer
+        self._buffer = bytearray(part_size)
+        self._pos = 0
+
+    @property
+    def uri(self) -> str:
+        return f"s3://{self.bucket}/{self.key}"
+
+    @property
+    def n_parts(self) -> int:
+        return len(self.parts)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        with memoryview(b) as view:
+            view = view.cast("B")
+            n = view.nbytes
+            offset = 0
+            while offset < n:
+                size = min(self.part_size - self._pos, n - offset)
+                self._buffer[self._pos : self._pos + size] = view[
+                    offset : offset + size
+                ]
+                self._pos += size
+                offset += size
+                if self._pos == self.part_size:
+                    self._upload_part(self._pos)
+        self.size += n
+        return n
+
+    def write_from(self, f: T.BinaryIO) -> int:
+        """
+        Copy everything from a readable binary file into this writer.
+
+        The file is read with ``readinto`` straight into the part buffer,
+        so there is no intermediate ``bytes`` object per chunk like
+        ``shutil.copyfileobj`` would create.
+
+        :return: number of bytes copied.
+        """
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        total = 0
+        while True:
+            with memoryview(self._buffer) as view:
+                n = f.readinto(view[self._pos :])
+            if not n:
+                break
+            self._pos += n
+            self.size += n
+            total += n
+            if self._pos == self.part_size:
+                self._upload_part(self._pos)
+        return total
+
+    def _upload_part(self, size: int):
+        """
+        Upload the first ``size`` bytes of the part buffer as the next part
+        and rewind the buffer.
+        """
+        if self.upload_id is None:
+            res = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                **self.extra_args,
+            )
+            self.upload_id = res["UploadId"]
+        part_number = len(self.parts) + 1
+        with BufferReader(memoryview(self._buffer)[:size]) as body:
+            res = self.s3_client.upload_part(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                PartNumber=part_number,
+                Body=body,
+            )
+        self.parts.append({"PartNumber": part_number, "ETag": res["ETag"]})
+        self._pos = 0
+
+    def _complete(self):
+        if self.upload_id is None:
+            with BufferReader(memoryview(self._buffer)[: self._pos]) as body:
+                res = self.s3_client.put_object(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    Body=body,
+                    **self.extra_args,
+                )
+        else:
+            if self._pos:
+                self._upload_part(self._pos)
+            res = self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={"Parts": self.parts},
+            )
+        self._buffer = bytearray()
+        self._pos = 0
+        self.etag = res["ETag"]
+
+    def abort(self):
+        """
+        Abort the multipart upload (if any) and discard the buffered bytes.
+        """
+        if self.closed:
+            return
+        try:
+            if self.upload_id is not None:
+                self.s3_client.abort_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self.upload_id,
+                )
+        finally:
+            self._buffer = bytearray()
+            self._pos = 0
+            super().close()
+
+    def close(self):
+        """
+        Flush the remaining bytes and finish the upload.
+        """
+        if self.closed:
+            return
+        try:
+            self._complete()
+        except Exception:
+            self.abort()
+            raise
+        super().close()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""
+Small helpers to work with S3 without pulling in a path library.
+"""
+
+import typing as T
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    import boto3
+    from mypy_boto3_s3 import S3Client
+
+#: the default number of concurrent S3 requests
+DEFAULT_MAX_WORKERS = 8
+
+
+def split_s3_uri(s3uri: str) -> T.Tuple[str, str]:
+    """
+    Split an S3 URI into bucket and key.
+
+    Example::
+
+        >>> split_s3_uri("s3://my-bucket/table/year=2001/data.parquet")
+        ('my-bucket', 'table/year=2001/data.parquet')
+    """
+    if not s3uri.startswith("s3://"):
+        raise ValueError(f"{s3uri!r} is not a valid S3 URI")
+    parts = s3uri[5:].split("/", 1)
+    bucket = parts[0]
+    key = parts[1] if len(parts) == 2 else ""
+    return bucket, key
+
+
+def to_s3_dir_uri(s3uri: str) -> str:
+    """
+    Make sure the S3 URI ends with ``/`` so it can be used as a prefix.
+    """
+    if s3uri.endswith("/"):
+        return s3uri
+    return s3uri + "/"
+
+
+def iter_objects(
+    s3_client: "S3Client",
+    bucket: str,
+    prefix: str,
+) -> T.Iterable[T.Dict[str, T.Any]]:
+    """
+    Iterate over all objects under ``s3://{bucket}/{prefix}``, the items are
+    the ``Contents`` entries of ``list_objects_v2``.
+    """
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        yield from page.get("Contents", [])
+
+
+def delete_keys(
+    s3_client: "S3Client",
+    bucket: str,
+    keys: T.Sequence[str],
+):
+    """
+    Delete ``keys`` in ``bucket`` with one ``delete_objects`` request per
+    1000 keys, the API limit. Raise ``RuntimeError`` if any key fails.
+    """
+    keys = list(keys)
+    for i in range(0, len(keys), 1000):
+        res = s3_client.delete_objects(
+            Bucket=bucket,
+            Delete={
+                "Objects": [{"Key": key} for key in keys[i : i + 1000]],
+                "Quiet": True,
+            },
+        )
+        if res.get("Errors"):
+            raise RuntimeError(f"failed to delete objects: {res['Errors']}")
+
+
+def get_polars_storage_options(
+    boto_ses: "boto3.session.Session",
+    endpoint_url: T.Optional[str] = None,
+) -> T.Dict[str, str]:
+    """
+    Build the Polars ``storage_options`` that reuse the credentials and
+    region of a boto3 session, so ``pl.scan_parquet("s3://...")`` reads S3
+    as the same identity as the boto3 clients, for example when a named
+    profile is used.
+    """
+    credentials = boto_ses.get_credentials().get_frozen_credentials()
+    storage_options = {
+        "aws_access_key_id": credentials.access_key,
+        "aws_secret_access_key": credentials.secret_key,
+        "aws_region": boto_ses.region_name,
+    }
+    if credentials.token:
+        storage_options["aws_session_token"] = credentials.token
+    if endpoint_url:
+        storage_options["aws_endpoint_url"] = endpoint_url
+        if endpoint_url.startswith("http://"):
+            storage_options["aws_allow_http"] = "true"
+    return storage_options
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import typing as T
+import os
+import logging
+
+import moto
+from boto_session_manager import BotoSesManager
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3 import S3Client
+
+
+class BaseMockTest:
+    """
+    Base class for unit tests that talk to a moto mocked AWS account.
+
+    Subclass it and use ``cls.bsm``, ``cls.s3_client`` and ``cls.bucket``
+    in your test methods. Every test class gets its own fresh mock account.
+
+    By default moto patches botocore in process. Set ``use_server = True``
+    when the code under test reads S3 with Polars, which talks to S3 through
+    its own Rust HTTP client. A moto server is started on a random port and
+    exposed through the ``AWS_ENDPOINT_URL`` environment variable, which
+    both boto3 and Polars pick up.
+    """
+
+    use_mock: bool = True
+    use_server: bool = False
+    region: str = "us-east-1"
+    bucket: str = "learn-awswrangler-test"
+
+    bsm: BotoSesManager
+    s3_client: "S3Client"
+    endpoint_url: T.Optional[str] = None
+
+    _env = {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_DEFAULT_REGION": region,
+        "AWS_REGION": region,
+        "AWS_ALLOW_HTTP": "true",
+    }
+
+    @classmethod
+    def setup_class(cls):
+        if cls.use_mock:
+            if cls.use_server:
+                from moto.server import ThreadedMotoServer
+
+                logging.getLogger("werkzeug").setLevel(logging.ERROR)
+                cls.server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+                cls.server.start()
+                host, port = cls.server.get_host_and_port()
+                cls.endpoint_url = f"http://{host}:{port}"
+                env = dict(cls._env, AWS_ENDPOINT_URL=cls.endpoint_url)
+                cls._old_env = {key: os.environ.get(key) for key in env}
+                os.environ.update(env)
+            else:
+                cls.mock_aws = moto.mock_aws()
+                cls.mock_aws.start()
+        cls.bsm = BotoSesManager(
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing",
+            region_name=cls.region,
+        )
+        cls.s3_client = cls.bsm.s3_client
+        cls.s3_client.create_bucket(Bucket=cls.bucket)
+        cls.setup_class_post_hook()
+
+    @classmethod
+    def setup_class_post_hook(cls):
+        pass
+
+    @classmethod
+    def teardown_class(cls):
+        if cls.use_mock:
+            if cls.use_server:
+                cls.server.stop()
+                for key, value in cls._old_env.items():
+                    if value is None:
+                        os.environ.pop(key, None)
+                    else:
+                        os.environ[key] = value
+            else:
+                cls.mock_aws.stop()
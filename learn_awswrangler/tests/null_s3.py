@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import typing as T
+
+import boto3
+from botocore.awsrequest import AWSResponse
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from mypy_boto3_s3 import S3Client
+
+
+class _RawResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def stream(self, **kwargs):
+        yield self.content
+
+
+def _null_send(request, **kwargs) -> AWSResponse:
+    """
+    A ``before-send`` handler that reads the request body in 64 KB chunks,
+    like the HTTP connection would, throws it away and returns a minimal
+    successful response.
+    """
+    body = request.body
+    if hasattr(body, "read"):
+        while body.read(64 * 1024):
+            pass
+    if request.method == "POST" and "uploads" in request.url:
+        content = (
+            b"<InitiateMultipartUploadResult>"
+            b"<UploadId>null</UploadId>"
+            b"</InitiateMultipartUploadResult>"
+        )
+    elif request.method == "POST":
+        content = (
+            b"<CompleteMultipartUploadResult>"
+            b"<ETag>&quot;null&quot;</ETag>"
+            b"</CompleteMultipartUploadResult>"
+        )
+    else:
+        content = b""
+    return AWSResponse(request.url, 200, {"ETag": '"null"'}, _RawResponse(content))
+
+
+def new_null_s3_client() -> "S3Client":
+    """
+    Create a real botocore S3 client whose requests never leave the process.
+
+    Serialization, checksums and body streaming all run as usual, only the
+    HTTP round trip is replaced. Unlike moto, nothing is stored, so memory
+    measurements only show what the client side code allocates.
+    """
+    s3_client = boto3.client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    )
+    s3_client.meta.events.register("before-send.s3", _null_send)
+    return s3_client
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark Parquet codec / level / row group size combinations on a sample of
+the data, and pick the best one for an objective.
+"""
+
+import typing as T
+import io
+import time
+import dataclasses
+
+import polars as pl
+
+from .s3_multipart import MB
+
+
+class ObjectiveEnum:
+    """
+    What :func:`tune_parquet` optimizes for.
+
+    - ``write_throughput``: the fastest encode time.
+    - ``scan_cost``: the fastest time to fetch and decode the file, i.e.
+      decode time plus size divided by ``scan_bytes_per_sec``. This is what
+      an Athena or Polars scan over S3 pays.
+    - ``storage``: the smallest file, ties go to the faster decode.
+    """
+
+    write_throughput = "write_throughput"
+    scan_cost = "scan_cost"
+    storage = "storage"
+
+
+#: codec -> compression levels tried by default, None is the codec default
+DEFAULT_CODECS: T.Dict[str, T.List[T.Optional[int]]] = {
+    "uncompressed": [None],
+    "snappy": [None],
+    "lz4": [None],
+    "zstd": [1, 3, 9],
+    "gzip": [6],
+}
+DEFAULT_ROW_GROUP_SIZES: T.List[T.Optional[int]] = [None, 128_000, 1_000_000]
+#: big enough for the row group sizes above to make a difference
+DEFAULT_SAMPLE_ROWS = 1_000_000
+#: S3 single stream GET throughput used by the ``scan_cost`` objective
+DEFAULT_SCAN_BYTES_PER_SEC = 100 * MB
+
+
+@dataclasses.dataclass
+class ParquetSetting:
+    """
+    One Parquet writer setting, the keyword arguments of
+    :func:`~learn_awswrangler.writer.write_partitioned_parquet`.
+    """
+
+    compression: str
+    compression_level: T.Optional[int] = None
+    row_group_size: T.Optional[int] = None
+
+    def to_kwargs(self) -> T.Dict[str, T.Any]:
+        return dataclasses.asdict(self)
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    """
+    The measurement of one :class:`ParquetSetting` on the sample.
+
+    :param encode_time: best of ``repeat`` ``write_parquet`` time, in seconds.
+    :param decode_time: best of ``repeat`` ``read_parquet`` time, in seconds.
+    :param n_bytes: the Parquet file size.
+    :param n_bytes_in_memory: the ``estimated_size()`` of the sample.
+    """
+
+    setting: ParquetSetting
+    encode_time: float
+    decode_time: float
+    n_bytes: int
+    n_bytes_in_memory: int
+
+    @property
+    def ratio(self) -> float:
+        """
+        Compression ratio, in-memory size divided by file size.
+        """
+        return self.n_bytes_in_memory / max(self.n_bytes, 1)
+
+    @property
+    def encode_throughput(self) -> float:
+        """
+        In-memory bytes encoded per second.
+        """
+        return self.n_bytes_in_memory / max(self.encode_time, 1e-9)
+
+    def scan_time(self, scan_bytes_per_sec: float) -> float:
+        return self.decode_time + self.n_bytes / scan_bytes_per_sec
+
+
+@dataclasses.dataclass
+class TuningResult:
+    """
+    :param objective: see :class:`ObjectiveEnum`.
+    :param results: all measurements, best first.
+    """
+
+    objective: str
+    results: T.List[BenchmarkResult]
+
+    @property
+    def best(self) -> ParquetSetting:
+        return self.results[0].setting
+
+    def to_df(self) -> pl.DataFrame:
+        """
+        All measurements as a table, best first.
+        """
+        return pl.DataFrame(
+            [
+                dict(
+                    compression=res.setting.compression,
+                    compression_level=res.setting.compression_level,
+                    row_group_size=res.setting.row_group_size,
+                    encode_time=res.encode_time,
+                    decode_time=res.decode_time,
+                    n_bytes=res.n_bytes,
+                    ratio=res.ratio,
+                )
+                for res in self.results
+            ],
+            schema_overrides={
+                "compression_level": pl.Int64,
+                "row_group_size": pl.Int64,
+            },
+        )
+
+
+def take_sample(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    n_rows: int = DEFAULT_SAMPLE_ROWS,
+    n_chunks: int = 10,
+) -> pl.DataFrame:
+    """
+    Take about ``n_rows`` rows from ``df`` as ``n_chunks`` contiguous
+    slices spread evenly over the data. Contiguous runs keep the sort order
+    and locality that dictionary and run length encoding depend on, which a
+    random row sample would destroy. A LazyFrame is sampled from its head.
+    """
+    if isinstance(df, pl.LazyFrame):
+        return df.head(n_rows).collect()
+    if df.height <= n_rows:
+        return df
+    chunk_rows = max(n_rows // n_chunks, 1)
+    step = df.height // n_chunks
+    return pl.concat(
+        [df.slice(i * step, chunk_rows) for i in range(n_chunks)],
+        rechunk=True,
+    )
+
+
+def benchmark_setting(
+    df: pl.DataFrame,
+    setting: ParquetSetting,
+    repeat: int = 3,
+) -> BenchmarkResult:
+    """
+    Measure one setting on ``df``, in memory, taking the best of ``repeat``
+    runs to filter out noise.
+    """
+    encode_time = decode_time = float("inf")
+    n_bytes = 0
+    for _ in range(repeat):
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        df.write_parquet(buffer, **setting.to_kwargs())
+        encode_time = min(encode_time, time.perf_counter() - start)
+        n_bytes = buffer.tell()
+        buffer.seek(0)
+        start = time.perf_counter()
+        pl.read_parquet(buffer)
+        decode_time = min(decode_time, time.perf_counter() - start)
+    return BenchmarkResult(
+        setting=setting,
+        encode_time=encode_time,
+        decode_time=decode_time,
+        n_bytes=n_bytes,
+        n_bytes_in_memory=df.estimated_size(),
+    )
+
+
+def tune_parquet(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    objective: str = ObjectiveEnum.scan_cost,
+    codecs: T.Optional[T.Dict[str, T.List[T.Optional[int]]]] = None,
+    row_group_sizes: T.Optional[T.List[T.Optional[int]]] = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    repeat: int = 3,
+    scan_bytes_per_sec: float = DEFAULT_SCAN_BYTES_PER_SEC,
+) -> TuningResult:
+    """
+    Try every codec x level x row group size combination on a sample of
+    ``df`` and rank them for ``objective``.
+
+    Example::
+
+        >>> result = tune_parquet(df, objective="storage")
+        >>> print(result.to_df())
+        >>> write_partitioned_parquet(df, ..., **result.best.to_kwargs())
+
+    Or let the writer do it with ``write_partitioned_parquet(auto_tune=...)``.
+
+    :param df: the data to write, see :func:`take_sample`.
+    :param objective: see :class:`ObjectiveEnum`.
+    :param codecs: codec -> list of compression levels to try, default is
+        :data:`DEFAULT_CODECS`.
+    :param row_group_sizes: row group sizes to try, None is the Polars
+        default. Keep them smaller than ``sample_rows``, or they are all
+        the same on the sample.
+    :param sample_rows: number of rows benchmarked.
+    :param repeat: each setting is measured this many times, the best
+        time is kept.
+    :param scan_bytes_per_sec: network throughput used by the
+        ``scan_cost`` objective.
+    """
+    if codecs is None:
+        codecs = DEFAULT_CODECS
+    if row_group_sizes is None:
+        row_group_sizes = DEFAULT_ROW_GROUP_SIZES
+    if objective == ObjectiveEnum.write_throughput:
+        key = lambda res: res.encode_time
+    elif objective == ObjectiveEnum.scan_cost:
+        key = lambda res: res.scan_time(scan_bytes_per_sec)
+    elif objective == ObjectiveEnum.storage:
+        key = lambda res: (res.n_bytes, res.decode_time)
+    else:
+        raise ValueError(f"invalid objective {objective!r}")
+
+    sample = take_sample(df, n_rows=sample_rows)
+    results = [
+        benchmark_setting(
+            sample,
+            ParquetSetting(
+                compression=compression,
+                compression_level=level,
+                row_group_size=row_group_size,
+            ),
+            repeat=repeat,
+        )
+        for compression, levels in codecs.items()
+        for level in levels
+        for row_group_size in row_group_sizes
+    ]
+    results.sort(key=key)
+    return TuningResult(objective=objective, results=results)
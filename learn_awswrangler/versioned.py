@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""
+Rewrite a table without reader downtime: write a new copy under a versioned
+prefix, swap the Glue table to it, then clean up the old copies.
+"""
+
+import typing as T
+import uuid
+import datetime
+import dataclasses
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import polars as pl
+
+from .s3_utils import split_s3_uri, to_s3_dir_uri
+from .writer import PartitionWriteResult, write_partitioned_parquet
+from .catalog import (
+    create_parquet_table,
+    get_partitions_values,
+    get_table_input,
+    swap_table_location,
+)
+from .glue_schema import get_schema, polars_schema_to_glue
+from .projection import infer_partition_projection
+from .s3_delete import DeleteResult, delete_prefix
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    import boto3
+    from mypy_boto3_s3 import S3Client
+
+VERSION_KEY = "v"
+
+
+def new_run_id() -> str:
+    """
+    A unique run id that sorts by time, e.g. ``20240101T000000Z-1a2b3c``.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return f"{now:%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:6]}"
+
+
+def list_versions(
+    s3dir: str,
+    s3_client: "S3Client",
+) -> T.List[str]:
+    """
+    List the run ids of the ``v=${run_id}/`` folders under ``s3dir``,
+    oldest first.
+    """
+    bucket, prefix = split_s3_uri(to_s3_dir_uri(s3dir))
+    version_prefix = f"{prefix}{VERSION_KEY}="
+    paginator = s3_client.get_paginator("list_objects_v2")
+    run_ids = list()
+    for page in paginator.paginate(
+        Bucket=bucket,
+        Prefix=version_prefix,
+        Delimiter="/",
+    ):
+        for common_prefix in page.get("CommonPrefixes", []):
+            run_ids.append(common_prefix["Prefix"][len(version_prefix) : -1])
+    return sorted(run_ids)
+
+
+def delete_old_versions(
+    s3dir: str,
+    s3_client: "S3Client",
+    current_run_id: str,
+    keep_versions: int = 2,
+) -> T.List[DeleteResult]:
+    """
+    Delete the ``v=${run_id}/`` folders under ``s3dir`` except the current
+    one and the newest ``keep_versions - 1`` before it.
+    """
+    s3dir = to_s3_dir_uri(s3dir)
+    run_ids = [
+        run_id for run_id in list_versions(s3dir, s3_client) if run_id < current_run_id
+    ]
+    n_keep = max(keep_versions - 1, 0)
+    to_delete = run_ids[: max(len(run_ids) - n_keep, 0)]
+    return [
+        delete_prefix(f"{s3dir}{VERSION_KEY}={run_id}/", s3_client)
+        for run_id in to_delete
+    ]
+
+
+@dataclasses.dataclass
+class VersionedWriteResult:
+    """
+    :param run_id: the version that was written.
+    :param location: the S3 URI of the new copy, ``${s3dir}v=${run_id}/``.
+    :param partitions: the return value of the writer.
+    :param cleanup: the background deletion of the old copies, call
+        ``cleanup.result()`` to wait for it. None if ``keep_versions`` is None.
+    """
+
+    run_id: str
+    location: str
+    partitions: T.List[PartitionWriteResult]
+    cleanup: T.Optional["Future[T.List[DeleteResult]]"] = None
+
+
+def write_versioned_parquet(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    s3dir: str,
+    database: str,
+    table: str,
+    partition_cols: T.Sequence[str],
+    s3_client: "S3Client",
+    boto_ses: "boto3.session.Session",
+    compression: str = "snappy",
+    run_id: T.Optional[str] = None,
+    keep_versions: T.Optional[int] = 2,
+    **kwargs,
+) -> VersionedWriteResult:
+    """
+    Replace the content of a Glue table without reader downtime.
+
+    1. The data is written by :func:`write_partitioned_parquet` to a new
+       ``${s3dir}v=${run_id}/`` prefix, at full speed, nothing the readers
+       see is touched.
+    2. The table is created, or pointed to the new prefix by
+       :func:`~learn_awswrangler.catalog.swap_table_location`: one
+       ``update_table`` call for unpartitioned and partition projection
+       tables, whose projection ranges and values follow ``df``, partition
+       by partition otherwise. The schema of the table follows ``df``, the
+       partition keys must not change.
+    3. The old ``v=...`` prefixes are deleted in a background thread,
+       keeping the newest ``keep_versions`` (the new one included), so
+       queries that started before the swap can still finish.
+
+    Compare with the delete, write, ``delete_table()``,
+    ``create_parquet_table`` sequence, where readers see an empty or
+    partial table the whole time.
+
+    :param s3dir: S3 URI of the table root folder, the versions live under
+        it.
+    :param run_id: the version name, default is :func:`new_run_id`. Custom
+        run ids must sort in write order, old versions are found by sorting.
+    :param keep_versions: number of versions to keep, None to keep all of
+        them.
+    :param kwargs: the other arguments of :func:`write_partitioned_parquet`.
+    """
+    if run_id is None:
+        run_id = new_run_id()
+    s3dir = to_s3_dir_uri(s3dir)
+    location = f"{s3dir}{VERSION_KEY}={run_id}/"
+    results = write_partitioned_parquet(
+        df=df,
+        s3dir=location,
+        partition_cols=partition_cols,
+        s3_client=s3_client,
+        compression=compression,
+        **kwargs,
+    )
+
+    glue_client = boto_ses.client("glue")
+    table_input = get_table_input(glue_client, database, table)
+    if table_input is None:
+        create_parquet_table(
+            df=df,
+            database=database,
+            table=table,
+            s3dir=location,
+            boto_ses=boto_ses,
+            partition_cols=partition_cols,
+            compression=compression,
+            results=results,
+        )
+    else:
+        old_keys = [key["Name"] for key in table_input.get("PartitionKeys", [])]
+        if old_keys != list(partition_cols):
+            raise ValueError(
+                f"the partition keys of {database}.{table} are {old_keys}, "
+                f"can't swap to {list(partition_cols)}"
+            )
+        parameters = table_input.get("Parameters", {})
+        is_projection = parameters.get("projection.enabled") == "true"
+        schema = get_schema(df)
+        columns_types, _ = polars_schema_to_glue(schema, partition_cols=partition_cols)
+        projection_settings = None
+        if is_projection and results:
+            # the projection of the new copy, not widened by the old one
+            projection_settings = infer_partition_projection(
+                results=results,
+                partition_cols=partition_cols,
+                schema=schema,
+                s3dir=location,
+                date_range_to_now=any(
+                    key.startswith("projection.") and value.endswith(",NOW")
+                    for key, value in parameters.items()
+                ),
+            )
+        swap_table_location(
+            glue_client=glue_client,
+            database=database,
+            table=table,
+            location=location,
+            columns_types=columns_types,
+            partitions_values=(
+                None
+                if (is_projection or not partition_cols)
+                else get_partitions_values(results)
+            ),
+            projection_settings=projection_settings,
+        )
+
+    cleanup = None
+    if keep_versions is not None:
+        executor = ThreadPoolExecutor(max_workers=1)
+        cleanup = executor.submit(
+            delete_old_versions,
+            s3dir=s3dir,
+            s3_client=s3_client,
+            current_run_id=run_id,
+            keep_versions=keep_versions,
+        )
+        # the thread keeps running, and the interpreter waits for it at exit
+        executor.shutdown(wait=False)
+    return VersionedWriteResult(
+        run_id=run_id,
+        location=location,
+        partitions=results,
+        cleanup=cleanup,
+    )
@@ -0,0 +1,854 @@
+# -*- coding: utf-8 -*-
+
+"""
+Write a Polars DataFrame to S3 as a Hive partitioned dataset.
+"""
+
+import typing as T
+import os
+import uuid
+import shutil
+import tempfile
+import warnings
+import functools
+import dataclasses
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+import polars as pl
+from botocore.config import Config
+
+from .s3_utils import DEFAULT_MAX_WORKERS, split_s3_uri, to_s3_dir_uri, delete_keys
+from .s3_multipart import DEFAULT_PART_SIZE, MultipartUploadWriter
+from .partition import hive_path_expr, iter_partitions
+from .compression import get_extension, open_compressor
+from .tuning import tune_parquet
+from .manifest import MANIFEST_NAME, Manifest, fingerprint
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    import boto3
+    from mypy_boto3_s3 import S3Client
+
+
+class ExecutorEnum:
+    """
+    Where the partitions are serialized.
+
+    - ``thread``: in the upload threads, serialization runs on the calling
+      interpreter and is streamed straight into the multipart upload.
+    - ``process``: in a process pool, for CPU bound codecs like zstd / gzip.
+      Partitions are handed to the worker processes as Arrow IPC files in a
+      shared memory backed spill folder and memory mapped on the other side,
+      no DataFrame is pickled. The serialized files come back the same way
+      and are streamed to S3 by the upload threads.
+    """
+
+    thread = "thread"
+    process = "process"
+
+
+@dataclasses.dataclass
+class WrittenFile:
+    """
+    One data file written to S3.
+
+    :param uri: S3 URI of the file.
+    :param n_rows: number of rows in the file.
+    :param n_bytes: size of the file in bytes.
+    :param n_parts: number of multipart upload parts, 0 if the file was
+        small enough to be written with a single ``put_object``.
+    """
+
+    uri: str
+    n_rows: int
+    n_bytes: int
+    n_parts: int
+
+
+@dataclasses.dataclass
+class PartitionWriteResult:
+    """
+    Summary of one partition written to S3.
+
+    :param values: the partition values, in the order of ``partition_cols``.
+    :param location: the S3 URI of the partition directory, ends with ``/``.
+    :param files: the data files written into this partition.
+    :param skipped: True if the partition was unchanged in incremental
+        mode and not written again, ``files`` are the ones already on S3.
+    """
+
+    values: T.Tuple[T.Any, ...]
+    location: str
+    files: T.List[WrittenFile] = dataclasses.field(default_factory=list)
+    skipped: bool = False
+
+    @property
+    def n_rows(self) -> int:
+        return sum(file.n_rows for file in self.files)
+
+    @property
+    def n_bytes(self) -> int:
+        return sum(file.n_bytes for file in self.files)
+
+
+def new_s3_client(
+    boto_ses: "boto3.session.Session",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> "S3Client":
+    """
+    Create an S3 client whose connection pool is large enough to be shared
+    by ``max_workers`` threads. The botocore default is 10 connections, any
+    worker beyond that would open and discard a new connection per request.
+    For ``executor="process"`` writes, pass
+    ``max(max_workers, max_processes)``, the number of upload threads.
+    """
+    return boto_ses.client(
+        "s3",
+        config=Config(max_pool_connections=max(10, max_workers)),
+    )
+
+
+def _check_pool_size(s3_client: "S3Client", max_workers: int):
+    """
+    :param max_workers: the number of threads that upload at the same time.
+    """
+    max_pool_connections = s3_client.meta.config.max_pool_connections
+    if max_pool_connections < max_workers:
+        warnings.warn(
+            f"the s3_client connection pool size ({max_pool_connections}) "
+            f"is smaller than the number of concurrent uploads ({max_workers}), "
+            f"use new_s3_client() to create a properly sized client",
+            stacklevel=4,
+        )
+
+
+def _default_spill_dir() -> str:
+    # /dev/shm is a tmpfs on Linux, files there never touch the disk and
+    # can be memory mapped by other processes
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _serialize_ipc_file(
+    path_ipc: str,
+    path_out: str,
+    serialize: T.Callable[[pl.DataFrame, T.BinaryIO], T.Any],
+):
+    """
+    Process pool task: memory map an Arrow IPC file and serialize it into
+    ``path_out`` with ``serialize(df, file)``.
+    """
+    df = pl.read_ipc(path_ipc, memory_map=True)
+    with open(path_out, "wb") as f:
+        serialize(df, f)
+
+
+def _get_ext(filename: str) -> str:
+    """
+    Get the full extension of a file name, e.g. ``.json.gz`` for
+    ``data.json.gz``.
+    """
+    if "." in filename:
+        return filename[filename.index(".") :]
+    return ""
+
+
+def split_rows(
+    df: pl.DataFrame,
+    target_file_bytes: T.Optional[int] = None,
+    max_rows_per_file: T.Optional[int] = None,
+) -> T.List[pl.DataFrame]:
+    """
+    Split a partition into evenly sized ``df.slice()`` views, one per file.
+
+    The number of rows per file is derived from the bytes per row reported
+    by ``df.estimated_size()``, which is the in-memory size, so with
+    compression the files come out smaller than ``target_file_bytes``. The
+    rows are then spread evenly over the files, so there is no tiny last
+    file.
+
+    :param target_file_bytes: the desired (uncompressed) size of each file.
+    :param max_rows_per_file: the upper limit of rows per file.
+    """
+    n_rows = df.height
+    rows_per_file = max(n_rows, 1)
+    if target_file_bytes is not None and n_rows:
+        bytes_per_row = max(df.estimated_size() / n_rows, 1)
+        rows_per_file = min(
+            rows_per_file,
+            max(int(target_file_bytes // bytes_per_row), 1),
+        )
+    if max_rows_per_file is not None:
+        rows_per_file = min(rows_per_file, max_rows_per_file)
+    n_files = max(-(-n_rows // rows_per_file), 1)
+    rows_per_file = -(-n_rows // n_files)
+    return [df.slice(i * rows_per_file, rows_per_file) for i in range(n_files)]
+
+
+#: rows collected at a time from a LazyFrame when there is no row budget
+DEFAULT_LAZY_BATCH_ROWS = 100_000
+
+
+def iter_lazy_batches(
+    lf: pl.LazyFrame,
+    batch_rows: int,
+) -> T.Iterable[pl.DataFrame]:
+    """
+    Collect a LazyFrame ``batch_rows`` rows at a time, with the streaming
+    ``collect_batches()`` on recent Polars, ``slice()`` queries otherwise.
+    """
+    if hasattr(lf, "collect_batches"):
+        yield from lf.collect_batches(chunk_size=batch_rows, maintain_order=True)
+        return
+    offset = 0
+    while True:  # pragma: no cover
+        df = lf.slice(offset, batch_rows).collect()
+        if df.height == 0:
+            return
+        yield df
+        offset += df.height
+
+
+def _write_partitions_eager(
+    df: pl.DataFrame,
+    s3dir: str,
+    partition_cols: T.Sequence[str],
+    s3_client: "S3Client",
+    serialize: T.Callable[[pl.DataFrame, T.BinaryIO], T.Any],
+    filename: str,
+    drop_partition_cols: bool,
+    target_file_bytes: T.Optional[int],
+    max_rows_per_file: T.Optional[int],
+    part_size: int,
+    max_workers: int,
+    executor: str,
+    max_processes: T.Optional[int],
+    spill_dir: T.Optional[str],
+    incremental: bool = False,
+    fingerprint_salt: str = "",
+) -> T.List[PartitionWriteResult]:
+    """
+    Serialize and upload every partition with ``serialize(sub_df, file)``,
+    ``max_workers`` files at a time. All workers share ``s3_client``,
+    boto3 clients are thread safe.
+
+    If ``target_file_bytes`` or ``max_rows_per_file`` is set, each partition
+    is split by :func:`split_rows` and the files are named
+    ``part-00000${ext}``, ``part-00001${ext}``, ..., where ``${ext}`` is the
+    extension of ``filename``. The files of one big partition are written
+    concurrently as well.
+
+    ``serialize`` has to be picklable when ``executor`` is ``process``. In
+    that mode the thread pool has ``max(max_workers, max_processes)``
+    threads, each file is staged in full as uncompressed Arrow IPC, plus its
+    serialized output, in ``spill_dir``, so up to that many files sit in
+    ``/dev/shm`` (memory) at a time.
+
+    If ``incremental`` is True, every partition is fingerprinted by
+    :func:`~learn_awswrangler.manifest.fingerprint` (salted with
+    ``fingerprint_salt``) and compared with the
+    :class:`~learn_awswrangler.manifest.Manifest` stored under ``s3dir``.
+    Unchanged partitions are neither serialized nor uploaded. Files of the
+    previous version of a changed partition that are not overwritten, e.g.
+    after it was split into a different number of files, are deleted. The
+    manifest is updated last, so an interrupted run is redone next time.
+    """
+    if executor not in (ExecutorEnum.thread, ExecutorEnum.process):
+        raise ValueError(f"invalid executor {executor!r}")
+    n_threads = max_workers
+    if executor == ExecutorEnum.process:
+        n_processes = max_processes or os.cpu_count() or 1
+        # a thread waits for its file to be serialized, one thread per
+        # process keeps every process busy
+        n_threads = max(max_workers, n_processes)
+    _check_pool_size(s3_client, n_threads)
+    s3dir = to_s3_dir_uri(s3dir)
+    bucket, prefix = split_s3_uri(s3dir)
+    split = (target_file_bytes is not None) or (max_rows_per_file is not None)
+    ext = _get_ext(filename)
+
+    process_pool: T.Optional[Executor] = None
+    tmp_dir: T.Optional[str] = None
+
+    manifest_key = f"{prefix}{MANIFEST_NAME}"
+    manifest: T.Optional[Manifest] = None
+    if incremental:
+        manifest = Manifest.read(s3_client, bucket, manifest_key)
+    # hive path -> fingerprint of the partitions to write
+    fingerprints: T.Dict[str, str] = dict()
+
+    results: T.List[PartitionWriteResult] = list()
+    # (partition result, key, data)
+    tasks: T.List[T.Tuple[PartitionWriteResult, str, pl.DataFrame]] = list()
+    for values, hive_path, sub_df in iter_partitions(df, partition_cols):
+        if drop_partition_cols:
+            sub_df = sub_df.drop(partition_cols)
+        result = PartitionWriteResult(
+            values=values,
+            location=f"{s3dir}{hive_path}",
+        )
+        results.append(result)
+        if manifest is not None:
+            fp = fingerprint(sub_df, salt=fingerprint_salt)
+            if fp == manifest.get_fingerprint(hive_path):
+                result.skipped = True
+                result.files = [
+                    WrittenFile(**file) for file in manifest.get_files(hive_path)
+                ]
+                continue
+            fingerprints[hive_path] = fp
+        if split:
+            for ith, file_df in enumerate(
+                split_rows(sub_df, target_file_bytes, max_rows_per_file)
+            ):
+                key = f"{prefix}{hive_path}part-{ith:05d}{ext}"
+                tasks.append((result, key, file_df))
+        else:
+            tasks.append((result, f"{prefix}{hive_path}{filename}", sub_df))
+
+    def write_one(
+        task: T.Tuple[PartitionWriteResult, str, pl.DataFrame],
+    ) -> WrittenFile:
+        _, key, file_df = task
+        with MultipartUploadWriter(
+            s3_client=s3_client,
+            bucket=bucket,
+            key=key,
+            part_size=part_size,
+        ) as f:
+            if process_pool is None:
+                serialize(file_df, f)
+            else:
+                name = uuid.uuid4().hex
+                path_ipc = os.path.join(tmp_dir, f"{name}.arrow")
+                path_out = os.path.join(tmp_dir, f"{name}.out")
+                try:
+                    file_df.write_ipc(path_ipc, compression="uncompressed")
+                    process_pool.submit(
+                        _serialize_ipc_file, path_ipc, path_out, serialize
+                    ).result()
+                    os.remove(path_ipc)
+                    with open(path_out, "rb") as f_out:
+                        f.write_from(f_out)
+                finally:
+                    for path in (path_ipc, path_out):
+                        if os.path.exists(path):
+                            os.remove(path)
+        return WrittenFile(
+            uri=f.uri,
+            n_rows=file_df.height,
+            n_bytes=f.size,
+            n_parts=f.n_parts,
+        )
+
+    try:
+        if executor == ExecutorEnum.process:
+            tmp_dir = tempfile.mkdtemp(dir=spill_dir or _default_spill_dir())
+            # polars is multi-threaded, forking it may deadlock
+            process_pool = ProcessPoolExecutor(
+                max_workers=n_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        if n_threads <= 1:
+            files = [write_one(task) for task in tasks]
+        else:
+            with ThreadPoolExecutor(max_workers=n_threads) as thread_pool:
+                files = list(thread_pool.map(write_one, tasks))
+    finally:
+        if process_pool is not None:
+            process_pool.shutdown()
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    for (result, _, _), file in zip(tasks, files):
+        result.files.append(file)
+
+    if manifest is not None and fingerprints:
+        stale_keys = list()
+        for result in results:
+            if result.skipped:
+                continue
+            hive_path = result.location[len(s3dir) :]
+            new_uris = {file.uri for file in result.files}
+            stale_keys.extend(
+                split_s3_uri(file["uri"])[1]
+                for file in manifest.get_files(hive_path)
+                if file["uri"] not in new_uris
+            )
+            manifest.partitions[hive_path] = {
+                "fingerprint": fingerprints[hive_path],
+                "files": [dataclasses.asdict(file) for file in result.files],
+            }
+        delete_keys(s3_client, bucket, stale_keys)
+        manifest.write(s3_client, bucket, manifest_key)
+    return results
+
+
+def _write_partitions_lazy(
+    lf: pl.LazyFrame,
+    s3dir: str,
+    partition_cols: T.Sequence[str],
+    s3_client: "S3Client",
+    sink: T.Callable[[pl.LazyFrame, T.BinaryIO], T.Any],
+    filename: str,
+    drop_partition_cols: bool,
+    max_rows_per_file: T.Optional[int],
+    part_size: int,
+    max_workers: int,
+) -> T.List[PartitionWriteResult]:
+    """
+    The :class:`polars.LazyFrame` version of :func:`_write_partitions_eager`.
+
+    Nothing is collected except one row per partition: the partition values
+    and row counts are found by a streaming aggregation over
+    ``partition_cols`` only. Then every partition is written by a streaming
+    ``lf.filter(...).sink_xxx(...)`` straight into a multipart upload, so
+    memory stays constant no matter how big the source is.
+
+    Each partition scans the source again, which is cheap for sources with
+    predicate pushdown (Parquet, IPC) and costs one pass per partition for
+    NDJSON / CSV.
+    """
+    _check_pool_size(s3_client, max_workers)
+    s3dir = to_s3_dir_uri(s3dir)
+    bucket, prefix = split_s3_uri(s3dir)
+    partition_cols = list(partition_cols)
+    ext = _get_ext(filename)
+    col_len = "__len__"
+
+    if partition_cols:
+        groups = (
+            lf.group_by(partition_cols)
+            .agg(pl.len().alias(col_len))
+            .sort(partition_cols, nulls_last=True)
+            .with_columns(hive_path_expr(partition_cols).alias("__hive_path__"))
+            .collect(engine="streaming")
+        )
+    else:
+        groups = lf.select(
+            pl.len().alias(col_len),
+            pl.lit("").alias("__hive_path__"),
+        ).collect(engine="streaming")
+
+    results: T.List[PartitionWriteResult] = list()
+    # (partition result, key, data, n_rows)
+    tasks: T.List[T.Tuple[PartitionWriteResult, str, pl.LazyFrame, int]] = list()
+    for row in groups.iter_rows():
+        values = row[: len(partition_cols)]
+        n_rows, hive_path = row[len(partition_cols) :]
+        predicate = pl.all_horizontal(
+            [pl.lit(True)]
+            + [
+                pl.col(col).is_null() if value is None else pl.col(col) == value
+                for col, value in zip(partition_cols, values)
+            ]
+        )
+        sub_lf = lf.filter(predicate)
+        if drop_partition_cols:
+            sub_lf = sub_lf.drop(partition_cols)
+        result = PartitionWriteResult(
+            values=values,
+            location=f"{s3dir}{hive_path}",
+        )
+        results.append(result)
+        if max_rows_per_file is None:
+            key = f"{prefix}{hive_path}{filename}"
+            tasks.append((result, key, sub_lf, n_rows))
+        else:
+            n_files = max(-(-n_rows // max_rows_per_file), 1)
+            rows_per_file = -(-n_rows // n_files)
+            for ith in range(n_files):
+                key = f"{prefix}{hive_path}part-{ith:05d}{ext}"
+                offset = ith * rows_per_file
+                tasks.append(
+                    (
+                        result,
+                        key,
+                        sub_lf.slice(offset, rows_per_file),
+                        min(rows_per_file, n_rows - offset),
+                    )
+                )
+
+    def write_one(
+        task: T.Tuple[PartitionWriteResult, str, pl.LazyFrame, int],
+    ) -> WrittenFile:
+        _, key, file_lf, n_rows = task
+        with MultipartUploadWriter(
+            s3_client=s3_client,
+            bucket=bucket,
+            key=key,
+            part_size=part_size,
+        ) as f:
+            sink(file_lf, f)
+        return WrittenFile(
+            uri=f.uri,
+            n_rows=n_rows,
+            n_bytes=f.size,
+            n_parts=f.n_parts,
+        )
+
+    if max_workers <= 1:
+        files = [write_one(task) for task in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as thread_pool:
+            files = list(thread_pool.map(write_one, tasks))
+    for (result, _, _, _), file in zip(tasks, files):
+        result.files.append(file)
+    return results
+
+
+def write_partitions(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    s3dir: str,
+    partition_cols: T.Sequence[str],
+    s3_client: "S3Client",
+    serialize: T.Callable[[pl.DataFrame, T.BinaryIO], T.Any],
+    sink: T.Callable[[pl.LazyFrame, T.BinaryIO], T.Any],
+    filename: str,
+    drop_partition_cols: bool = True,
+    target_file_bytes: T.Optional[int] = None,
+    max_rows_per_file: T.Optional[int] = None,
+    part_size: int = DEFAULT_PART_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    executor: str = ExecutorEnum.thread,
+    max_processes: T.Optional[int] = None,
+    spill_dir: T.Optional[str] = None,
+    incremental: bool = False,
+    fingerprint_salt: str = "",
+) -> T.List[PartitionWriteResult]:
+    """
+    The partitioned writer behind :func:`write_partitioned_parquet` and
+    :func:`write_partitioned_ndjson`, for other file formats or writers.
+
+    :param serialize: ``serialize(df, f)`` writes a DataFrame file to the
+        binary file object ``f``. It must be picklable when ``executor`` is
+        ``"process"``, e.g. a ``functools.partial`` of a module level
+        function.
+    :param sink: ``sink(lf, f)`` writes a LazyFrame file to ``f``, used
+        when ``df`` is a LazyFrame.
+    :param fingerprint_salt: the write options, a change rewrites every
+        partition of an ``incremental`` write.
+
+    See :func:`write_partitioned_parquet` for the other arguments.
+    """
+    if isinstance(df, pl.LazyFrame):
+        if incremental:
+            raise ValueError(
+                "incremental is not supported for LazyFrame, "
+                "fingerprinting a partition requires its data in memory"
+            )
+        if target_file_bytes is not None:
+            raise ValueError(
+                "target_file_bytes is not supported for LazyFrame, "
+                "the size is unknown before the data is read, "
+                "use max_rows_per_file instead"
+            )
+        if executor != ExecutorEnum.thread:
+            raise ValueError(
+                f"executor {executor!r} is not supported for LazyFrame, "
+                f"the streaming engine already uses all cores"
+            )
+        return _write_partitions_lazy(
+            lf=df,
+            s3dir=s3dir,
+            partition_cols=partition_cols,
+            s3_client=s3_client,
+            sink=sink,
+            filename=filename,
+            drop_partition_cols=drop_partition_cols,
+            max_rows_per_file=max_rows_per_file,
+            part_size=part_size,
+            max_workers=max_workers,
+        )
+    return _write_partitions_eager(
+        df=df,
+        s3dir=s3dir,
+        partition_cols=partition_cols,
+        s3_client=s3_client,
+        serialize=serialize,
+        filename=filename,
+        drop_partition_cols=drop_partition_cols,
+        target_file_bytes=target_file_bytes,
+        max_rows_per_file=max_rows_per_file,
+        part_size=part_size,
+        max_workers=max_workers,
+        executor=executor,
+        max_processes=max_processes,
+        spill_dir=spill_dir,
+        incremental=incremental,
+        fingerprint_salt=fingerprint_salt,
+    )
+
+
+def _write_parquet(
+    df: pl.DataFrame,
+    f: T.BinaryIO,
+    compression: str,
+    compression_level: T.Optional[int],
+    row_group_size: T.Optional[int],
+):
+    df.write_parquet(
+        f,
+        compression=compression,
+        compression_level=compression_level,
+        row_group_size=row_group_size,
+    )
+
+
+def _write_ndjson(
+    df: pl.DataFrame,
+    f: T.BinaryIO,
+    compression: T.Optional[str],
+    compression_level: T.Optional[int],
+    batch_size: int,
+):
+    with open_compressor(f, compression, compression_level) as f_out:
+        for offset in range(0, df.height, batch_size):
+            df.slice(offset, batch_size).write_ndjson(f_out)
+
+
+def _sink_parquet(
+    lf: pl.LazyFrame,
+    f: T.BinaryIO,
+    compression: str,
+    compression_level: T.Optional[int],
+    row_group_size: T.Optional[int],
+):
+    lf.sink_parquet(
+        f,
+        compression=compression,
+        compression_level=compression_level,
+        row_group_size=row_group_size,
+    )
+
+
+def _sink_ndjson(
+    lf: pl.LazyFrame,
+    f: T.BinaryIO,
+    compression: T.Optional[str],
+    compression_level: T.Optional[int],
+):
+    with open_compressor(f, compression, compression_level) as f_out:
+        lf.sink_ndjson(f_out)
+
+
+def write_partitioned_parquet(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    s3dir: str,
+    partition_cols: T.Sequence[str],
+    s3_client: "S3Client",
+    compression: str = "snappy",
+    compression_level: T.Optional[int] = None,
+    row_group_size: T.Optional[int] = None,
+    auto_tune: T.Optional[str] = None,
+    filename: str = "data.parquet",
+    drop_partition_cols: bool = True,
+    target_file_bytes: T.Optional[int] = None,
+    max_rows_per_file: T.Optional[int] = None,
+    part_size: int = DEFAULT_PART_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    executor: str = ExecutorEnum.thread,
+    max_processes: T.Optional[int] = None,
+    spill_dir: T.Optional[str] = None,
+    incremental: bool = False,
+) -> T.List[PartitionWriteResult]:
+    """
+    Write a DataFrame to ``s3dir`` as a Hive partitioned Parquet dataset,
+    ``${s3dir}/${col1}=${value1}/.../${filename}``.
+
+    Each file is serialized straight into a :class:`MultipartUploadWriter`,
+    so it is streamed to S3 in ``part_size`` chunks instead of being
+    materialized in a ``BytesIO`` and copied by ``getvalue()``. Up to
+    ``max_workers`` files are serialized and uploaded at the same time, peak
+    memory is about one part per file being written.
+
+    ``df`` can also be a :class:`polars.LazyFrame`, for example from
+    ``pl.scan_ndjson`` or ``pl.scan_parquet``, then the data is never
+    collected, every file is written by the Polars streaming engine, see
+    :func:`_write_partitions_lazy`. ``target_file_bytes`` and
+    ``executor="process"`` are not supported in that case.
+
+    Existing objects under ``s3dir`` are not deleted.
+
+    :param df: the DataFrame or LazyFrame to write.
+    :param s3dir: S3 URI of the table root folder.
+    :param partition_cols: the Hive partition columns.
+    :param s3_client: boto3 S3 client, shared by all workers. Create it with
+        :func:`new_s3_client` so its connection pool fits ``max_workers``,
+        or ``max(max_workers, max_processes)`` when ``executor`` is
+        ``"process"``.
+    :param compression: Parquet compression codec.
+    :param compression_level: the codec specific compression level, default
+        is the Polars default.
+    :param row_group_size: rows per Parquet row group, default is the
+        Polars default. Tune it independently from the file size.
+    :param auto_tune: an objective of
+        :class:`~learn_awswrangler.tuning.ObjectiveEnum`. If given,
+        ``compression``, ``compression_level`` and ``row_group_size`` are
+        ignored, the best setting is picked by
+        :func:`~learn_awswrangler.tuning.tune_parquet` on a sample of ``df``.
+        With ``incremental``, an unchanged partition is not rewritten when
+        the picked setting changes, only the objective is fingerprinted.
+    :param filename: the file name of the data file in each partition.
+    :param drop_partition_cols: if True, the partition columns are not
+        stored in the data file, their values only live in the path, which
+        is what Athena and ``wr.s3.to_parquet(dataset=True)`` expect.
+    :param target_file_bytes: split big partitions into files of about this
+        many bytes (estimated from the in-memory size), named
+        ``part-00000.parquet``, ``part-00001.parquet``, ...
+    :param max_rows_per_file: split big partitions into files of at most
+        this many rows, can be combined with ``target_file_bytes``.
+    :param part_size: multipart upload part size in bytes.
+    :param max_workers: number of files written concurrently.
+    :param executor: ``"thread"`` or ``"process"``, see :class:`ExecutorEnum`.
+        Use ``"process"`` when serialization is CPU bound, for example with
+        ``zstd`` or ``gzip`` compression.
+    :param max_processes: size of the process pool, default is the number
+        of CPUs. Only used when ``executor`` is ``"process"``, then
+        ``max(max_workers, max_processes)`` files are written concurrently.
+    :param spill_dir: where the Arrow IPC and serialized files are staged
+        when ``executor`` is ``"process"``, default is ``/dev/shm`` if it
+        exists, otherwise the system temp folder. Every file in flight is
+        staged in full, uncompressed, so ``/dev/shm`` must hold about
+        ``max(max_workers, max_processes)`` times the in-memory size of a
+        file, use ``target_file_bytes`` to bound it.
+    :param incremental: only write the partitions whose content changed
+        since the last incremental write to ``s3dir``, tracked by a
+        ``_manifest.json`` object under ``s3dir``. Unchanged partitions come
+        back with ``skipped=True``. A change of the write options rewrites
+        every partition. Use it when a job rewrites the whole table but only
+        a few partitions actually change, instead of deleting ``s3dir`` first.
+        Only one incremental writer may target ``s3dir`` at a time, and
+        files written to ``s3dir`` by other means are not tracked.
+
+    :return: one :class:`PartitionWriteResult` per partition, sorted by the
+        partition values.
+    """
+    settings = (compression, compression_level, row_group_size)
+    if auto_tune is not None:
+        sample_df = df.drop(partition_cols) if drop_partition_cols else df
+        setting = tune_parquet(sample_df, objective=auto_tune).best
+        compression = setting.compression
+        compression_level = setting.compression_level
+        row_group_size = setting.row_group_size
+        # the winner depends on timings and may change from run to run,
+        # that alone must not rewrite every partition of an incremental write
+        settings = ("auto_tune", auto_tune)
+    return write_partitions(
+        df=df,
+        s3dir=s3dir,
+        partition_cols=partition_cols,
+        s3_client=s3_client,
+        serialize=functools.partial(
+            _write_parquet,
+            compression=compression,
+            compression_level=compression_level,
+            row_group_size=row_group_size,
+        ),
+        sink=functools.partial(
+            _sink_parquet,
+            compression=compression,
+            compression_level=compression_level,
+            row_group_size=row_group_size,
+        ),
+        filename=filename,
+        drop_partition_cols=drop_partition_cols,
+        target_file_bytes=target_file_bytes,
+        max_rows_per_file=max_rows_per_file,
+        part_size=part_size,
+        max_workers=max_workers,
+        executor=executor,
+        max_processes=max_processes,
+        spill_dir=spill_dir,
+        incremental=incremental,
+        fingerprint_salt=repr(
+            (
+                "parquet",
+                filename,
+                drop_partition_cols,
+                target_file_bytes,
+                max_rows_per_file,
+            )
+            + settings
+        ),
+    )
+
+
+def write_partitioned_ndjson(
+    df: T.Union[pl.DataFrame, pl.LazyFrame],
+    s3dir: str,
+    partition_cols: T.Sequence[str],
+    s3_client: "S3Client",
+    compression: T.Optional[str] = None,
+    compression_level: T.Optional[int] = None,
+    batch_size: int = 100_000,
+    filename: T.Optional[str] = None,
+    drop_partition_cols: bool = True,
+    target_file_bytes: T.Optional[int] = None,
+    max_rows_per_file: T.Optional[int] = None,
+    part_size: int = DEFAULT_PART_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    executor: str = ExecutorEnum.thread,
+    max_processes: T.Optional[int] = None,
+    spill_dir: T.Optional[str] = None,
+    incremental: bool = False,
+) -> T.List[PartitionWriteResult]:
+    """
+    The NDJSON version of :func:`write_partitioned_parquet`.
+
+    With ``compression``, the output is compressed chunk by chunk while it
+    is serialized, ``batch_size`` rows at a time, straight into the
+    multipart upload, so neither the uncompressed nor the compressed
+    partition is ever held in memory. Create the Glue table with
+    :func:`~learn_awswrangler.catalog.create_json_table` and the same
+    ``compression``, so the SerDe and compression properties match.
+
+    :param compression: None, ``"gzip"`` or ``"zstd"``, see
+        :class:`~learn_awswrangler.compression.CompressionEnum`.
+    :param compression_level: the codec specific compression level.
+    :param batch_size: number of rows serialized at a time.
+    :param filename: the file name of the data file in each partition,
+        default is ``data.json`` plus the extension of ``compression``,
+        e.g. ``data.json.gz``. Athena detects the codec by extension.
+    """
+    if filename is None:
+        filename = f"data.json{get_extension(compression)}"
+    return write_partitions(
+        df=df,
+        s3dir=s3dir,
+        partition_cols=partition_cols,
+        s3_client=s3_client,
+        serialize=functools.partial(
+            _write_ndjson,
+            compression=compression,
+            compression_level=compression_level,
+            batch_size=batch_size,
+        ),
+        sink=functools.partial(
+            _sink_ndjson,
+            compression=compression,
+            compression_level=compression_level,
+        ),
+        filename=filename,
+        drop_partition_cols=drop_partition_cols,
+        target_file_bytes=target_file_bytes,
+        max_rows_per_file=max_rows_per_file,
+        part_size=part_size,
+        max_workers=max_workers,
+        executor=executor,
+        max_processes=max_processes,
+        spill_dir=spill_dir,
+        incremental=incremental,
+        fingerprint_salt=repr(
+            (
+                "ndjson",
+                filename,
+                drop_partition_cols,
+                target_file_bytes,
+                max_rows_per_file,
+                compression,
+                compression_level,
+            )
+        ),
+    )
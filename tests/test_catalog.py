@@ -0,0 +1,488 @@
+# -*- coding: utf-8 -*-
+
+from unittest import mock
+
+import polars as pl
+import pytest
+import awswrangler as wr
+
+from learn_awswrangler.writer import PartitionWriteResult, write_partitioned_ndjson
+from learn_awswrangler.catalog import (
+    JSON_SERDE,
+    EnsureActionEnum,
+    create_json_table,
+    ensure_table,
+    get_table_input,
+    register_partitions,
+    swap_table_location,
+)
+from learn_awswrangler.projection import infer_partition_projection
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+class Test(BaseMockTest):
+    database = "learn_awswrangler"
+
+    @classmethod
+    def setup_class_post_hook(cls):
+        cls.bsm.glue_client.create_database(DatabaseInput={"Name": cls.database})
+
+    def test_create_json_table(self):
+        df = pl.DataFrame(
+            {
+                "id": [1, 2, 3],
+                "name": ["a", "b", "c"],
+                "year": ["2001", "2002", "2001"],
+            }
+        )
+        s3dir = f"s3://{self.bucket}/events/"
+        results = write_partitioned_ndjson(
+            df=df,
+            s3dir=s3dir,
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+            compression="gzip",
+        )
+        columns_types, partitions_types = create_json_table(
+            df=df,
+            database=self.database,
+            table="events",
+            s3dir=s3dir,
+            boto_ses=self.bsm.boto_ses,
+            partition_cols=["year"],
+            compression="gzip",
+            results=results,
+        )
+        assert columns_types == {"id": "bigint", "name": "string"}
+        assert partitions_types == {"year": "string"}
+
+        glue_client = self.bsm.glue_client
+        table = glue_client.get_table(DatabaseName=self.database, Name="events")
+        table = table["Table"]
+        assert table["Parameters"]["compressionType"] == "gzip"
+        sd = table["StorageDescriptor"]
+        assert sd["Compressed"] is True
+        assert sd["Location"] == s3dir
+        assert sd["SerdeInfo"]["SerializationLibrary"] == JSON_SERDE
+
+        partitions = glue_client.get_partitions(
+            DatabaseName=self.database, TableName="events"
+        )["Partitions"]
+        assert sorted(
+            (p["Values"], p["StorageDescriptor"]["Location"]) for p in partitions
+        ) == [
+            (["2001"], f"{s3dir}year=2001/"),
+            (["2002"], f"{s3dir}year=2002/"),
+        ]
+        assert all(p["StorageDescriptor"]["Compressed"] for p in partitions)
+
+    def test_swap_projection_table(self):
+        wr.catalog.create_parquet_table(
+            database=self.database,
+            table="projected",
+            path=f"s3://{self.bucket}/projected/v=1/",
+            columns_types={"id": "bigint"},
+            partitions_types={"year": "string"},
+            athena_partition_projection_settings={
+                "projection_types": {"year": "integer"},
+                "projection_ranges": {"year": "2000,2030"},
+                "projection_storage_location_template": (
+                    f"s3://{self.bucket}/projected/v=1/year=${{year}}/"
+                ),
+            },
+            boto3_session=self.bsm.boto_ses,
+        )
+        glue_client = self.bsm.glue_client
+        swap_table_location(
+            glue_client,
+            self.database,
+            "projected",
+            location=f"s3://{self.bucket}/projected/v=2/",
+            columns_types={"id": "bigint", "name": "string"},
+        )
+        table_input = get_table_input(glue_client, self.database, "projected")
+        assert table_input["StorageDescriptor"]["Location"] == (
+            f"s3://{self.bucket}/projected/v=2/"
+        )
+        assert table_input["Parameters"]["storage.location.template"] == (
+            f"s3://{self.bucket}/projected/v=2/year=${{year}}/"
+        )
+        assert len(table_input["StorageDescriptor"]["Columns"]) == 2
+        assert get_table_input(glue_client, self.database, "not_exists") is None
+
+        # the projection of the new copy replaces the old one, in one call
+        location = f"s3://{self.bucket}/projected/v=3/"
+        settings = infer_partition_projection(
+            results=[
+                PartitionWriteResult(values=(2010,), location=f"{location}year=2010/"),
+                PartitionWriteResult(values=(2012,), location=f"{location}year=2012/"),
+            ],
+            partition_cols=["year"],
+            schema={"year": pl.Int64},
+            s3dir=location,
+        )
+        with mock.patch.object(
+            glue_client, "update_table", wraps=glue_client.update_table
+        ) as update_table:
+            swap_table_location(
+                glue_client,
+                self.database,
+                "projected",
+                location=location,
+                projection_settings=settings,
+            )
+        assert update_table.call_count == 1
+        parameters = get_table_input(glue_client, self.database, "projected")[
+            "Parameters"
+        ]
+        assert parameters["projection.enabled"] == "true"
+        assert parameters["projection.year.type"] == "integer"
+        assert parameters["projection.year.range"] == "2010,2012"
+        assert parameters["storage.location.template"] == (f"{location}year=${{year}}/")
+
+    def test_swap_partitioned_table(self):
+        glue_client = self.bsm.glue_client
+        wr.catalog.create_parquet_table(
+            database=self.database,
+            table="swapped",
+            path=f"s3://{self.bucket}/swapped/v=1/",
+            columns_types={"id": "bigint"},
+            partitions_types={"year": "string"},
+            boto3_session=self.bsm.boto_ses,
+        )
+        register_partitions(
+            glue_client,
+            self.database,
+            "swapped",
+            {
+                f"s3://{self.bucket}/swapped/v=1/year={year}/": [year]
+                for year in ["2001", "2002"]
+            },
+        )
+
+        def get_locations():
+            partitions = glue_client.get_partitions(
+                DatabaseName=self.database, TableName="swapped"
+            )["Partitions"]
+            return {
+                p["Values"][0]: p["StorageDescriptor"]["Location"] for p in partitions
+            }
+
+        # the partitions are flipped before the table, and the partitions
+        # that are gone are only deleted after it
+        location = f"s3://{self.bucket}/swapped/v=2/"
+        seen = list()
+
+        def update_table(**kwargs):
+            seen.append(get_locations())
+            return glue_client_update_table(**kwargs)
+
+        glue_client_update_table = glue_client.update_table
+        with mock.patch.object(glue_client, "update_table", update_table):
+            swap_table_location(
+                glue_client,
+                self.database,
+                "swapped",
+                location=location,
+                partitions_values={
+                    f"{location}year={year}/": [year] for year in ["2002", "2003"]
+                },
+            )
+        assert seen == [
+            {
+                "2001": f"s3://{self.bucket}/swapped/v=1/year=2001/",
+                "2002": f"{location}year=2002/",
+                "2003": f"{location}year=2003/",
+            }
+        ]
+        assert get_locations() == {
+            "2002": f"{location}year=2002/",
+            "2003": f"{location}year=2003/",
+        }
+        table_input = get_table_input(glue_client, self.database, "swapped")
+        assert table_input["StorageDescriptor"]["Location"] == location
+
+    def test_register_partitions(self):
+        s3dir = f"s3://{self.bucket}/register/"
+        wr.catalog.create_parquet_table(
+            database=self.database,
+            table="register",
+            path=s3dir,
+            columns_types={"id": "bigint"},
+            partitions_types={"day": "int"},
+            boto3_session=self.bsm.boto_ses,
+        )
+        glue_client = self.bsm.glue_client
+
+        def get_locations():
+            paginator = glue_client.get_paginator("get_partitions")
+            return {
+                p["Values"][0]: p["StorageDescriptor"]["Location"]
+                for page in paginator.paginate(
+                    DatabaseName=self.database, TableName="register"
+                )
+                for p in page["Partitions"]
+            }
+
+        partitions_values = {f"{s3dir}day={i}/": [str(i)] for i in range(250)}
+        result = register_partitions(
+            glue_client, self.database, "register", partitions_values, max_workers=3
+        )
+        assert (result.n_created, result.n_updated) == (250, 0)
+        locations = get_locations()
+        assert len(locations) == 250
+        assert locations["7"] == f"{s3dir}day=7/"
+
+        # existing partitions are updated, new ones created
+        partitions_values = {f"{s3dir}v=2/day={i}/": [str(i)] for i in range(200, 300)}
+        result = register_partitions(
+            glue_client, self.database, "register", partitions_values
+        )
+        assert (result.n_created, result.n_updated) == (50, 50)
+        locations = get_locations()
+        assert len(locations) == 300
+        assert locations["7"] == f"{s3dir}day=7/"
+        assert locations["207"] == f"{s3dir}v=2/day=207/"
+        assert locations["299"] == f"{s3dir}v=2/day=299/"
+
+        with pytest.raises(ValueError):
+            register_partitions(glue_client, self.database, "not_exists", {})
+
+    def test_create_projection_table(self):
+        df = pl.DataFrame({"id": [1, 2, 3], "year": ["2001", "2002", "2001"]})
+        s3dir = f"s3://{self.bucket}/projection/"
+        results = write_partitioned_ndjson(
+            df=df,
+            s3dir=s3dir,
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+        )
+        kwargs = dict(
+            database=self.database,
+            table="projection",
+            s3dir=s3dir,
+            boto_ses=self.bsm.boto_ses,
+            partition_cols=["year"],
+            projection=True,
+        )
+        create_json_table(df=df, results=results, **kwargs)
+        glue_client = self.bsm.glue_client
+        parameters = get_table_input(glue_client, self.database, "projection")[
+            "Parameters"
+        ]
+        assert parameters["projection.enabled"] == "true"
+        assert parameters["projection.year.type"] == "integer"
+        assert parameters["projection.year.range"] == "2001,2002"
+        assert parameters["storage.location.template"] == f"{s3dir}year=${{year}}/"
+        partitions = glue_client.get_partitions(
+            DatabaseName=self.database, TableName="projection"
+        )["Partitions"]
+        assert partitions == []
+
+        # append widens the range
+        df = pl.DataFrame({"id": [4], "year": ["2005"]})
+        results = write_partitioned_ndjson(
+            df=df,
+            s3dir=s3dir,
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+        )
+        create_json_table(df=df, results=results, mode="append", **kwargs)
+        parameters = get_table_input(glue_client, self.database, "projection")[
+            "Parameters"
+        ]
+        assert parameters["projection.year.range"] == "2001,2005"
+
+        with pytest.raises(ValueError):
+            create_json_table(df=df, **kwargs)
+
+    def test_ensure_table(self):
+        glue_client = self.bsm.glue_client
+        s3dir = f"s3://{self.bucket}/ensure/"
+        kwargs = dict(
+            database=self.database,
+            table="ensure",
+            s3dir=s3dir,
+            boto_ses=self.bsm.boto_ses,
+            partition_cols=["year"],
+            compression="snappy",
+        )
+
+        def make_results(years):
+            return [
+                PartitionWriteResult(values=(year,), location=f"{s3dir}year={year}/")
+                for year in years
+            ]
+
+        def get_partition_values():
+            partitions = glue_client.get_partitions(
+                DatabaseName=self.database, TableName="ensure"
+            )["Partitions"]
+            return sorted(partition["Values"][0] for partition in partitions)
+
+        def get_columns():
+            table_input = get_table_input(glue_client, self.database, "ensure")
+            return [
+                (col["Name"], col["Type"])
+                for col in table_input["StorageDescriptor"]["Columns"]
+            ]
+
+        def get_version():
+            return glue_client.get_table(DatabaseName=self.database, Name="ensure")[
+                "Table"
+            ]["VersionId"]
+
+        df = pl.DataFrame(
+            {"id": [1], "score": [1.5], "year": ["2001"]},
+            schema={"id": pl.Int32, "score": pl.Float64, "year": pl.String},
+        )
+        res = ensure_table(df, results=make_results(["2001"]), **kwargs)
+        assert res.action == EnsureActionEnum.created
+        assert get_partition_values() == ["2001"]
+
+        # equal, the table is not touched, new partitions are registered
+        version = get_version()
+        res = ensure_table(df, results=make_results(["2002"]), **kwargs)
+        assert res.action == EnsureActionEnum.unchanged
+        assert res.diff.is_equal
+        assert get_version() == version
+        assert get_partition_values() == ["2001", "2002"]
+
+        # additive: a new column and a widened type, one update_table
+        df = df.with_columns(
+            pl.col("id").cast(pl.Int64), pl.lit("a").alias("name")
+        ).select("id", "name", "score", "year")
+        res = ensure_table(df, **kwargs)
+        assert res.action == EnsureActionEnum.updated
+        assert res.diff.added == {"name": "string"}
+        assert res.diff.changed == {"id": ("int", "bigint")}
+        assert get_columns() == [
+            ("id", "bigint"),
+            ("score", "double"),
+            ("name", "string"),
+        ]
+        assert get_partition_values() == ["2001", "2002"]
+
+        # incompatible: the table is recreated, the partitions are kept
+        df = df.drop("score")
+        res = ensure_table(df, results=make_results(["2003"]), **kwargs)
+        assert res.action == EnsureActionEnum.recreated
+        assert res.diff.removed == {"score": "double"}
+        assert res.n_partitions_kept == 2
+        assert get_columns() == [("id", "bigint"), ("name", "string")]
+        assert get_partition_values() == ["2001", "2002", "2003"]
+
+        # new partition keys, the old partitions are invalid
+        df = df.with_columns(pl.lit(1).alias("month"))
+        res = ensure_table(df, **dict(kwargs, partition_cols=["year", "month"]))
+        assert res.action == EnsureActionEnum.recreated
+        assert res.diff.partition_keys_changed
+        assert get_partition_values() == []
+
+        with pytest.raises(ValueError):
+            ensure_table(df, file_format="csv", **kwargs)
+
+    def test_ensure_table_projection(self):
+        glue_client = self.bsm.glue_client
+        s3dir = f"s3://{self.bucket}/ensure_projection/"
+        kwargs = dict(
+            database=self.database,
+            table="ensure_projection",
+            s3dir=s3dir,
+            boto_ses=self.bsm.boto_ses,
+            partition_cols=["year"],
+            compression="snappy",
+        )
+
+        def make_results(years):
+            return [
+                PartitionWriteResult(values=(year,), location=f"{s3dir}year={year}/")
+                for year in years
+            ]
+
+        def get_version():
+            return int(
+                glue_client.get_table(
+                    DatabaseName=self.database, Name="ensure_projection"
+                )["Table"]["VersionId"]
+            )
+
+        def get_parameters():
+            return get_table_input(glue_client, self.database, "ensure_projection")[
+                "Parameters"
+            ]
+
+        df = pl.DataFrame({"id": [1], "year": [2001]})
+        res = ensure_table(
+            df, results=make_results([2001, 2002]), projection=True, **kwargs
+        )
+        assert res.action == EnsureActionEnum.created
+        assert get_parameters()["projection.year.range"] == "2001,2002"
+
+        # the partitions are already projected, nothing to change
+        version = get_version()
+        res = ensure_table(df, results=make_results([2002]), **kwargs)
+        assert res.action == EnsureActionEnum.unchanged
+        assert get_version() == version
+
+        # a new year widens the projection
+        res = ensure_table(df, results=make_results([2005]), **kwargs)
+        assert res.action == EnsureActionEnum.updated
+        assert res.diff.is_equal
+        assert get_parameters()["projection.year.range"] == "2001,2005"
+
+        # a new column and a new year, in one update_table call
+        df = df.with_columns(pl.lit("a").alias("name"))
+        version = get_version()
+        res = ensure_table(df, results=make_results([1999]), **kwargs)
+        assert res.action == EnsureActionEnum.updated
+        assert res.diff.added == {"name": "string"}
+        assert get_version() == version + 1
+        assert get_parameters()["projection.year.range"] == "1999,2005"
+        partitions = glue_client.get_partitions(
+            DatabaseName=self.database, TableName="ensure_projection"
+        )["Partitions"]
+        assert partitions == []
+
+    def test_ensure_table_format_change(self):
+        glue_client = self.bsm.glue_client
+        s3dir = f"s3://{self.bucket}/ensure_format/"
+        kwargs = dict(
+            database=self.database,
+            table="ensure_format",
+            s3dir=s3dir,
+            boto_ses=self.bsm.boto_ses,
+            partition_cols=["year"],
+        )
+
+        def make_results(years):
+            return [
+                PartitionWriteResult(values=(year,), location=f"{s3dir}year={year}/")
+                for year in years
+            ]
+
+        df = pl.DataFrame({"id": [1], "year": ["2001"]})
+        create_json_table(df, results=make_results(["2001", "2002"]), **kwargs)
+        res = ensure_table(
+            df, file_format="parquet", results=make_results(["2003"]), **kwargs
+        )
+        assert res.action == EnsureActionEnum.recreated
+        assert res.diff.format_changed
+        assert res.n_partitions_kept == 2
+        partitions = glue_client.get_partitions(
+            DatabaseName=self.database, TableName="ensure_format"
+        )["Partitions"]
+        input_formats = {
+            partition["Values"][0]: partition["StorageDescriptor"]["InputFormat"]
+            for partition in partitions
+        }
+        # the NDJSON partitions are still read as JSON
+        assert "Text" in input_formats["2001"]
+        assert "Text" in input_formats["2002"]
+        assert "Parquet" in input_formats["2003"]
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.catalog", preview=False)
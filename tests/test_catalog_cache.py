@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+from learn_awswrangler.catalog_cache import GlueCatalogCache
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+class Test(BaseMockTest):
+    database = "learn_awswrangler"
+
+    @classmethod
+    def setup_class_post_hook(cls):
+        cls.bsm.glue_client.create_database(DatabaseInput={"Name": cls.database})
+
+    def create_table(self, table: str, type_: str = "bigint"):
+        self.bsm.glue_client.create_table(
+            DatabaseName=self.database,
+            TableInput={
+                "Name": table,
+                "StorageDescriptor": {"Columns": [{"Name": "id", "Type": type_}]},
+                "PartitionKeys": [{"Name": "year", "Type": "string"}],
+            },
+        )
+
+    def update_table(self, table: str, type_: str):
+        self.bsm.glue_client.update_table(
+            DatabaseName=self.database,
+            TableInput={
+                "Name": table,
+                "StorageDescriptor": {"Columns": [{"Name": "id", "Type": type_}]},
+                "PartitionKeys": [{"Name": "year", "Type": "string"}],
+            },
+        )
+
+    def test_ttl_and_invalidate(self):
+        cache = GlueCatalogCache(self.bsm.glue_client, ttl=3600)
+        assert cache.database_exists(self.database) is True
+        assert cache.database_exists(self.database) is True
+        assert (cache.n_calls, cache.n_hits) == (1, 1)
+
+        # "doesn't exist" is cached too
+        assert cache.table_exists(self.database, "t1") is False
+        self.create_table("t1")
+        assert cache.table_exists(self.database, "t1") is False
+        cache.invalidate(self.database, "t1")
+        assert cache.table_exists(self.database, "t1") is True
+        assert cache.get_columns_types(self.database, "t1") == (
+            {"id": "bigint"},
+            {"year": "string"},
+        )
+        assert cache.get_table_input(self.database, "t1")["Name"] == "t1"
+        assert "VersionId" not in cache.get_table_input(self.database, "t1")
+        assert cache.n_calls == 3
+
+        cache.invalidate(self.database)
+        assert cache.table_exists(self.database, "t1") is True
+        assert cache.n_calls == 4
+
+    def test_version_check(self):
+        self.create_table("t2")
+        cache = GlueCatalogCache(self.bsm.glue_client, ttl=0)
+        columns_types = cache.get_columns_types(self.database, "t2")
+        parsed = cache._entries[("table", self.database, "t2")].columns_types
+        # revalidated, same version, the parsed schema is reused
+        assert cache.get_columns_types(self.database, "t2") == columns_types
+        assert cache._entries[("table", self.database, "t2")].columns_types is parsed
+        assert cache.n_calls == 2
+
+        self.update_table("t2", "int")
+        assert cache.get_columns_types(self.database, "t2")[0] == {"id": "int"}
+
+    def test_refresh_database(self):
+        self.create_table("t3")
+        cache = GlueCatalogCache(self.bsm.glue_client, ttl=3600)
+        assert cache.table_exists(self.database, "t4") is False
+        self.create_table("t4")
+        n_tables = cache.refresh_database(self.database)
+        assert n_tables >= 2
+        n_calls = cache.n_calls
+        assert cache.table_exists(self.database, "t3") is True
+        assert cache.table_exists(self.database, "t4") is True
+        assert cache.n_calls == n_calls
+
+        self.bsm.glue_client.delete_table(DatabaseName=self.database, Name="t4")
+        cache.refresh_database(self.database)
+        assert cache.table_exists(self.database, "t4") is False
+
+    def test_returned_values_are_copies(self):
+        self.create_table("t6")
+        cache = GlueCatalogCache(self.bsm.glue_client, ttl=3600)
+        table_input = cache.get_table_input(self.database, "t6")
+        table_input["StorageDescriptor"]["Location"] = "s3://b/new/"
+        table_input["StorageDescriptor"]["Columns"].append(
+            {"Name": "name", "Type": "string"}
+        )
+        table_input = cache.get_table_input(self.database, "t6")
+        assert "Location" not in table_input["StorageDescriptor"]
+        assert len(table_input["StorageDescriptor"]["Columns"]) == 1
+        cache.get_table(self.database, "t6")["PartitionKeys"].clear()
+        assert cache.get_table(self.database, "t6")["PartitionKeys"] != []
+        cache.get_database(self.database)["Name"] = "other"
+        assert cache.get_database(self.database)["Name"] == self.database
+        columns_types, partitions_types = cache.get_columns_types(self.database, "t6")
+        columns_types["name"] = "string"
+        partitions_types.clear()
+        assert cache.get_columns_types(self.database, "t6") == (
+            {"id": "bigint"},
+            {"year": "string"},
+        )
+        assert cache.n_calls == 2
+
+    def test_disk_store_and_lru(self, tmp_path):
+        self.create_table("t5")
+        cache = GlueCatalogCache(
+            self.bsm.glue_client, ttl=3600, maxsize=1, cache_dir=str(tmp_path)
+        )
+        table = cache.get_table(self.database, "t5")
+        cache.get_database(self.database)
+        # evicted from memory by the database, loaded back from disk
+        assert cache.get_table(self.database, "t5") == table
+        assert cache.n_calls == 2
+
+        # another process shares the store
+        other = GlueCatalogCache(
+            self.bsm.glue_client, ttl=3600, cache_dir=str(tmp_path)
+        )
+        assert other.get_table(self.database, "t5") == table
+        assert other.get_columns_types(self.database, "t5")[0] == {"id": "bigint"}
+        assert other.n_calls == 0
+
+        other.invalidate(self.database)
+        cache.invalidate(self.database, "t5")
+        assert other.get_table(self.database, "t5") == table
+        assert other.n_calls == 1
+
+        other.clear()
+        assert list(tmp_path.iterdir()) == []
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.catalog_cache", preview=False)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+import io
+
+import polars as pl
+import pytest
+
+import learn_awswrangler.compaction as compaction
+from learn_awswrangler.compaction import _plan_groups, compact_partitions
+from learn_awswrangler.catalog import register_partitions
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+def test_plan_groups():
+    objects = [{"Key": str(i), "Size": size} for i, size in enumerate([3, 3, 5, 1])]
+    groups = _plan_groups(objects, target_file_bytes=6)
+    assert [[obj["Key"] for obj in group] for group in groups] == [
+        ["0", "1"],
+        ["2", "3"],
+    ]
+    groups = _plan_groups(objects, target_file_bytes=2)
+    assert len(groups) == 4
+
+
+class Test(BaseMockTest):
+    use_server = True
+
+    def put_parquet(self, key: str, df: pl.DataFrame):
+        buffer = io.BytesIO()
+        df.write_parquet(buffer)
+        self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=buffer.getvalue())
+
+    def list_keys(self, prefix: str):
+        res = self.s3_client.list_objects_v2(Bucket=self.bucket, Prefix=prefix)
+        return sorted(obj["Key"] for obj in res.get("Contents", []))
+
+    def test_compact_partitions(self):
+        prefix = "compaction/"
+        for i in range(5):
+            self.put_parquet(
+                f"{prefix}year=2001/{i}.parquet",
+                pl.DataFrame({"id": [i * 10, i * 10 + 1]}),
+            )
+        self.put_parquet(
+            f"{prefix}year=2002/0.parquet",
+            pl.DataFrame({"id": [100]}),
+        )
+        self.s3_client.put_object(
+            Bucket=self.bucket, Key=f"{prefix}year=2001/_SUCCESS", Body=b""
+        )
+
+        results = compact_partitions(
+            s3dir=f"s3://{self.bucket}/{prefix}",
+            s3_client=self.s3_client,
+            target_file_bytes=1024 * 1024,
+        )
+        assert [res.location for res in results] == [
+            f"s3://{self.bucket}/{prefix}year=2001/",
+            f"s3://{self.bucket}/{prefix}year=2002/",
+        ]
+        res_2001, res_2002 = results
+        assert res_2001.compacted is True
+        assert res_2001.n_files_before == 5
+        assert res_2001.n_files_after == 1
+        assert res_2002.compacted is False
+        assert res_2002.n_files_before == res_2002.n_files_after == 1
+
+        keys = self.list_keys(f"{prefix}year=2001/")
+        assert len(keys) == 2
+        assert keys[0].endswith("_SUCCESS")
+        assert keys[1].endswith("-00000.parquet")
+        body = self.s3_client.get_object(Bucket=self.bucket, Key=keys[1])["Body"]
+        df = pl.read_parquet(io.BytesIO(body.read()))
+        assert sorted(df["id"].to_list()) == [0, 1, 10, 11, 20, 21, 30, 31, 40, 41]
+        assert res_2001.n_bytes_after == len(
+            self.s3_client.get_object(Bucket=self.bucket, Key=keys[1])["Body"].read()
+        )
+
+        # nothing left to compact
+        results = compact_partitions(
+            s3dir=f"s3://{self.bucket}/{prefix}",
+            s3_client=self.s3_client,
+        )
+        assert [res.compacted for res in results] == [False, False]
+
+        assert self.list_keys(f"{prefix}_compaction/") == []
+
+    def test_atomic_swap_and_recovery(self, monkeypatch):
+        prefix = "atomic/"
+        database, table = "learn_awswrangler", "atomic"
+        glue_client = self.bsm.glue_client
+        glue_client.create_database(DatabaseInput={"Name": database})
+        glue_client.create_table(
+            DatabaseName=database,
+            TableInput={
+                "Name": table,
+                "StorageDescriptor": {
+                    "Columns": [{"Name": "id", "Type": "bigint"}],
+                    "Location": f"s3://{self.bucket}/{prefix}",
+                },
+                "PartitionKeys": [{"Name": "year", "Type": "string"}],
+            },
+        )
+        location = f"s3://{self.bucket}/{prefix}year=2001/"
+        register_partitions(glue_client, database, table, {location: ["2001"]})
+        for i in range(3):
+            self.put_parquet(
+                f"{prefix}year=2001/{i}.parquet", pl.DataFrame({"id": [i]})
+            )
+
+        def get_location():
+            return glue_client.get_partition(
+                DatabaseName=database,
+                TableName=table,
+                PartitionValues=["2001"],
+            )["Partition"]["StorageDescriptor"]["Location"]
+
+        # crash after the outputs are uploaded, before the inputs are deleted
+        delete_keys = compaction.delete_keys
+
+        def crash(s3_client, bucket, keys):
+            raise RuntimeError("crash")
+
+        monkeypatch.setattr(compaction, "delete_keys", crash)
+        kwargs = dict(
+            s3dir=f"s3://{self.bucket}/{prefix}",
+            s3_client=self.s3_client,
+            glue_client=glue_client,
+            database=database,
+            table=table,
+        )
+        with pytest.raises(RuntimeError):
+            compact_partitions(**kwargs)
+        # the catalog reads the snapshot, without duplicates
+        snapshot = get_location()
+        assert snapshot.startswith(f"s3://{self.bucket}/{prefix}_compaction/")
+        assert snapshot.endswith("/year=2001/")
+        _, snapshot_prefix = snapshot.split("/", 3)[2:]
+        assert len(self.list_keys(f"{prefix}year=2001/")) == 4
+        assert [key.rsplit("/", 1)[1] for key in self.list_keys(snapshot_prefix)] == [
+            "0.parquet",
+            "1.parquet",
+            "2.parquet",
+            "_journal.json",
+        ]
+
+        # the next run finishes the interrupted compaction first
+        monkeypatch.setattr(compaction, "delete_keys", delete_keys)
+        results = compact_partitions(**kwargs)
+        assert [res.compacted for res in results] == [False]
+        assert get_location() == location
+        keys = self.list_keys(f"{prefix}year=2001/")
+        assert len(keys) == 1
+        assert keys[0].endswith("-00000.parquet")
+        assert self.list_keys(f"{prefix}_compaction/") == []
+
+        # a normal run goes through the snapshot and back
+        for i in range(3):
+            self.put_parquet(
+                f"{prefix}year=2001/{i}.parquet", pl.DataFrame({"id": [i]})
+            )
+        results = compact_partitions(**kwargs)
+        assert [res.compacted for res in results] == [True]
+        assert get_location() == location
+        assert len(self.list_keys(f"{prefix}year=2001/")) == 1
+        assert self.list_keys(f"{prefix}_compaction/") == []
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.compaction", preview=False)
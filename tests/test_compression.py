@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import io
+import gzip
+
+import pytest
+
+from learn_awswrangler.compression import get_extension, open_compressor
+
+
+def test_get_extension():
+    assert get_extension(None) == ""
+    assert get_extension("gzip") == ".gz"
+    assert get_extension("zstd") == ".zst"
+    with pytest.raises(ValueError):
+        get_extension("lzo")
+
+
+def test_open_compressor():
+    buffer = io.BytesIO()
+    with open_compressor(buffer, None) as f:
+        f.write(b"hello")
+    assert buffer.getvalue() == b"hello"
+
+    buffer = io.BytesIO()
+    with open_compressor(buffer, "gzip") as f:
+        f.write(b"hello ")
+        f.write(b"world")
+    assert not buffer.closed
+    assert gzip.decompress(buffer.getvalue()) == b"hello world"
+
+    zstandard = pytest.importorskip("zstandard")
+    buffer = io.BytesIO()
+    with open_compressor(buffer, "zstd", level=10) as f:
+        f.write(b"hello ")
+        f.write(b"world")
+    assert not buffer.closed
+    reader = zstandard.ZstdDecompressor().stream_reader(buffer.getvalue())
+    assert reader.read() == b"hello world"
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.compression", preview=False)
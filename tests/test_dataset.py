@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+import io
+from datetime import datetime
+
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+import awswrangler as wr
+
+from learn_awswrangler.dataset import to_parquet_dataset
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+def make_df(offset: int = 0) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "id": [offset + 1, offset + 2, offset + 3],
+            "name": ["a", None, "c"],
+            "tags": [["x"], [], None],
+            "year": ["2001", "2002", "2001"],
+        }
+    )
+
+
+class Test(BaseMockTest):
+    database = "learn_awswrangler"
+
+    @classmethod
+    def setup_class_post_hook(cls):
+        cls.bsm.glue_client.create_database(DatabaseInput={"Name": cls.database})
+
+    def get_table(self, table: str) -> dict:
+        return self.bsm.glue_client.get_table(
+            DatabaseName=self.database,
+            Name=table,
+        )["Table"]
+
+    def read(self, s3dir: str) -> list:
+        pdf = wr.s3.read_parquet(s3dir, dataset=True, boto3_session=self.bsm.boto_ses)
+        return sorted(pdf["id"].tolist())
+
+    def test_same_table_as_awswrangler(self):
+        df = make_df()
+        kwargs = dict(
+            database=self.database,
+            boto3_session=self.bsm.boto_ses,
+            partition_cols=["year"],
+        )
+        wr.s3.to_parquet(
+            df.to_pandas(use_pyarrow_extension_array=True),
+            path=f"s3://{self.bucket}/wr/",
+            dataset=True,
+            table="wr",
+            **kwargs,
+        )
+        res = to_parquet_dataset(
+            df,
+            s3dir=f"s3://{self.bucket}/arrow/",
+            database=self.database,
+            table="arrow",
+            s3_client=self.s3_client,
+            boto_ses=self.bsm.boto_ses,
+            partition_cols=["year"],
+        )
+        assert len(res["paths"]) == 2
+        assert all(path.endswith(".snappy.parquet") for path in res["paths"])
+        assert sorted(res["partitions_values"].values()) == [["2001"], ["2002"]]
+
+        expected, actual = self.get_table("wr"), self.get_table("arrow")
+        for key in ["PartitionKeys", "TableType", "Parameters"]:
+            assert actual[key] == expected[key]
+        for sd in (expected["StorageDescriptor"], actual["StorageDescriptor"]):
+            sd.pop("Location")
+        assert actual["StorageDescriptor"] == expected["StorageDescriptor"]
+
+        partitions = self.bsm.glue_client.get_partitions(
+            DatabaseName=self.database, TableName="arrow"
+        )["Partitions"]
+        assert len(partitions) == 2
+
+        # awswrangler reads it back the same way
+        pdf = wr.s3.read_parquet(
+            f"s3://{self.bucket}/arrow/", dataset=True, boto3_session=self.bsm.boto_ses
+        )
+        assert sorted(pdf["id"].tolist()) == [1, 2, 3]
+
+    def test_modes(self):
+        s3dir = f"s3://{self.bucket}/modes/"
+        kwargs = dict(
+            s3dir=s3dir,
+            database=self.database,
+            table="modes",
+            s3_client=self.s3_client,
+            boto_ses=self.bsm.boto_ses,
+            partition_cols=["year"],
+        )
+        to_parquet_dataset(make_df(), mode="overwrite", **kwargs)
+        to_parquet_dataset(make_df(10), mode="append", **kwargs)
+        assert self.read(s3dir) == [1, 2, 3, 11, 12, 13]
+
+        # only the 2002 partition is replaced
+        df = make_df(20).filter(pl.col("year") == "2002")
+        to_parquet_dataset(df, mode="overwrite_partitions", **kwargs)
+        assert self.read(s3dir) == [1, 3, 11, 13, 22]
+
+        to_parquet_dataset(make_df(30).lazy(), mode="overwrite", **kwargs)
+        assert self.read(s3dir) == [31, 32, 33]
+
+        with pytest.raises(ValueError):
+            to_parquet_dataset(make_df(), mode="upsert", **kwargs)
+
+    def test_unpartitioned(self):
+        s3dir = f"s3://{self.bucket}/flat/"
+        res = to_parquet_dataset(
+            make_df(),
+            s3dir=s3dir,
+            database=self.database,
+            table="flat",
+            s3_client=self.s3_client,
+            boto_ses=self.bsm.boto_ses,
+            compression=None,
+        )
+        assert len(res["paths"]) == 1
+        assert res["paths"][0].endswith(".parquet")
+        assert res["partitions_values"] == {}
+        assert self.get_table("flat")["PartitionKeys"] == []
+        assert self.read(s3dir) == [1, 2, 3]
+
+    def test_lazy_frame_same_parquet(self):
+        df = make_df().with_columns(
+            pl.lit(datetime(2001, 1, 1, 8, 30)).alias("time"),
+        )
+        files = dict()
+        for name, data in [("eager", df), ("lazy", df.lazy())]:
+            res = to_parquet_dataset(
+                data,
+                s3dir=f"s3://{self.bucket}/{name}/",
+                database=self.database,
+                table=name,
+                s3_client=self.s3_client,
+                boto_ses=self.bsm.boto_ses,
+                partition_cols=["year"],
+            )
+            files[name] = list()
+            for uri in sorted(res["paths"]):
+                bucket, key = uri[5:].split("/", 1)
+                body = self.s3_client.get_object(Bucket=bucket, Key=key)["Body"]
+                files[name].append(pq.ParquetFile(io.BytesIO(body.read())))
+
+        assert len(files["eager"]) == len(files["lazy"]) == 2
+        for eager, lazy in zip(files["eager"], files["lazy"]):
+            # the same writer options, e.g. the Spark flavor INT96 timestamps
+            time_index = lazy.schema_arrow.get_field_index("time")
+            assert lazy.schema.column(time_index).physical_type == "INT96"
+            assert lazy.schema_arrow == eager.schema_arrow
+            assert lazy.schema == eager.schema
+            assert lazy.metadata.format_version == eager.metadata.format_version
+            assert lazy.metadata.created_by == eager.metadata.created_by
+            assert lazy.metadata.metadata == eager.metadata.metadata
+            assert lazy.read().equals(eager.read())
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.dataset", preview=False)
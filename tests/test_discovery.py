@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+from learn_awswrangler.discovery import list_sub_folders, discover_partitions
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+class Test(BaseMockTest):
+    @classmethod
+    def setup_class_post_hook(cls):
+        keys = [
+            "table/year=2001/month=01/data.parquet",
+            "table/year=2001/month=02/part-00000.parquet",
+            "table/year=2001/month=02/part-00001.parquet",
+            "table/year=2002/month=01/data.parquet",
+            "table/_manifest.json",
+            "table/tmp/data.parquet",
+            "other/year=2001/month=01/data.parquet",
+        ]
+        for key in keys:
+            cls.s3_client.put_object(Bucket=cls.bucket, Key=key, Body=b"")
+
+    def test_list_sub_folders(self):
+        assert list_sub_folders(self.s3_client, self.bucket, "table/") == [
+            "table/tmp/",
+            "table/year=2001/",
+            "table/year=2002/",
+        ]
+
+    def test_discover_partitions(self):
+        s3dir = f"s3://{self.bucket}/table/"
+        expected = {
+            f"{s3dir}year=2001/month=01/": ["2001", "01"],
+            f"{s3dir}year=2001/month=02/": ["2001", "02"],
+            f"{s3dir}year=2002/month=01/": ["2002", "01"],
+        }
+        for max_workers in [1, 4]:
+            assert (
+                discover_partitions(s3dir, self.s3_client, max_workers=max_workers)
+                == expected
+            )
+        assert (
+            discover_partitions(s3dir, self.s3_client, partition_cols=["year", "month"])
+            == expected
+        )
+        assert discover_partitions(s3dir, self.s3_client, partition_cols=["year"]) == {
+            f"{s3dir}year=2001/": ["2001"],
+            f"{s3dir}year=2002/": ["2002"],
+        }
+        # the folders must match the partition columns
+        assert discover_partitions(s3dir, self.s3_client, partition_cols=["day"]) == {}
+        assert discover_partitions(f"s3://{self.bucket}/nothing/", self.s3_client) == {}
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.discovery", preview=False)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import polars as pl
+import pytest
+
+from learn_awswrangler.glue_schema import (
+    get_schema,
+    polars_type_to_glue,
+    glue_type_to_polars,
+    polars_schema_to_glue,
+    extract_athena_types,
+)
+
+
+def test_polars_type_to_glue():
+    assert polars_type_to_glue(pl.Int64()) == "bigint"
+    assert polars_type_to_glue(pl.Int64) == "bigint"
+    assert polars_type_to_glue(pl.UInt32()) == "bigint"
+    assert polars_type_to_glue(pl.Date()) == "date"
+    assert polars_type_to_glue(pl.Datetime("ms", "UTC")) == "timestamp"
+    assert polars_type_to_glue(pl.Decimal(10, 2)) == "decimal(10,2)"
+    assert polars_type_to_glue(pl.Enum(["a", "b"])) == "string"
+    assert polars_type_to_glue(pl.Array(pl.Int8, 3)) == "array<tinyint>"
+    address = pl.Struct({"city": pl.String, "zip": pl.Int32})
+    assert polars_type_to_glue(
+        pl.Struct({"home": address, "history": pl.List(address)})
+    ) == (
+        "struct<home:struct<city:string,zip:int>,"
+        "history:array<struct<city:string,zip:int>>>"
+    )
+    with pytest.raises(TypeError):
+        polars_type_to_glue(pl.Time())
+
+    # nested types are shared through the cache
+    polars_type_to_glue.cache_clear()
+    polars_type_to_glue(pl.List(address))
+    polars_type_to_glue(pl.Struct({"a": address}))
+    info = polars_type_to_glue.cache_info()
+    assert info.hits == 1
+
+
+def test_glue_type_to_polars():
+    assert glue_type_to_polars("bigint") == pl.Int64()
+    assert glue_type_to_polars("varchar(10)") == pl.String()
+    assert glue_type_to_polars("decimal(10, 2)") == pl.Decimal(10, 2)
+    assert glue_type_to_polars("map<string,int>") == pl.List(
+        pl.Struct({"key": pl.String, "value": pl.Int32})
+    )
+    address = pl.Struct({"city": pl.String, "zip": pl.Int32})
+    dtype = pl.Struct(
+        {"home": address, "history": pl.List(address), "price": pl.Decimal(10, 2)}
+    )
+    assert glue_type_to_polars(polars_type_to_glue(dtype)) == dtype
+    with pytest.raises(TypeError):
+        glue_type_to_polars("interval")
+
+
+def test_polars_schema_to_glue(tmp_path):
+    path = tmp_path / "data.json"
+    pl.DataFrame(
+        {
+            "id": [1, 2],
+            "year": ["2001", "2002"],
+            "tags": [["a"], ["b", "c"]],
+            "info": [{"name": "alice"}, {"name": "bob"}],
+        }
+    ).write_ndjson(path)
+    lf = pl.scan_ndjson(path)
+    columns_types, partitions_types = polars_schema_to_glue(
+        get_schema(lf), partition_cols=["year"]
+    )
+    assert columns_types == {
+        "id": "bigint",
+        "tags": "array<string>",
+        "info": "struct<name:string>",
+    }
+    assert partitions_types == {"year": "string"}
+
+    columns_types, partitions_types = polars_schema_to_glue(get_schema(lf.collect()))
+    assert list(columns_types) == ["id", "year", "tags", "info"]
+    assert partitions_types == {}
+
+    # partitions come in the order of partition_cols
+    _, partitions_types = polars_schema_to_glue(
+        {"id": pl.Int64, "month": pl.Int8, "year": pl.String},
+        partition_cols=["year", "month"],
+    )
+    assert list(partitions_types) == ["year", "month"]
+    with pytest.raises(ValueError):
+        polars_schema_to_glue(get_schema(lf), partition_cols=["day"])
+
+
+def test_extract_athena_types():
+    import awswrangler as wr
+
+    df = pl.DataFrame(
+        {
+            "id": [1, 2],
+            "name": ["a", "b"],
+            "score": [1.5, 2.5],
+            "flag": [True, False],
+            "tags": [["x"], ["y", "z"]],
+            "year": ["2001", "2002"],
+        }
+    )
+    expected = wr.catalog.extract_athena_types(
+        df=df.to_pandas(use_pyarrow_extension_array=False),
+        index=False,
+        partition_cols=["year"],
+        file_format="parquet",
+    )
+    assert extract_athena_types(df, partition_cols=["year"]) == expected
+    assert extract_athena_types(df.lazy(), partition_cols=["year"]) == expected
+    assert extract_athena_types(df.schema, partition_cols=["year"]) == expected
+
+    # nulls don't turn integers into doubles
+    columns_types, _ = extract_athena_types(pl.DataFrame({"id": [1, None]}))
+    assert columns_types == {"id": "bigint"}
+
+    columns_types, partitions_types = extract_athena_types(
+        df, partition_cols=["year"], dtype={"id": "int", "year": "int"}
+    )
+    assert columns_types["id"] == "int"
+    assert partitions_types == {"year": "int"}
+
+    with pytest.raises(TypeError):
+        extract_athena_types(df, file_format="csv")
+    with pytest.raises(ValueError):
+        extract_athena_types(df, file_format="orc")
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.glue_schema", preview=False)
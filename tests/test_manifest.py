@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import polars as pl
+
+from learn_awswrangler.manifest import Manifest, fingerprint
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+def test_fingerprint():
+    df = pl.DataFrame({"id": [1, 2, 3], "name": ["a", "b", None]})
+    assert fingerprint(df) == fingerprint(df.clone())
+    assert fingerprint(df) == fingerprint(pl.concat([df.head(1), df.tail(2)]))
+    assert fingerprint(df) != fingerprint(df.reverse())
+    assert fingerprint(df) != fingerprint(df.head(2))
+    assert fingerprint(df) != fingerprint(df.with_columns(pl.col("id") * 2))
+    assert fingerprint(df) != fingerprint(df.cast({"id": pl.Int32}))
+    assert fingerprint(df) != fingerprint(df, salt="zstd")
+    assert fingerprint(df.select()) == fingerprint(pl.DataFrame())
+
+
+class Test(BaseMockTest):
+    def test_read_write(self):
+        key = "table/_manifest.json"
+        manifest = Manifest.read(self.s3_client, self.bucket, key)
+        assert manifest.partitions == {}
+        assert manifest.get_fingerprint("year=2001/") is None
+        assert manifest.get_files("year=2001/") == []
+
+        manifest.partitions["year=2001/"] = {"fingerprint": "abc", "files": []}
+        manifest.write(self.s3_client, self.bucket, key)
+        manifest = Manifest.read(self.s3_client, self.bucket, key)
+        assert manifest.get_fingerprint("year=2001/") == "abc"
+
+        # fingerprints of another polars version are not trusted
+        manifest.polars_version = "0.0.1"
+        manifest.write(self.s3_client, self.bucket, key)
+        manifest = Manifest.read(self.s3_client, self.bucket, key)
+        assert manifest.get_fingerprint("year=2001/") is None
+        assert manifest.polars_version == pl.__version__
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.manifest", preview=False)
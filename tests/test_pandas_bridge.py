@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+from unittest import mock
+
+import polars as pl
+import pandas as pd
+import pytest
+import awswrangler as wr
+
+from learn_awswrangler import writer, pandas_bridge
+from learn_awswrangler.pandas_bridge import (
+    VARIABLE_WIDTH_BYTES,
+    estimate_row_bytes,
+    to_pandas,
+    iter_pandas_chunks,
+    write_chunked,
+)
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+def make_df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "id": [1, 2, 3, 4],
+            "score": [1.5, 2.5, 3.5, 4.5],
+            "nullable_int": [1, None, 3, None],
+            "flag": [True, None, False, True],
+            "name": ["a", "b", None, "d"],
+            "point": pl.Series(
+                [[1, 2], [3, 4], None, [5, 6]], dtype=pl.Array(pl.Int64, 2)
+            ),
+            "info": [{"a": 1}, None, {"a": 3}, {"a": 4}],
+        }
+    )
+
+
+def test_to_pandas_arrow_dtypes():
+    df = make_df()
+    res = to_pandas(df)
+    pdf = res.df
+    assert pdf["id"].dtype == "int64"
+    assert isinstance(pdf["nullable_int"].dtype, pd.ArrowDtype)
+    # zero-copy columns
+    for col in ["id", "score", "nullable_int", "flag", "info"]:
+        assert res.copied_bytes[col] == 0
+    # string views are rewritten, fixed size lists get offsets
+    assert res.copied_bytes["name"] > 0
+    assert res.copied_bytes["point"] > 0
+    assert res.total_copied_bytes == sum(res.copied_bytes.values())
+    assert pdf["nullable_int"].isna().tolist() == [False, True, False, True]
+
+    columns_types, _ = wr.catalog.extract_athena_types(pdf)
+    assert columns_types == {
+        "id": "bigint",
+        "score": "double",
+        "nullable_int": "bigint",
+        "flag": "boolean",
+        "name": "string",
+        "point": "array<bigint>",
+        "info": "struct<a:bigint>",
+    }
+
+
+def test_to_pandas_masked_dtypes():
+    df = make_df()
+    res = to_pandas(df, use_arrow_dtypes=False)
+    pdf = res.df
+    assert str(pdf["nullable_int"].dtype) == "Int64"
+    assert str(pdf["flag"].dtype) == "boolean"
+    assert pdf["nullable_int"].tolist() == [1, pd.NA, 3, pd.NA]
+    assert res.copied_bytes["id"] == 0
+    assert res.copied_bytes["nullable_int"] > 0
+
+    columns_types, _ = wr.catalog.extract_athena_types(pdf.drop(columns=["point"]))
+    assert columns_types["nullable_int"] == "bigint"
+    assert columns_types["flag"] == "boolean"
+    assert columns_types["name"] == "string"
+
+
+def test_iter_pandas_chunks():
+    df = pl.DataFrame({"id": range(1000), "name": [str(i) for i in range(1000)]})
+    chunks = list(iter_pandas_chunks(df, chunk_rows=300))
+    assert [len(chunk) for chunk in chunks] == [250, 250, 250, 250]
+    assert pd.concat(chunks)["id"].tolist() == list(range(1000))
+
+    bytes_per_row = df.estimated_size() / df.height
+    chunks = list(iter_pandas_chunks(df, chunk_bytes=int(bytes_per_row * 100)))
+    assert all(len(chunk) <= 100 for chunk in chunks)
+
+    chunks = list(iter_pandas_chunks(df.lazy(), chunk_rows=300))
+    assert max(len(chunk) for chunk in chunks) <= 300
+    assert pd.concat(chunks)["id"].tolist() == list(range(1000))
+
+    assert list(iter_pandas_chunks(df.clear(), chunk_rows=10)) == []
+    with pytest.raises(ValueError):
+        list(iter_pandas_chunks(df))
+
+
+def test_estimate_row_bytes():
+    schema = {
+        "id": pl.Int64,
+        "flag": pl.Boolean,
+        "name": pl.String,
+        "point": pl.Struct({"x": pl.Float32, "y": pl.Float32}),
+        "day": pl.Date,
+    }
+    assert estimate_row_bytes(schema) == 8 + 1 + VARIABLE_WIDTH_BYTES + 8 + 4
+    assert estimate_row_bytes({}) == 1
+
+
+def test_iter_pandas_chunks_lazy_chunk_bytes():
+    # wide rows, 1000 float columns, 8 KB per row
+    df = pl.DataFrame({f"c{i}": [float(i)] * 100 for i in range(1000)})
+    batch_rows = list()
+
+    def iter_lazy_batches(lf, n_rows):
+        batch_rows.append(n_rows)
+        return writer.iter_lazy_batches(lf, n_rows)
+
+    with mock.patch.object(pandas_bridge, "iter_lazy_batches", iter_lazy_batches):
+        chunks = list(iter_pandas_chunks(df.lazy(), chunk_bytes=80_000))
+    # the collected batches are sized by chunk_bytes, not 100k rows
+    assert batch_rows == [10]
+    assert max(len(chunk) for chunk in chunks) <= 10
+    assert sum(len(chunk) for chunk in chunks) == 100
+
+
+class Test(BaseMockTest):
+    database = "learn_awswrangler"
+
+    @classmethod
+    def setup_class_post_hook(cls):
+        cls.bsm.glue_client.create_database(DatabaseInput={"Name": cls.database})
+
+    def test_write_chunked(self):
+        df = pl.DataFrame(
+            {
+                "id": range(100),
+                "value": [None if i % 3 else i for i in range(100)],
+                "year": [str(2000 + i % 4) for i in range(100)],
+            }
+        )
+        path = f"s3://{self.bucket}/chunked/"
+        kwargs = dict(
+            path=path,
+            chunk_rows=30,
+            partition_cols=["year"],
+            database=self.database,
+            table="chunked",
+            boto3_session=self.bsm.boto_ses,
+        )
+        res = write_chunked(wr.s3.to_parquet, df, mode="overwrite", **kwargs)
+        assert len(res["paths"]) == 4 * 4
+        assert len(res["partitions_values"]) == 4
+
+        # overwrite replaces the dataset once, not per chunk
+        write_chunked(wr.s3.to_parquet, df, mode="overwrite", **kwargs)
+        pdf = wr.s3.read_parquet(path, dataset=True, boto3_session=self.bsm.boto_ses)
+        assert sorted(pdf["id"].tolist()) == list(range(100))
+        assert pdf["value"].isna().sum() == df["value"].null_count()
+
+        table = self.bsm.glue_client.get_table(
+            DatabaseName=self.database, Name="chunked"
+        )["Table"]
+        columns = {
+            col["Name"]: col["Type"] for col in table["StorageDescriptor"]["Columns"]
+        }
+        assert columns == {"id": "bigint", "value": "bigint"}
+
+        with pytest.raises(ValueError):
+            write_chunked(wr.s3.to_parquet, df, mode="overwrite_partitions", **kwargs)
+        with pytest.raises(ValueError):
+            write_chunked(wr.s3.to_parquet, df, dataset=False, **kwargs)
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.pandas_bridge", preview=False)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import io
+
+import polars as pl
+import pytest
+
+from learn_awswrangler.writer import write_partitioned_parquet
+from learn_awswrangler.parquet_schema import (
+    parse_hive_path,
+    read_footer_schema,
+    infer_parquet_schema,
+)
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+def test_parse_hive_path():
+    assert parse_hive_path("year=2001/month=01/data.parquet") == [
+        ("year", "2001"),
+        ("month", "01"),
+    ]
+    assert parse_hive_path("data.parquet") == []
+
+
+class Test(BaseMockTest):
+    def put_parquet(self, key: str, df: pl.DataFrame):
+        buf = io.BytesIO()
+        df.write_parquet(buf)
+        self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=buf.getvalue())
+
+    def test_read_footer_schema(self):
+        df = pl.DataFrame({"id": [1, 2], "name": ["a", "b"]})
+        self.put_parquet("footer/data.parquet", df)
+        for tail_size in [8, 16, 64 * 1024]:  # footer bigger and smaller
+            schema = read_footer_schema(
+                self.s3_client, self.bucket, "footer/data.parquet", tail_size
+            )
+            assert schema.names == ["id", "name"]
+
+        self.s3_client.put_object(
+            Bucket=self.bucket, Key="footer/x.parquet", Body=b"{}"
+        )
+        with pytest.raises(ValueError):
+            read_footer_schema(self.s3_client, self.bucket, "footer/x.parquet")
+
+    def test_infer_parquet_schema(self):
+        s3dir = f"s3://{self.bucket}/infer/"
+        df = pl.DataFrame(
+            {
+                "id": pl.Series([1, 2, 3], dtype=pl.Int32),
+                "score": [1, 2, 3],
+                "info": [{"a": 1}, {"a": 2}, {"a": 3}],
+                "year": ["2001", "2002", "2002"],
+                "month": ["01", "01", "02"],
+            }
+        )
+        write_partitioned_parquet(
+            df=df,
+            s3dir=s3dir,
+            partition_cols=["year", "month"],
+            s3_client=self.s3_client,
+        )
+        # a later file widens the types and adds columns
+        df = pl.DataFrame(
+            {
+                "id": [4],
+                "score": [4.5],
+                "info": [{"a": 4, "b": "x"}],
+                "name": ["d"],
+            }
+        )
+        self.put_parquet("infer/year=2003/month=12/other.parquet", df)
+        self.s3_client.put_object(
+            Bucket=self.bucket, Key="infer/_manifest.json", Body=b"{}"
+        )
+
+        res = infer_parquet_schema(s3dir, self.s3_client, max_workers=4)
+        assert res.n_files == 4
+        assert res.n_schemas == 2
+        assert res.columns_types == {
+            "id": "bigint",
+            "score": "double",
+            "info": "struct<a:bigint,b:string>",
+            "name": "string",
+        }
+        assert res.partitions_types == {"year": "string", "month": "string"}
+        assert res.partitions_values[f"{s3dir}year=2003/month=12/"] == ["2003", "12"]
+        assert len(res.partitions_values) == 4
+
+        res = infer_parquet_schema(s3dir, self.s3_client, infer_partition_types=True)
+        # month has leading zeros, it can't be a bigint
+        assert res.partitions_types == {"year": "bigint", "month": "string"}
+
+        self.put_parquet("infer/year=2004/data.parquet", df)
+        with pytest.raises(ValueError):
+            infer_parquet_schema(s3dir, self.s3_client)
+        with pytest.raises(ValueError):
+            infer_parquet_schema(f"s3://{self.bucket}/nothing/", self.s3_client)
+
+    def test_incompatible_schemas(self):
+        self.put_parquet("bad/a.parquet", pl.DataFrame({"x": [True]}))
+        self.put_parquet(
+            "bad/b.parquet",
+            pl.DataFrame({"x": pl.Series([1], dtype=pl.Date)}),
+        )
+        with pytest.raises(ValueError):
+            infer_parquet_schema(f"s3://{self.bucket}/bad/", self.s3_client)
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.parquet_schema", preview=False)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+import polars as pl
+import pytest
+
+from learn_awswrangler.partition import (
+    HIVE_DEFAULT_PARTITION,
+    to_hive_value,
+    to_hive_path,
+    get_hive_values,
+    iter_partitions,
+)
+
+
+def test_to_hive_path():
+    assert to_hive_path(["year"], ["2001"]) == "year=2001/"
+    assert to_hive_path(["year", "month"], [2001, 1]) == "year=2001/month=1/"
+    assert to_hive_path(["year"], [None]) == f"year={HIVE_DEFAULT_PARTITION}/"
+    assert to_hive_path(["flag"], [True]) == "flag=true/"
+    ts = datetime.datetime(2001, 1, 1)
+    assert to_hive_path(["ts"], [ts]) == "ts=2001-01-01 00:00:00.000000/"
+    assert to_hive_value(ts, pl.Datetime("ms")) == "2001-01-01 00:00:00.000"
+
+
+def test_get_hive_values():
+    location = "s3://bucket/table/year=2001/ts=2001-01-01 00:00:00.000000/"
+    assert get_hive_values(location, 2) == ["2001", "2001-01-01 00:00:00.000000"]
+    assert get_hive_values(location, 0) == []
+    with pytest.raises(ValueError):
+        get_hive_values("s3://bucket/table/2001/", 1)
+
+
+def test_iter_partitions():
+    df = pl.DataFrame(
+        {
+            "id": [1, 2, 3, 4],
+            "year": ["2002", "2001", "2002", "2001"],
+        }
+    )
+    partitions = list(iter_partitions(df, ["year"]))
+    assert [values for values, _, _ in partitions] == [("2001",), ("2002",)]
+    assert [hive_path for _, hive_path, _ in partitions] == [
+        "year=2001/",
+        "year=2002/",
+    ]
+    assert partitions[0][2]["id"].to_list() == [2, 4]
+    assert partitions[1][2]["id"].to_list() == [1, 3]
+
+
+def test_iter_partitions_multi_columns():
+    df = pl.DataFrame(
+        {
+            "id": [1, 2, 3, 4, 5, 6],
+            "day": [
+                datetime.date(2001, 1, 2),
+                datetime.date(2001, 1, 1),
+                None,
+                datetime.date(2001, 1, 2),
+                datetime.date(2001, 1, 1),
+                None,
+            ],
+            "tenant": ["b", "a", "a", "b", "b", "a"],
+            "flag": [True, False, True, True, False, True],
+        }
+    )
+    partition_cols = ["day", "tenant", "flag"]
+    partitions = list(iter_partitions(df, partition_cols))
+    assert [values for values, _, _ in partitions] == [
+        (datetime.date(2001, 1, 1), "a", False),
+        (datetime.date(2001, 1, 1), "b", False),
+        (datetime.date(2001, 1, 2), "b", True),
+        (None, "a", True),
+    ]
+    assert [sub_df["id"].to_list() for _, _, sub_df in partitions] == [
+        [2],
+        [5],
+        [1, 4],
+        [3, 6],
+    ]
+    # the vectorized hive paths match the scalar implementation
+    for values, hive_path, _ in partitions:
+        assert hive_path == to_hive_path(partition_cols, values)
+    assert partitions[-1][1] == f"day={HIVE_DEFAULT_PARTITION}/tenant=a/flag=true/"
+
+    # group_by gives the same partitions
+    expected = {
+        values: sub_df["id"].sort().to_list()
+        for values, sub_df in df.group_by(partition_cols)
+    }
+    assert {
+        values: sub_df["id"].to_list() for values, _, sub_df in partitions
+    } == expected
+
+
+def test_iter_partitions_no_partition_cols():
+    df = pl.DataFrame({"id": [1, 2, 3]})
+    [(values, hive_path, sub_df)] = list(iter_partitions(df, []))
+    assert (values, hive_path) == ((), "")
+    assert sub_df.equals(df)
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.partition", preview=False)
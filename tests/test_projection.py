@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+import polars as pl
+
+from learn_awswrangler.writer import PartitionWriteResult
+from learn_awswrangler.partition import to_hive_path
+from learn_awswrangler.projection import (
+    MAX_INTEGER_RANGE,
+    infer_partition_projection,
+    merge_partition_projection,
+    to_table_parameters,
+)
+
+
+def make_results(partitions, partition_cols=None):
+    if partition_cols is None:
+        partition_cols = [f"col{ith}" for ith in range(len(partitions[0]))]
+    return [
+        PartitionWriteResult(
+            values=values,
+            location=f"s3://bucket/table/{to_hive_path(partition_cols, values)}",
+        )
+        for values in partitions
+    ]
+
+
+def test_infer_partition_projection():
+    schema = {
+        "year": pl.String,
+        "month": pl.String,
+        "day": pl.Date,
+        "shard": pl.Int32,
+        "tenant": pl.String,
+    }
+    results = make_results(
+        [
+            ("2001", "01", datetime.date(2001, 1, 1), 3, "b"),
+            ("2002", "12", datetime.date(2001, 1, 31), 1, "a"),
+            ("2003", "02", datetime.date(2001, 1, 15), 2, None),
+        ]
+    )
+    settings = infer_partition_projection(
+        results,
+        partition_cols=list(schema),
+        schema=schema,
+        s3dir="s3://bucket/table",
+    )
+    assert settings["projection_types"] == {
+        "year": "integer",
+        "month": "integer",
+        "day": "date",
+        "shard": "integer",
+        "tenant": "enum",
+    }
+    assert settings["projection_ranges"] == {
+        "year": "2001,2003",
+        "month": "1,12",
+        "day": "2001-01-01,2001-01-31",
+        "shard": "1,3",
+    }
+    assert settings["projection_digits"] == {"year": "4", "month": "2"}
+    assert settings["projection_formats"] == {"day": "yyyy-MM-dd"}
+    assert settings["projection_values"] == {"tenant": "__HIVE_DEFAULT_PARTITION__,a,b"}
+    assert settings["projection_storage_location_template"] == (
+        "s3://bucket/table/year=${year}/month=${month}/day=${day}/"
+        "shard=${shard}/tenant=${tenant}/"
+    )
+
+    settings = infer_partition_projection(
+        make_results([(datetime.date(2001, 1, 1), True)]),
+        partition_cols=["day", "flag"],
+        schema={"day": pl.Date, "flag": pl.Boolean},
+        s3dir="s3://bucket/table/",
+        date_range_to_now=True,
+    )
+    assert settings["projection_ranges"] == {"day": "2001-01-01,NOW"}
+    assert settings["projection_values"] == {"flag": "true"}
+
+
+def test_merge_partition_projection():
+    parameters = {
+        "projection.year.type": "integer",
+        "projection.year.range": "2000,2002",
+        "projection.day.type": "date",
+        "projection.day.range": "2001-01-01,2001-01-31",
+        "projection.tenant.type": "enum",
+        "projection.tenant.values": "a,c",
+        "projection.shard.type": "enum",
+        "projection.shard.values": "x",
+    }
+    settings = {
+        "projection_types": {
+            "year": "integer",
+            "day": "date",
+            "tenant": "enum",
+            "shard": "integer",
+        },
+        "projection_ranges": {
+            "year": "2001,2005",
+            "day": "2000-12-01,2001-01-15",
+            "shard": "1,2",
+        },
+        "projection_values": {"tenant": "b"},
+    }
+    merged = merge_partition_projection(parameters, settings)
+    assert merged["projection_ranges"] == {
+        "year": "2000,2005",
+        "day": "2000-12-01,2001-01-31",
+        "shard": "1,2",
+    }
+    assert merged["projection_values"] == {"tenant": "a,b,c"}
+    # the input is not modified
+    assert settings["projection_ranges"]["year"] == "2001,2005"
+
+
+def test_enum_value_with_comma():
+    settings = infer_partition_projection(
+        make_results([("a,b", "x"), ("c", "y")]),
+        partition_cols=["tags", "tenant"],
+        schema={"tags": pl.String, "tenant": pl.String},
+        s3dir="s3://bucket/table/",
+    )
+    # can't be listed in projection.tags.values
+    assert settings["projection_types"] == {"tags": "injected", "tenant": "enum"}
+    assert settings["projection_values"] == {"tenant": "x,y"}
+    assert to_table_parameters(settings) == {
+        "projection.enabled": "true",
+        "projection.tags.type": "injected",
+        "projection.tenant.type": "enum",
+        "projection.tenant.values": "x,y",
+        "storage.location.template": (
+            "s3://bucket/table/tags=${tags}/tenant=${tenant}/"
+        ),
+    }
+
+
+def test_integer_range_bound():
+    settings = infer_partition_projection(
+        make_results([(1, "0001"), (MAX_INTEGER_RANGE + 1, "0002")]),
+        partition_cols=["user_id", "shard"],
+        schema={"user_id": pl.Int64, "shard": pl.String},
+        s3dir="s3://bucket/table/",
+    )
+    assert settings["projection_types"] == {"user_id": "injected", "shard": "integer"}
+    assert settings["projection_ranges"] == {"shard": "1,2"}
+    assert settings["projection_digits"] == {"shard": "4"}
+
+    # an append that widens the range too much
+    parameters = {
+        "projection.shard.type": "integer",
+        "projection.shard.range": f"{MAX_INTEGER_RANGE},{MAX_INTEGER_RANGE + 5}",
+        "projection.shard.digits": "4",
+    }
+    merged = merge_partition_projection(parameters, settings)
+    assert merged["projection_types"] == {"user_id": "injected", "shard": "injected"}
+    assert merged["projection_ranges"] == {}
+    assert merged["projection_digits"] == {}
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.projection", preview=False)
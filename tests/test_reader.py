@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+import polars as pl
+import pytest
+
+from learn_awswrangler.writer import write_partitioned_parquet
+from learn_awswrangler.catalog import create_parquet_table
+from learn_awswrangler.dataset import to_parquet_dataset
+from learn_awswrangler.reader import prune_partitions, read_table
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+def test_prune_partitions():
+    partitions_values = {
+        "s3://b/t/year=2001/month=1/": ["2001", "1"],
+        "s3://b/t/year=2001/month=2/": ["2001", "2"],
+        "s3://b/t/year=2002/month=1/": ["2002", "1"],
+        "s3://b/t/year=__HIVE_DEFAULT_PARTITION__/month=1/": [
+            "__HIVE_DEFAULT_PARTITION__",
+            "1",
+        ],
+    }
+    partitions_types = {"year": "bigint", "month": "int"}
+
+    def prune(filters):
+        return list(prune_partitions(partitions_values, partitions_types, filters))
+
+    assert prune(None) == list(partitions_values)
+    assert prune(pl.col("year") == 2001) == list(partitions_values)[:2]
+    assert prune([pl.col("year") >= 2001, pl.col("month") == 1]) == [
+        "s3://b/t/year=2001/month=1/",
+        "s3://b/t/year=2002/month=1/",
+    ]
+    assert prune(pl.col("year").is_null()) == list(partitions_values)[3:]
+    # data column filters can't prune
+    assert prune(pl.col("id") > 0) == list(partitions_values)
+
+
+class Test(BaseMockTest):
+    use_server = True
+    database = "learn_awswrangler"
+
+    @classmethod
+    def setup_class_post_hook(cls):
+        cls.bsm.glue_client.create_database(DatabaseInput={"Name": cls.database})
+        cls.df = pl.DataFrame(
+            {
+                "id": list(range(1, 9)),
+                "value": [10, 20, 30, 40, 50, 60, 70, 80],
+                "year": [2001, 2001, 2002, 2002, 2003, 2003, None, None],
+            }
+        )
+        to_parquet_dataset(
+            cls.df,
+            s3dir=f"s3://{cls.bucket}/registered/",
+            database=cls.database,
+            table="registered",
+            s3_client=cls.s3_client,
+            boto_ses=cls.bsm.boto_ses,
+            partition_cols=["year"],
+        )
+        # not a data file
+        cls.s3_client.put_object(
+            Bucket=cls.bucket, Key="registered/year=2001/_SUCCESS", Body=b""
+        )
+        s3dir = f"s3://{cls.bucket}/projected/"
+        df = cls.df.drop_nulls("year")
+        results = write_partitioned_parquet(
+            df=df,
+            s3dir=s3dir,
+            partition_cols=["year"],
+            s3_client=cls.s3_client,
+        )
+        create_parquet_table(
+            df=df,
+            database=cls.database,
+            table="projected",
+            s3dir=s3dir,
+            boto_ses=cls.bsm.boto_ses,
+            partition_cols=["year"],
+            results=results,
+            projection=True,
+        )
+
+    def read(self, table: str, **kwargs) -> pl.DataFrame:
+        lf = read_table(self.database, table, self.bsm.boto_ses, **kwargs)
+        assert isinstance(lf, pl.LazyFrame)
+        return lf.collect().sort("id")
+
+    def test_read_table(self):
+        df = self.read("registered")
+        assert df.schema == pl.Schema(
+            {"id": pl.Int64, "value": pl.Int64, "year": pl.Int64}
+        )
+        assert df.equals(self.df.select(df.columns))
+
+        df = self.read(
+            "registered",
+            columns=["id", "year"],
+            filters=[pl.col("year") >= 2002, pl.col("value") < 60],
+        )
+        assert df.to_dicts() == [
+            {"id": 3, "year": 2002},
+            {"id": 4, "year": 2002},
+            {"id": 5, "year": 2003},
+        ]
+        assert self.read("registered", filters=pl.col("year").is_null())[
+            "id"
+        ].to_list() == [7, 8]
+
+        # every partition is pruned
+        df = self.read("registered", filters=pl.col("year") == 1999)
+        assert df.height == 0
+        assert df.columns == ["id", "value", "year"]
+
+        # partition projection, the partitions are found on S3
+        df = self.read("projected", filters=pl.col("year") == 2003)
+        assert df["id"].to_list() == [5, 6]
+
+    def test_widened_types(self):
+        s3dir = f"s3://{self.bucket}/widened/"
+        # files written before the columns were widened / added
+        old_df = pl.DataFrame(
+            {"id": [1], "score": [0.5], "year": ["2001"]},
+            schema={"id": pl.Int32, "score": pl.Float32, "year": pl.String},
+        )
+        new_df = pl.DataFrame(
+            {"id": [2], "score": [1.5], "name": ["b"], "year": ["2002"]},
+            schema={
+                "id": pl.Int64,
+                "score": pl.Float64,
+                "name": pl.String,
+                "year": pl.String,
+            },
+        )
+        results = list()
+        for df in [old_df, new_df]:
+            results.extend(
+                write_partitioned_parquet(
+                    df=df,
+                    s3dir=s3dir,
+                    partition_cols=["year"],
+                    s3_client=self.s3_client,
+                )
+            )
+        create_parquet_table(
+            df=new_df,
+            database=self.database,
+            table="widened",
+            s3dir=s3dir,
+            boto_ses=self.bsm.boto_ses,
+            partition_cols=["year"],
+            results=results,
+        )
+        df = self.read("widened")
+        assert df.schema == pl.Schema(
+            {
+                "id": pl.Int64,
+                "score": pl.Float64,
+                "name": pl.String,
+                "year": pl.String,
+            }
+        )
+        assert df.to_dicts() == [
+            {"id": 1, "score": 0.5, "name": None, "year": "2001"},
+            {"id": 2, "score": 1.5, "name": "b", "year": "2002"},
+        ]
+
+    def test_datetime_partitions(self):
+        df = pl.DataFrame(
+            {
+                "id": [1, 2, 3],
+                "ts": [
+                    datetime.datetime(2001, 1, 1),
+                    datetime.datetime(2001, 1, 2, 8, 30),
+                    datetime.datetime(2001, 1, 1),
+                ],
+            }
+        )
+        for table, projection in [("ts_registered", False), ("ts_projected", True)]:
+            s3dir = f"s3://{self.bucket}/{table}/"
+            results = write_partitioned_parquet(
+                df=df,
+                s3dir=s3dir,
+                partition_cols=["ts"],
+                s3_client=self.s3_client,
+            )
+            # the folders are named by ``cast(pl.String)``
+            assert results[0].location == f"{s3dir}ts=2001-01-01 00:00:00.000000/"
+            create_parquet_table(
+                df=df,
+                database=self.database,
+                table=table,
+                s3dir=s3dir,
+                boto_ses=self.bsm.boto_ses,
+                partition_cols=["ts"],
+                results=results,
+                projection=projection,
+            )
+            assert self.read(table).equals(df)
+
+        # the partitions and the projection use the folder names
+        partitions = self.bsm.glue_client.get_partitions(
+            DatabaseName=self.database, TableName="ts_registered"
+        )["Partitions"]
+        assert sorted(p["Values"][0] for p in partitions) == [
+            "2001-01-01 00:00:00.000000",
+            "2001-01-02 08:30:00.000000",
+        ]
+        parameters = self.bsm.glue_client.get_table(
+            DatabaseName=self.database, Name="ts_projected"
+        )["Table"]["Parameters"]
+        assert parameters["projection.ts.values"] == (
+            "2001-01-01 00:00:00.000000,2001-01-02 08:30:00.000000"
+        )
+
+    def test_invalid_table(self):
+        self.bsm.glue_client.create_table(
+            DatabaseName=self.database,
+            TableInput={
+                "Name": "csv",
+                "StorageDescriptor": {
+                    "Location": f"s3://{self.bucket}/csv/",
+                    "InputFormat": "org.apache.hadoop.mapred.TextInputFormat",
+                },
+            },
+        )
+        with pytest.raises(ValueError):
+            read_table(self.database, "csv", self.bsm.boto_ses)
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.reader", preview=False)
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from botocore.exceptions import ClientError
+
+from learn_awswrangler.s3_delete import delete_prefix
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+class FlakyS3Client:
+    """
+    Throttle the first ``delete_objects`` calls, like S3 under load.
+    """
+
+    def __init__(self, s3_client, n_slow_down: int, error_code: str = "SlowDown"):
+        self.s3_client = s3_client
+        self.n_slow_down = n_slow_down
+        self.error_code = error_code
+        self.n_calls = 0
+
+    def get_paginator(self, name):
+        return self.s3_client.get_paginator(name)
+
+    def delete_objects(self, Bucket, Delete):
+        self.n_calls += 1
+        if self.n_calls == 1:
+            raise ClientError(
+                {"Error": {"Code": self.error_code, "Message": "Please reduce"}},
+                "DeleteObjects",
+            )
+        if self.n_calls <= self.n_slow_down:
+            # half of the keys are throttled
+            objects = Delete["Objects"]
+            self.s3_client.delete_objects(
+                Bucket=Bucket,
+                Delete=dict(Delete, Objects=objects[: len(objects) // 2]),
+            )
+            return {
+                "Errors": [
+                    {"Key": obj["Key"], "Code": "SlowDown"}
+                    for obj in objects[len(objects) // 2 :]
+                ]
+            }
+        return self.s3_client.delete_objects(Bucket=Bucket, Delete=Delete)
+
+
+class Test(BaseMockTest):
+    def put_keys(self, keys):
+        for key in keys:
+            self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=b"")
+
+    def list_keys(self, prefix: str):
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        return [
+            obj["Key"]
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix)
+            for obj in page.get("Contents", [])
+        ]
+
+    def test_delete_prefix(self):
+        keys = [f"table/day={i % 10}/{i}.parquet" for i in range(2100)]
+        self.put_keys(keys)
+        self.put_keys(["table_backup/1.parquet"])
+
+        snapshots = list()
+        result = delete_prefix(
+            f"s3://{self.bucket}/table/",
+            self.s3_client,
+            max_workers=4,
+            progress=snapshots.append,
+        )
+        assert self.list_keys("table") == ["table_backup/1.parquet"]
+        assert result.n_listed == 2100
+        assert result.n_deleted == 2100
+        assert result.n_batches == 3
+        assert result.errors == []
+        assert len(snapshots) == 3
+        assert snapshots[-1].n_deleted == 2100
+
+        # empty prefix
+        result = delete_prefix(f"s3://{self.bucket}/table/", self.s3_client)
+        assert result.n_listed == 0 and result.n_batches == 0
+
+        with pytest.raises(ValueError):
+            delete_prefix(f"s3://{self.bucket}/table/", self.s3_client, batch_size=0)
+
+        # the bucket root needs an explicit opt in
+        for s3dir in [f"s3://{self.bucket}/", f"s3://{self.bucket}"]:
+            with pytest.raises(ValueError):
+                delete_prefix(s3dir, self.s3_client)
+        assert self.list_keys("") == ["table_backup/1.parquet"]
+        result = delete_prefix(
+            f"s3://{self.bucket}", self.s3_client, allow_bucket_root=True
+        )
+        assert result.n_deleted == 1
+        assert self.list_keys("") == []
+
+    def test_retry(self):
+        self.put_keys([f"retry/{i}" for i in range(30)])
+        flaky = FlakyS3Client(self.s3_client, n_slow_down=3)
+        result = delete_prefix(
+            f"s3://{self.bucket}/retry/",
+            flaky,
+            max_workers=1,
+            batch_size=10,
+            base_delay=0.001,
+        )
+        assert self.list_keys("retry/") == []
+        assert result.n_deleted == 30
+        assert result.n_retries == 3
+        assert result.n_batches == 3
+
+        # out of retries
+        self.put_keys([f"retry/{i}" for i in range(10)])
+        flaky = FlakyS3Client(self.s3_client, n_slow_down=3)
+        with pytest.raises(RuntimeError):
+            delete_prefix(
+                f"s3://{self.bucket}/retry/",
+                flaky,
+                max_retries=1,
+                base_delay=0.001,
+            )
+        flaky = FlakyS3Client(self.s3_client, n_slow_down=3)
+        result = delete_prefix(
+            f"s3://{self.bucket}/retry/",
+            flaky,
+            max_retries=2,
+            base_delay=0.001,
+            raise_on_error=False,
+        )
+        assert len(result.errors) == 2
+        assert self.list_keys("retry/") == [err["Key"] for err in result.errors]
+
+        # not retryable
+        flaky = FlakyS3Client(self.s3_client, n_slow_down=0, error_code="AccessDenied")
+        with pytest.raises(ClientError):
+            delete_prefix(f"s3://{self.bucket}/retry/", flaky)
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.s3_delete", preview=False)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import tracemalloc
+
+import pytest
+
+from learn_awswrangler.s3_multipart import (
+    MB,
+    MIN_PART_SIZE,
+    BufferReader,
+    MultipartUploadWriter,
+)
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+from learn_awswrangler.tests.null_s3 import new_null_s3_client
+
+
+def test_buffer_reader():
+    buffer = bytearray(b"hello world")
+    with BufferReader(memoryview(buffer)[:5]) as f:
+        assert len(f) == 5
+        assert f.read(3) == b"hel"
+        assert f.tell() == 3
+        assert f.read() == b"lo"
+        assert f.seek(-2, io.SEEK_END) == 3
+        assert f.read(10) == b"lo"
+        f.seek(1)
+        f.seek(1, io.SEEK_CUR)
+        assert f.read(1) == b"l"
+        with pytest.raises(ValueError):
+            f.seek(-1)
+    # all views are released, the buffer can be resized again
+    buffer.extend(b"!")
+
+
+def test_part_buffer_is_not_copied():
+    """
+    The serialized bytes are copied once into the part buffer and never
+    again, the old ``bytes(buffer[:part_size])`` + ``io.BytesIO`` path
+    peaked at 3x the part size.
+    """
+    s3_client = new_null_s3_client()
+    data = b"x" * (4 * MIN_PART_SIZE + 100)
+    tracemalloc.start()
+    try:
+        with MultipartUploadWriter(
+            s3_client, "bucket", "key", part_size=MIN_PART_SIZE
+        ) as f:
+            for i in range(0, len(data), 1 * MB):
+                f.write(memoryview(data)[i : i + 1 * MB])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert f.n_parts == 5
+    assert peak < 2 * MIN_PART_SIZE
+
+
+class Test(BaseMockTest):
+    def get_body(self, key: str) -> bytes:
+        return self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def test_small_file(self):
+        key = "small.bin"
+        with MultipartUploadWriter(self.s3_client, self.bucket, key) as f:
+            f.write(b"hello")
+            f.write(b" world")
+        assert f.n_parts == 0
+        assert f.size == 11
+        assert self.get_body(key) == b"hello world"
+
+    def test_multipart(self):
+        key = "large.bin"
+        data = os.urandom(12 * MB)
+        with MultipartUploadWriter(
+            self.s3_client, self.bucket, key, part_size=MIN_PART_SIZE
+        ) as f:
+            for i in range(0, len(data), 1 * MB):
+                f.write(memoryview(data)[i : i + 1 * MB])
+        assert f.n_parts == 3
+        assert f.size == len(data)
+        assert self.get_body(key) == data
+
+    def test_write_from(self):
+        key = "copied.bin"
+        data = os.urandom(11 * MB)
+        with MultipartUploadWriter(
+            self.s3_client, self.bucket, key, part_size=MIN_PART_SIZE
+        ) as f:
+            assert f.write_from(io.BytesIO(data)) == len(data)
+        assert f.n_parts == 3
+        assert self.get_body(key) == data
+
+    def test_abort(self):
+        key = "aborted.bin"
+        with pytest.raises(RuntimeError):
+            with MultipartUploadWriter(
+                self.s3_client, self.bucket, key, part_size=MIN_PART_SIZE
+            ) as f:
+                f.write(os.urandom(6 * MB))
+                raise RuntimeError
+        assert f.closed
+        res = self.s3_client.list_objects_v2(Bucket=self.bucket, Prefix=key)
+        assert res["KeyCount"] == 0
+        res = self.s3_client.list_multipart_uploads(Bucket=self.bucket)
+        assert len(res.get("Uploads", [])) == 0
+
+    def test_part_size_too_small(self):
+        with pytest.raises(ValueError):
+            MultipartUploadWriter(self.s3_client, self.bucket, "x", part_size=1)
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.s3_multipart", preview=False)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import polars as pl
+import pytest
+
+from learn_awswrangler.tuning import (
+    ObjectiveEnum,
+    ParquetSetting,
+    take_sample,
+    benchmark_setting,
+    tune_parquet,
+)
+
+
+def make_df(n: int = 20_000) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "id": range(n),
+            "category": [f"category-{i % 7}" for i in range(n)],
+            "value": [i * 0.5 for i in range(n)],
+        }
+    )
+
+
+def test_take_sample():
+    df = make_df(1000)
+    assert take_sample(df, n_rows=2000).equals(df)
+    sample = take_sample(df, n_rows=100, n_chunks=4)
+    assert sample["id"].to_list() == [
+        i + offset for offset in (0, 250, 500, 750) for i in range(25)
+    ]
+    assert take_sample(df.lazy(), n_rows=10).equals(df.head(10))
+
+
+def test_benchmark_setting():
+    df = make_df()
+    res = benchmark_setting(df, ParquetSetting("zstd", 3, 1000), repeat=1)
+    assert res.n_bytes > 0
+    assert res.ratio > 1
+    assert res.encode_time > 0 and res.decode_time > 0
+    assert res.scan_time(1) > res.decode_time
+
+
+def test_tune_parquet():
+    df = make_df()
+    codecs = {"uncompressed": [None], "zstd": [1, 19]}
+    result = tune_parquet(
+        df,
+        objective=ObjectiveEnum.storage,
+        codecs=codecs,
+        row_group_sizes=[None, 5000],
+        repeat=1,
+    )
+    assert len(result.results) == 6
+    assert result.best.compression == "zstd"
+    assert result.results[-1].setting.compression == "uncompressed"
+    assert result.to_df().height == 6
+    assert set(result.best.to_kwargs()) == {
+        "compression",
+        "compression_level",
+        "row_group_size",
+    }
+
+    # scan cost over a slow network is dominated by size
+    result = tune_parquet(
+        df,
+        objective=ObjectiveEnum.scan_cost,
+        codecs=codecs,
+        repeat=1,
+        scan_bytes_per_sec=1000,
+    )
+    assert result.best.compression == "zstd"
+
+    result = tune_parquet(
+        df, objective=ObjectiveEnum.write_throughput, codecs=codecs, repeat=1
+    )
+    assert result.results[0].encode_time <= result.results[-1].encode_time
+
+    with pytest.raises(ValueError):
+        tune_parquet(df, objective="fast")
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.tuning", preview=False)
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+import io
+
+import polars as pl
+import pytest
+
+from learn_awswrangler.versioned import (
+    new_run_id,
+    list_versions,
+    write_versioned_parquet,
+)
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+def test_new_run_id():
+    run_id = new_run_id()
+    assert len(run_id) == len("20240101T000000Z-1a2b3c")
+    assert run_id[:8].isdigit() and run_id[8] == "T"
+    assert run_id != new_run_id()
+
+
+class Test(BaseMockTest):
+    database = "learn_awswrangler"
+
+    @classmethod
+    def setup_class_post_hook(cls):
+        cls.glue_client = cls.bsm.glue_client
+        cls.glue_client.create_database(DatabaseInput={"Name": cls.database})
+
+    def get_table(self, table: str):
+        return self.glue_client.get_table(DatabaseName=self.database, Name=table)[
+            "Table"
+        ]
+
+    def get_partitions(self, table: str):
+        res = self.glue_client.get_partitions(
+            DatabaseName=self.database, TableName=table
+        )
+        return sorted(
+            (p["Values"][0], p["StorageDescriptor"]["Location"])
+            for p in res["Partitions"]
+        )
+
+    def test_partitioned(self):
+        s3dir = f"s3://{self.bucket}/events/"
+        kwargs = dict(
+            s3dir=s3dir,
+            database=self.database,
+            table="events",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+            boto_ses=self.bsm.boto_ses,
+        )
+        df1 = pl.DataFrame({"id": [1, 2, 3], "year": ["2001", "2002", "2001"]})
+        res1 = write_versioned_parquet(df1, run_id="0001", **kwargs)
+        assert res1.location == f"{s3dir}v=0001/"
+        assert res1.cleanup.result() == []
+        assert self.get_table("events")["StorageDescriptor"]["Location"] == (
+            res1.location
+        )
+        assert self.get_partitions("events") == [
+            ("2001", f"{s3dir}v=0001/year=2001/"),
+            ("2002", f"{s3dir}v=0001/year=2002/"),
+        ]
+
+        # new schema, 2002 is gone, 2003 is new
+        df2 = pl.DataFrame({"id": [4, 5], "name": ["d", "e"], "year": ["2001", "2003"]})
+        res2 = write_versioned_parquet(df2, run_id="0002", **kwargs)
+        res2.cleanup.result()
+        table = self.get_table("events")
+        assert table["StorageDescriptor"]["Location"] == res2.location
+        assert [col["Name"] for col in table["StorageDescriptor"]["Columns"]] == [
+            "id",
+            "name",
+        ]
+        assert self.get_partitions("events") == [
+            ("2001", f"{s3dir}v=0002/year=2001/"),
+            ("2003", f"{s3dir}v=0002/year=2003/"),
+        ]
+        # the previous version is kept for in-flight queries
+        assert list_versions(s3dir, self.s3_client) == ["0001", "0002"]
+
+        res3 = write_versioned_parquet(df2, run_id="0003", **kwargs)
+        assert len(res3.cleanup.result()) == 1
+        assert list_versions(s3dir, self.s3_client) == ["0002", "0003"]
+
+        with pytest.raises(ValueError):
+            write_versioned_parquet(
+                df2, **dict(kwargs, partition_cols=["name"], run_id="0004")
+            )
+
+    def test_unpartitioned(self):
+        s3dir = f"s3://{self.bucket}/users/"
+        kwargs = dict(
+            s3dir=s3dir,
+            database=self.database,
+            table="users",
+            partition_cols=[],
+            s3_client=self.s3_client,
+            boto_ses=self.bsm.boto_ses,
+            keep_versions=1,
+        )
+        for run_id in ["0001", "0002"]:
+            res = write_versioned_parquet(
+                pl.DataFrame({"id": [1, 2]}), run_id=run_id, **kwargs
+            )
+            res.cleanup.result()
+            key = res.partitions[0].files[0].uri.split("/", 3)[3]
+            body = self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"]
+            assert pl.read_parquet(io.BytesIO(body.read()))["id"].to_list() == [1, 2]
+        assert self.get_table("users")["StorageDescriptor"]["Location"] == (
+            f"{s3dir}v=0002/"
+        )
+        assert list_versions(s3dir, self.s3_client) == ["0002"]
+
+    def test_projection(self):
+        s3dir = f"s3://{self.bucket}/projected/"
+        kwargs = dict(
+            s3dir=s3dir,
+            database=self.database,
+            table="projected",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+            boto_ses=self.bsm.boto_ses,
+        )
+        df = pl.DataFrame({"id": [1, 2], "year": [2001, 2002]})
+        write_versioned_parquet(df, run_id="0001", **kwargs).cleanup.result()
+        # make it a projection table
+        self.glue_client.delete_partition(
+            DatabaseName=self.database, TableName="projected", PartitionValues=["2001"]
+        )
+        self.glue_client.delete_partition(
+            DatabaseName=self.database, TableName="projected", PartitionValues=["2002"]
+        )
+        table = self.get_table("projected")
+        table_input = {
+            key: table[key]
+            for key in ["Name", "StorageDescriptor", "PartitionKeys", "TableType"]
+        }
+        table_input["Parameters"] = dict(
+            table.get("Parameters", {}),
+            **{
+                "projection.enabled": "true",
+                "projection.year.type": "integer",
+                "projection.year.range": "2001,2002",
+                "storage.location.template": f"{s3dir}v=0001/year=${{year}}/",
+            },
+        )
+        self.glue_client.update_table(
+            DatabaseName=self.database, TableInput=table_input
+        )
+
+        # the ranges follow the new copy
+        df = pl.DataFrame({"id": [3], "year": [2005]})
+        res = write_versioned_parquet(df, run_id="0002", **kwargs)
+        res.cleanup.result()
+        parameters = self.get_table("projected")["Parameters"]
+        assert parameters["projection.year.range"] == "2005,2005"
+        assert parameters["storage.location.template"] == (
+            f"{s3dir}v=0002/year=${{year}}/"
+        )
+        assert self.get_partitions("projected") == []
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.versioned", preview=False)
@@ -0,0 +1,535 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import time
+import uuid
+import gzip
+import functools
+from unittest import mock
+
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+
+from learn_awswrangler.s3_multipart import MIN_PART_SIZE
+from learn_awswrangler.writer import (
+    new_s3_client,
+    split_rows,
+    write_partitioned_parquet,
+    write_partitioned_ndjson,
+    _write_partitions_eager,
+)
+from learn_awswrangler.tests.mock_aws import BaseMockTest
+
+
+def serialize_and_count(marker_dir: str, df: pl.DataFrame, f):
+    """
+    Process pool task that waits until another task runs at the same time,
+    and writes the number of tasks it saw running.
+    """
+    marker = os.path.join(marker_dir, uuid.uuid4().hex)
+    open(marker, "w").close()
+    deadline = time.time() + 10
+    n_running = 1
+    while time.time() < deadline:
+        n_running = len(os.listdir(marker_dir))
+        if n_running > 1:
+            break
+        time.sleep(0.05)
+    # keep the marker a bit so the others see it
+    time.sleep(0.5)
+    os.remove(marker)
+    f.write(str(n_running).encode("utf-8"))
+
+
+def test_split_rows():
+    df = pl.DataFrame({"id": range(10)})
+    assert [len(sub_df) for sub_df in split_rows(df)] == [10]
+    assert [len(sub_df) for sub_df in split_rows(df, max_rows_per_file=4)] == [
+        4,
+        4,
+        2,
+    ]
+    # 8 bytes per row, 3 rows per file -> 4 files, spread evenly
+    assert [len(sub_df) for sub_df in split_rows(df, target_file_bytes=24)] == [
+        3,
+        3,
+        3,
+        1,
+    ]
+    assert [
+        len(sub_df)
+        for sub_df in split_rows(df, target_file_bytes=48, max_rows_per_file=5)
+    ] == [5, 5]
+    assert [len(sub_df) for sub_df in split_rows(df, target_file_bytes=1)] == [1] * 10
+    assert [len(sub_df) for sub_df in split_rows(df.head(0), max_rows_per_file=4)] == [
+        0
+    ]
+
+
+class Test(BaseMockTest):
+    def read_parquet(self, uri: str) -> pl.DataFrame:
+        key = uri.split("/", 3)[3]
+        body = self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        return pl.read_parquet(io.BytesIO(body.read()))
+
+    def test_write_partitioned_parquet(self):
+        df = pl.DataFrame(
+            {
+                "id": [1, 2, 3],
+                "year": ["2001", "2002", "2001"],
+            }
+        )
+        results = write_partitioned_parquet(
+            df=df,
+            s3dir=f"s3://{self.bucket}/small",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+        )
+        assert [res.values for res in results] == [("2001",), ("2002",)]
+        assert results[0].location == f"s3://{self.bucket}/small/year=2001/"
+        assert results[0].n_rows == 2
+        assert results[0].files[0].uri == (
+            f"s3://{self.bucket}/small/year=2001/data.parquet"
+        )
+        sub_df = self.read_parquet(results[0].files[0].uri)
+        assert sub_df.columns == ["id"]
+        assert sub_df["id"].to_list() == [1, 3]
+
+    def test_write_large_partition(self):
+        n = 400_000
+        df = pl.DataFrame(
+            {
+                "text": [os.urandom(16).hex() for _ in range(n)],
+                "year": ["2001"] * n,
+            }
+        )
+        results = write_partitioned_parquet(
+            df=df,
+            s3dir=f"s3://{self.bucket}/large/",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+            compression="uncompressed",
+            drop_partition_cols=False,
+            part_size=MIN_PART_SIZE,
+        )
+        file = results[0].files[0]
+        assert file.n_parts >= 2
+        assert self.read_parquet(file.uri).equals(df)
+
+    def test_concurrent_writes(self):
+        s3_client = new_s3_client(self.bsm.boto_ses, max_workers=16)
+        assert s3_client.meta.config.max_pool_connections == 16
+        df = pl.DataFrame(
+            {
+                "id": list(range(1000)),
+                "day": [i % 100 for i in range(1000)],
+            }
+        )
+        results = write_partitioned_parquet(
+            df=df,
+            s3dir=f"s3://{self.bucket}/concurrent/",
+            partition_cols=["day"],
+            s3_client=s3_client,
+            max_workers=16,
+        )
+        assert [res.values for res in results] == [(i,) for i in range(100)]
+        for res in results:
+            sub_df = self.read_parquet(res.files[0].uri)
+            assert sub_df["id"].to_list() == list(range(res.values[0], 1000, 100))
+
+    def test_process_executor(self):
+        df = pl.DataFrame(
+            {
+                "id": list(range(1000)),
+                "day": [i % 10 for i in range(1000)],
+            }
+        )
+        results = write_partitioned_parquet(
+            df=df,
+            s3dir=f"s3://{self.bucket}/process/",
+            partition_cols=["day"],
+            s3_client=self.s3_client,
+            compression="zstd",
+            executor="process",
+            max_processes=2,
+        )
+        assert [res.values for res in results] == [(i,) for i in range(10)]
+        for res in results:
+            sub_df = self.read_parquet(res.files[0].uri)
+            assert sub_df["id"].to_list() == list(range(res.values[0], 1000, 10))
+
+        with pytest.raises(ValueError):
+            write_partitioned_parquet(
+                df=df,
+                s3dir=f"s3://{self.bucket}/process/",
+                partition_cols=["day"],
+                s3_client=self.s3_client,
+                executor="greenlet",
+            )
+
+    def test_process_executor_uses_all_processes(self, tmp_path):
+        df = pl.DataFrame({"id": list(range(4)), "day": list(range(4))})
+        results = _write_partitions_eager(
+            df=df,
+            s3dir=f"s3://{self.bucket}/process-count/",
+            partition_cols=["day"],
+            s3_client=self.s3_client,
+            serialize=functools.partial(serialize_and_count, str(tmp_path)),
+            filename="data.txt",
+            drop_partition_cols=True,
+            target_file_bytes=None,
+            max_rows_per_file=None,
+            part_size=MIN_PART_SIZE,
+            max_workers=1,
+            executor="process",
+            max_processes=4,
+            spill_dir=None,
+        )
+        n_running = [
+            int(
+                self.s3_client.get_object(
+                    Bucket=self.bucket,
+                    Key=res.files[0].uri.split("/", 3)[3],
+                )["Body"].read()
+            )
+            for res in results
+        ]
+        # more processes busy at once than max_workers
+        assert max(n_running) > 1
+
+    def test_target_file_size(self):
+        df = pl.DataFrame(
+            {
+                "id": list(range(1000)),
+                "year": ["2001"] * 900 + ["2002"] * 100,
+            }
+        )
+        results = write_partitioned_parquet(
+            df=df,
+            s3dir=f"s3://{self.bucket}/split/",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+            target_file_bytes=8 * 300,
+            row_group_size=50,
+        )
+        assert [len(res.files) for res in results] == [3, 1]
+        assert [file.n_rows for file in results[0].files] == [300, 300, 300]
+        assert [file.uri.rsplit("/", 1)[1] for file in results[0].files] == [
+            "part-00000.parquet",
+            "part-00001.parquet",
+            "part-00002.parquet",
+        ]
+        body = self.s3_client.get_object(
+            Bucket=self.bucket, Key=results[0].files[0].uri.split("/", 3)[3]
+        )["Body"].read()
+        assert pq.ParquetFile(io.BytesIO(body)).num_row_groups == 6
+        ids = list()
+        for file in results[0].files:
+            ids.extend(self.read_parquet(file.uri)["id"].to_list())
+        assert ids == list(range(900))
+
+        results = write_partitioned_ndjson(
+            df=df,
+            s3dir=f"s3://{self.bucket}/split_ndjson/",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+            max_rows_per_file=400,
+        )
+        assert [file.uri.rsplit("/", 1)[1] for file in results[0].files] == [
+            "part-00000.json",
+            "part-00001.json",
+            "part-00002.json",
+        ]
+
+    def test_lazy_frame(self, tmp_path):
+        path = tmp_path / "source.json"
+        pl.DataFrame(
+            {
+                "id": list(range(100)),
+                "year": [
+                    None if i % 10 == 0 else str(2000 + i % 3) for i in range(100)
+                ],
+            }
+        ).write_ndjson(path)
+        lf = pl.scan_ndjson(path)
+        results = write_partitioned_parquet(
+            df=lf,
+            s3dir=f"s3://{self.bucket}/lazy/",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+        )
+        assert [res.values for res in results] == [
+            ("2000",),
+            ("2001",),
+            ("2002",),
+            (None,),
+        ]
+        assert results[-1].location.endswith("year=__HIVE_DEFAULT_PARTITION__/")
+        assert [res.n_rows for res in results] == [30, 30, 30, 10]
+        sub_df = self.read_parquet(results[0].files[0].uri)
+        assert sub_df.columns == ["id"]
+        assert sub_df["id"].to_list() == [
+            i for i in range(100) if i % 3 == 0 and i % 10 != 0
+        ]
+        sub_df = self.read_parquet(results[-1].files[0].uri)
+        assert sub_df["id"].to_list() == list(range(0, 100, 10))
+
+        results = write_partitioned_ndjson(
+            df=lf,
+            s3dir=f"s3://{self.bucket}/lazy_ndjson/",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+            max_rows_per_file=12,
+        )
+        assert [file.n_rows for file in results[0].files] == [10, 10, 10]
+        assert results[0].files[-1].uri.endswith("year=2000/part-00002.json")
+
+        with pytest.raises(ValueError):
+            write_partitioned_parquet(
+                df=lf,
+                s3dir=f"s3://{self.bucket}/lazy/",
+                partition_cols=["year"],
+                s3_client=self.s3_client,
+                target_file_bytes=1000,
+            )
+        with pytest.raises(ValueError):
+            write_partitioned_parquet(
+                df=lf,
+                s3dir=f"s3://{self.bucket}/lazy/",
+                partition_cols=["year"],
+                s3_client=self.s3_client,
+                executor="process",
+            )
+
+    def test_no_partition_cols(self):
+        df = pl.DataFrame({"id": range(10)})
+        for lazy in [False, True]:
+            results = write_partitioned_parquet(
+                df=df.lazy() if lazy else df,
+                s3dir=f"s3://{self.bucket}/no-partition-{lazy}/",
+                partition_cols=[],
+                s3_client=self.s3_client,
+            )
+            [result] = results
+            assert result.values == ()
+            assert result.files[0].uri == (
+                f"s3://{self.bucket}/no-partition-{lazy}/data.parquet"
+            )
+            assert self.read_parquet(result.files[0].uri).equals(df)
+
+    def test_pool_size_warning(self):
+        df = pl.DataFrame({"id": [1], "year": ["2001"]})
+        with pytest.warns(UserWarning):
+            write_partitioned_parquet(
+                df=df,
+                s3dir=f"s3://{self.bucket}/warning/",
+                partition_cols=["year"],
+                s3_client=self.s3_client,
+                max_workers=64,
+            )
+        # in process mode one thread per process uploads
+        with pytest.warns(UserWarning, match=r"concurrent uploads \(16\)"):
+            write_partitioned_parquet(
+                df=df,
+                s3dir=f"s3://{self.bucket}/warning-process/",
+                partition_cols=["year"],
+                s3_client=self.s3_client,
+                max_workers=1,
+                executor="process",
+                max_processes=16,
+            )
+
+    def test_auto_tune(self):
+        df = pl.DataFrame(
+            {
+                "id": range(1000),
+                "year": ["2001", "2002"] * 500,
+            }
+        )
+        results = write_partitioned_parquet(
+            df=df,
+            s3dir=f"s3://{self.bucket}/auto-tune/",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+            auto_tune="storage",
+        )
+        sub_df = self.read_parquet(results[0].files[0].uri)
+        assert sub_df["id"].to_list() == list(range(0, 1000, 2))
+
+    def test_incremental_auto_tune(self, monkeypatch):
+        import learn_awswrangler.writer as writer
+        from learn_awswrangler.tuning import ParquetSetting
+
+        df = pl.DataFrame({"id": range(10), "year": ["2001", "2002"] * 5})
+        kwargs = dict(
+            df=df,
+            s3dir=f"s3://{self.bucket}/incremental-auto-tune/",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+            auto_tune="storage",
+            incremental=True,
+        )
+        results = write_partitioned_parquet(**kwargs)
+        assert [res.skipped for res in results] == [False, False]
+
+        # another winner on the next run, the data didn't change
+        def tune_parquet(df, objective):
+            return mock.Mock(best=ParquetSetting("gzip", 9, 1))
+
+        monkeypatch.setattr(writer, "tune_parquet", tune_parquet)
+        results = write_partitioned_parquet(**kwargs)
+        assert [res.skipped for res in results] == [True, True]
+
+    def test_incremental(self):
+        s3dir = f"s3://{self.bucket}/incremental/"
+        df = pl.DataFrame(
+            {
+                "id": range(30),
+                "day": [f"2024-01-{i % 3 + 1:02d}" for i in range(30)],
+            }
+        )
+
+        def write(df: pl.DataFrame, **kwargs):
+            return write_partitioned_parquet(
+                df=df,
+                s3dir=s3dir,
+                partition_cols=["day"],
+                s3_client=self.s3_client,
+                incremental=True,
+                **kwargs,
+            )
+
+        def list_keys():
+            res = self.s3_client.list_objects_v2(
+                Bucket=self.bucket, Prefix="incremental/"
+            )
+            return sorted(obj["Key"] for obj in res["Contents"])
+
+        results = write(df)
+        assert [res.skipped for res in results] == [False, False, False]
+        etags = {
+            res.location: self.s3_client.head_object(
+                Bucket=self.bucket,
+                Key=res.files[0].uri.split("/", 3)[3],
+            )["ETag"]
+            for res in results
+        }
+
+        # nothing changed, nothing is written
+        results = write(df)
+        assert [res.skipped for res in results] == [True, True, True]
+        assert [res.n_rows for res in results] == [10, 10, 10]
+        assert results[0].files[0].uri == f"{s3dir}day=2024-01-01/data.parquet"
+
+        # only the changed partition is written, missing partitions are kept
+        df = df.with_columns(
+            id=pl.when(pl.col("day") == "2024-01-03")
+            .then(pl.col("id") * 10)
+            .otherwise(pl.col("id"))
+        )
+        results = write(df.filter(pl.col("day") != "2024-01-02"))
+        assert [res.skipped for res in results] == [True, False]
+        assert self.read_parquet(results[1].files[0].uri)["id"].to_list() == [
+            i * 10 for i in range(2, 30, 3)
+        ]
+        assert (
+            self.s3_client.head_object(
+                Bucket=self.bucket, Key="incremental/day=2024-01-01/data.parquet"
+            )["ETag"]
+            == etags[f"{s3dir}day=2024-01-01/"]
+        )
+
+        # a different file layout rewrites everything, old files are removed
+        results = write(df, max_rows_per_file=5)
+        assert [res.skipped for res in results] == [False, False, False]
+        assert list_keys() == ["incremental/_manifest.json"] + [
+            f"incremental/day=2024-01-{day:02d}/part-{i:05d}.parquet"
+            for day in (1, 2, 3)
+            for i in range(2)
+        ]
+
+        with pytest.raises(ValueError):
+            write(df.lazy())
+
+    def test_write_partitioned_ndjson(self):
+        df = pl.DataFrame(
+            {
+                "id": [1, 2, 3],
+                "year": ["2001", "2002", "2001"],
+            }
+        )
+        results = write_partitioned_ndjson(
+            df=df,
+            s3dir=f"s3://{self.bucket}/ndjson/",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+        )
+        key = results[0].files[0].uri.split("/", 3)[3]
+        assert key == "ndjson/year=2001/data.json"
+        body = self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        assert body.read() == b'{"id":1}\n{"id":3}\n'
+
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_write_compressed_ndjson(self, lazy):
+        n = 300_000
+        df = pl.DataFrame(
+            {
+                "text": [os.urandom(16).hex() for _ in range(n)],
+                "year": ["2001"] * n,
+            }
+        )
+        results = write_partitioned_ndjson(
+            df=df.lazy() if lazy else df,
+            s3dir=f"s3://{self.bucket}/ndjson-gzip-{lazy}/",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+            compression="gzip",
+            compression_level=1,
+            batch_size=10_000,
+            max_rows_per_file=None if lazy else n // 2,
+            part_size=MIN_PART_SIZE,
+        )
+        files = results[0].files
+        assert [file.uri.rsplit("/", 1)[1] for file in files] == (
+            ["data.json.gz"] if lazy else ["part-00000.json.gz", "part-00001.json.gz"]
+        )
+        texts = list()
+        for file in files:
+            key = file.uri.split("/", 3)[3]
+            body = self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"]
+            texts.extend(
+                pl.read_ndjson(io.BytesIO(gzip.decompress(body.read())))[
+                    "text"
+                ].to_list()
+            )
+        assert texts == df["text"].to_list()
+        if lazy:
+            # hex text compresses about 2x, still more than one 5 MB part
+            assert files[0].n_parts >= 2
+
+    def test_write_zstd_ndjson(self):
+        zstandard = pytest.importorskip("zstandard")
+        df = pl.DataFrame({"id": range(1000), "year": ["2001", "2002"] * 500})
+        results = write_partitioned_ndjson(
+            df=df,
+            s3dir=f"s3://{self.bucket}/ndjson-zstd/",
+            partition_cols=["year"],
+            s3_client=self.s3_client,
+            compression="zstd",
+            batch_size=100,
+        )
+        key = results[1].files[0].uri.split("/", 3)[3]
+        assert key == "ndjson-zstd/year=2002/data.json.zst"
+        body = self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        data = zstandard.ZstdDecompressor().stream_reader(body.read()).read()
+        assert pl.read_ndjson(io.BytesIO(data))["id"].to_list() == list(
+            range(1, 1000, 2)
+        )
+
+
+if __name__ == "__main__":
+    from learn_awswrangler.tests import run_cov_test
+
+    run_cov_test(__file__, "learn_awswrangler.writer", preview=False)